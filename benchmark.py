@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the Ingress to Gateway API migrator
+
+Generates a synthetic Ingress corpus of configurable size and shape, then
+times the load, migrate and save phases separately and reports throughput
+and peak memory as JSON. With --startup, times cold starts of the CLI
+instead and checks them against a budget.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Any
+
+from migrate import IngressMigrator, YAML_BACKENDS
+
+import yaml
+
+
+ANNOTATION_MIXES = ('none', 'supported', 'mixed')
+
+SUPPORTED_POOL = [
+    ('nginx.ingress.kubernetes.io/rewrite-target', '/$2'),
+    ('nginx.ingress.kubernetes.io/ssl-redirect', 'true'),
+    ('nginx.ingress.kubernetes.io/backend-protocol', 'HTTPS'),
+    ('nginx.ingress.kubernetes.io/cors-allow-origin', 'https://example.com'),
+    ('nginx.ingress.kubernetes.io/proxy-read-timeout', '60'),
+    ('nginx.ingress.kubernetes.io/proxy-body-size', '8m'),
+    ('kubernetes.io/ingress.class', 'nginx'),
+]
+
+UNSUPPORTED_POOL = [
+    ('nginx.ingress.kubernetes.io/auth-type', 'basic'),
+    ('nginx.ingress.kubernetes.io/configuration-snippet', 'more_set_headers "X-Test: 1";'),
+    ('nginx.ingress.kubernetes.io/limit-rps', '10'),
+]
+
+
+def generate_ingresses(count: int, hosts_per_ingress: int = 1, paths_per_rule: int = 2,
+                       tls_ratio: float = 0.3, passthrough_ratio: float = 0.05,
+                       annotation_mix: str = 'supported', unsupported_ratio: float = 0.05,
+                       namespaces: int = 20, seed: int = 0) -> List[Dict]:
+    """Build a deterministic list of synthetic Ingress objects"""
+    if annotation_mix not in ANNOTATION_MIXES:
+        raise ValueError(f"Unknown annotation mix '{annotation_mix}'")
+    
+    rng = random.Random(seed)
+    ingresses = []
+    for i in range(count):
+        name = f"app-{i}"
+        hosts = [f"{name}-{h}.bench.example.com" for h in range(hosts_per_ingress)]
+        
+        annotations = {}
+        if annotation_mix != 'none':
+            for key, value in rng.sample(SUPPORTED_POOL, k=rng.randint(1, 3)):
+                annotations[key] = value
+        if annotation_mix == 'mixed' and rng.random() < unsupported_ratio:
+            key, value = rng.choice(UNSUPPORTED_POOL)
+            annotations[key] = value
+        
+        passthrough = rng.random() < passthrough_ratio
+        if passthrough:
+            annotations['nginx.ingress.kubernetes.io/ssl-passthrough'] = 'true'
+        
+        metadata = {
+            'name': name,
+            'namespace': f"team-{i % namespaces}",
+            'labels': {'app': name, 'tier': rng.choice(['web', 'api', 'batch'])},
+        }
+        if annotations:
+            metadata['annotations'] = annotations
+        
+        # Gateway API only allows prefix rewrites on PathPrefix matches
+        path_types = ['Prefix', 'ImplementationSpecific']
+        if 'nginx.ingress.kubernetes.io/rewrite-target' not in annotations:
+            path_types.append('Exact')
+        
+        spec = {'rules': [{
+            'host': host,
+            'http': {'paths': [{
+                'path': f"/svc{p}",
+                'pathType': rng.choice(path_types),
+                'backend': {'service': {'name': f"{name}-svc{p}", 'port': {'number': 8080 + p}}},
+            } for p in range(paths_per_rule)]},
+        } for host in hosts]}
+        if passthrough or rng.random() < tls_ratio:
+            spec['tls'] = [{'hosts': hosts, 'secretName': f"{name}-tls"}]
+        
+        ingresses.append({
+            'apiVersion': 'networking.k8s.io/v1',
+            'kind': 'Ingress',
+            'metadata': metadata,
+            'spec': spec,
+        })
+    return ingresses
+
+
+def write_corpus(filename: str, ingresses: List[Dict], fmt: str = 'multidoc') -> int:
+    """Write a corpus as multi-document YAML or as a ``kind: List``; returns its size in bytes"""
+    with open(filename, 'w') as f:
+        if fmt == 'list':
+            yaml.safe_dump({'apiVersion': 'v1', 'kind': 'List', 'items': ingresses}, f,
+                           default_flow_style=False, sort_keys=False)
+        else:
+            yaml.safe_dump_all(ingresses, f, default_flow_style=False, sort_keys=False)
+    return os.path.getsize(filename)
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_benchmark(corpus: str, gateway_class: str = 'bench-gateway',
+                  yaml_backend: str = 'auto') -> Dict[str, Any]:
+    """Time the load, migrate and save phases over a corpus file"""
+    migrator = IngressMigrator(gateway_class, yaml_backend=yaml_backend)
+    input_bytes = os.path.getsize(corpus)
+    phases = {}
+    
+    start = time.perf_counter()
+    ingresses = list(migrator.iter_ingresses(corpus))
+    elapsed = time.perf_counter() - start
+    phases['load'] = {
+        'seconds': elapsed,
+        'ingresses_per_second': len(ingresses) / elapsed if elapsed else None,
+        'mb_per_second': input_bytes / elapsed / 1e6 if elapsed else None,
+        'peak_rss_bytes': peak_rss_bytes(),
+    }
+    
+    start = time.perf_counter()
+    for ingress in ingresses:
+        migrator.migrate_ingress(ingress)
+    elapsed = time.perf_counter() - start
+    phases['migrate'] = {
+        'seconds': elapsed,
+        'ingresses_per_second': len(ingresses) / elapsed if elapsed else None,
+        'peak_rss_bytes': peak_rss_bytes(),
+    }
+    
+    with tempfile.TemporaryDirectory() as out:
+        outputs = [os.path.join(out, name) for name in ('http.yaml', 'tls.yaml', 'failed.yaml')]
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            migrator.save_routes(*outputs)
+        elapsed = time.perf_counter() - start
+        output_bytes = sum(os.path.getsize(path) for path in outputs if os.path.exists(path))
+    phases['save'] = {
+        'seconds': elapsed,
+        'ingresses_per_second': len(ingresses) / elapsed if elapsed else None,
+        'mb_per_second': output_bytes / elapsed / 1e6 if elapsed else None,
+        'peak_rss_bytes': peak_rss_bytes(),
+    }
+    
+    total = sum(phase['seconds'] for phase in phases.values())
+    return {
+        'yaml_backend': migrator.yaml_backend,
+        'ingresses': len(ingresses),
+        'http_routes': len(migrator.http_routes),
+        'tls_routes': len(migrator.tls_routes),
+        'failed': len(migrator.failed_ingresses),
+        'input_bytes': input_bytes,
+        'output_bytes': output_bytes,
+        'phases': phases,
+        'total_seconds': total,
+        'ingresses_per_second': len(ingresses) / total if total else None,
+        'peak_rss_bytes': peak_rss_bytes(),
+    }
+
+
+# Cold starts timed by --startup, as interpreter arguments
+STARTUP_COMMANDS = {
+    'python': ['-c', 'pass'],
+    'import': ['-c', 'import migrate'],
+    'version': ['-m', 'migrate', '--version'],
+    'help': ['-m', 'migrate', '--help'],
+}
+
+# Modules that only the modes needing them may import
+LAZY_MODULES = ('yaml', 'argparse', 'json', 'hashlib', 'asyncio', 'ssl', 'urllib.request',
+                'concurrent.futures', 'mmap')
+
+
+def run_startup_benchmark(runs: int = 10, budget_ms: float = None) -> Dict[str, Any]:
+    """Time cold interpreter starts of the CLI, best and median of ``runs``.
+    
+    Each command runs in a fresh interpreter from the repository directory.
+    ``python -m migrate`` is timed rather than ``./migrate.py`` because a
+    script is compiled on every start while a module reuses its bytecode cache.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    commands = {}
+    for name, args in STARTUP_COMMANDS.items():
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, *args], cwd=directory, check=True,
+                           stdout=subprocess.DEVNULL)
+            timings.append((time.perf_counter() - start) * 1000)
+        commands[name] = {'best_ms': min(timings), 'median_ms': statistics.median(timings)}
+    
+    probe = f"import migrate, sys; print(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    loaded = subprocess.run([sys.executable, '-c', probe], cwd=directory, check=True,
+                            capture_output=True, text=True).stdout.split()
+    
+    over_budget = [name for name, timing in commands.items()
+                   if name != 'python' and budget_ms is not None and timing['best_ms'] > budget_ms]
+    return {
+        'runs': runs,
+        'commands': commands,
+        'modules_loaded_by_import': loaded,
+        'budget_ms': budget_ms,
+        'over_budget': over_budget,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the Ingress to Gateway API migrator on a synthetic corpus',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s --ingresses 10000
+  %(prog)s --ingresses 5000 --hosts 3 --paths 10 --format list --annotations mixed
+  %(prog)s --ingresses 20000 --yaml-backend python -o baseline.json
+  %(prog)s --startup --startup-budget 150
+        """
+    )
+    
+    parser.add_argument('-n', '--ingresses', type=int, default=1000,
+                        help='Number of Ingresses in the corpus (default: 1000)')
+    parser.add_argument('--hosts', type=int, default=1,
+                        help='Hosts (rules) per Ingress (default: 1)')
+    parser.add_argument('--paths', type=int, default=2,
+                        help='Paths per rule (default: 2)')
+    parser.add_argument('--tls-ratio', type=float, default=0.3,
+                        help='Fraction of Ingresses with a tls section (default: 0.3)')
+    parser.add_argument('--passthrough-ratio', type=float, default=0.05,
+                        help='Fraction of Ingresses with ssl-passthrough (default: 0.05)')
+    parser.add_argument('--annotations', choices=ANNOTATION_MIXES, default='supported',
+                        help='Annotation mix; "mixed" adds unsupported annotations '
+                             '(default: supported)')
+    parser.add_argument('--unsupported-ratio', type=float, default=0.05,
+                        help='Fraction of Ingresses with unsupported annotations in the mixed mix '
+                             '(default: 0.05)')
+    parser.add_argument('--format', choices=('multidoc', 'list'), default='multidoc',
+                        help='Corpus layout: multi-document YAML or kind: List (default: multidoc)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Random seed for the corpus generator (default: 0)')
+    parser.add_argument('--yaml-backend', choices=YAML_BACKENDS, default='auto',
+                        help='YAML implementation used by the migrator (default: auto)')
+    parser.add_argument('--corpus',
+                        help='Keep the generated corpus at this path instead of a temporary file')
+    parser.add_argument('-o', '--output',
+                        help='Write the JSON report to this file instead of stdout')
+    parser.add_argument('--startup', action='store_true',
+                        help='Time cold starts of the CLI (import, --version, --help) '
+                             'instead of a migration')
+    parser.add_argument('--startup-runs', type=int, default=10,
+                        help='Cold starts per command with --startup (default: 10)')
+    parser.add_argument('--startup-budget', type=float, metavar='MS',
+                        help='Exit with status 1 when a command\'s best cold start exceeds '
+                             'MS milliseconds')
+    
+    args = parser.parse_args()
+    
+    if args.startup:
+        report = run_startup_benchmark(args.startup_runs, args.startup_budget)
+        write_report(report, args.output)
+        if report['over_budget']:
+            print(f"Cold start over {args.startup_budget:g} ms budget: "
+                  f"{', '.join(report['over_budget'])}", file=sys.stderr)
+            sys.exit(1)
+        return
+    
+    ingresses = generate_ingresses(
+        args.ingresses, args.hosts, args.paths, args.tls_ratio, args.passthrough_ratio,
+        args.annotations, args.unsupported_ratio, seed=args.seed)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = args.corpus or os.path.join(tmp, 'corpus.yaml')
+        write_corpus(corpus, ingresses, args.format)
+        del ingresses
+        report = run_benchmark(corpus, yaml_backend=args.yaml_backend)
+    
+    report['corpus'] = {
+        'ingresses': args.ingresses,
+        'hosts_per_ingress': args.hosts,
+        'paths_per_rule': args.paths,
+        'tls_ratio': args.tls_ratio,
+        'passthrough_ratio': args.passthrough_ratio,
+        'annotations': args.annotations,
+        'format': args.format,
+        'seed': args.seed,
+    }
+    
+    write_report(report, args.output)
+
+
+def write_report(report: Dict[str, Any], filename: str = None) -> None:
+    """Print a JSON report, or write it to ``filename``"""
+    text = json.dumps(report, indent=2)
+    if filename:
+        with open(filename, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
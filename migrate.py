@@ -3,11 +3,2463 @@
 Script de migration Ingress Nginx vers Gateway API (HTTPRoute/TLSRoute) pour Istio
 """
 
-import yaml
-import argparse
+# PyYAML, argparse and the cluster, apply and parallel subsystems are imported
+# where they are used, so that --help, --version and JSON-only runs start fast
+import functools
+import itertools
+import os
+import re
 import sys
-from typing import Dict, List, Any, Tuple
-from collections import defaultdict
+import time
+from typing import Dict, List, Any, Tuple, Iterable, Iterator, Optional, NamedTuple
+from collections import Counter, defaultdict, deque
+
+
+__version__ = '1.0.2'
+
+YAML_BACKENDS = ('auto', 'libyaml', 'python')
+
+
+def resolve_yaml_backend(name: str = 'auto') -> Tuple[str, type, type]:
+    """Return ``(label, Loader, Dumper)`` for the requested YAML backend.
+    
+    ``auto`` picks the libyaml C bindings (``CSafeLoader``/``CSafeDumper``)
+    when PyYAML was built with them and falls back to the pure-Python safe
+    implementation otherwise. Both backends emit byte-identical output.
+    """
+    if name not in YAML_BACKENDS:
+        raise ValueError(f"Unknown YAML backend '{name}' "
+                         f"(expected one of: {', '.join(YAML_BACKENDS)})")
+    import yaml
+    
+    if name != 'python':
+        loader = getattr(yaml, 'CSafeLoader', None)
+        dumper = getattr(yaml, 'CSafeDumper', None)
+        if loader is not None and dumper is not None:
+            return 'libyaml', loader, _no_alias_dumper(dumper)
+        if name == 'libyaml':
+            raise ValueError("libyaml backend requested but PyYAML was built "
+                             "without LibYAML bindings")
+    
+    return 'python', yaml.SafeLoader, _no_alias_dumper(yaml.SafeDumper)
+
+
+_NO_ALIAS_DUMPERS = {}
+
+
+def _no_alias_dumper(dumper: type) -> type:
+    """Subclass of ``dumper`` that never emits anchors/aliases.
+    
+    Generated routes share substructures (parentRefs, TLS rules) instead of
+    copying them; they must still be written out in full in every document.
+    """
+    if dumper not in _NO_ALIAS_DUMPERS:
+        _NO_ALIAS_DUMPERS[dumper] = type(f"NoAlias{dumper.__name__}", (dumper,),
+                                         {'ignore_aliases': lambda self, data: True})
+    return _NO_ALIAS_DUMPERS[dumper]
+
+
+class _ScanSyntax(NamedTuple):
+    """Patterns and literals of the raw YAML scanner, as text or as bytes"""
+    document_start: Any
+    list_kind: Any
+    items_key: Any
+    # First line that is neither blank nor a comment, and its indentation
+    content_line: Any
+    # Anchor or alias token, such as '&base' or '*base'
+    anchor: Any
+    newline: Any
+    space: Any
+    dash: Any
+    ingress: Any
+    list: Any
+
+
+@functools.lru_cache(maxsize=None)
+def _scan_syntax(binary: bool) -> _ScanSyntax:
+    def compile_pattern(pattern):
+        return re.compile(pattern.encode() if binary else pattern, re.M)
+    
+    def literal(text):
+        return text.encode() if binary else text
+    
+    return _ScanSyntax(
+        compile_pattern(r'^---(?=[ \t\r\n]|\Z)'),
+        compile_pattern(r'^kind:[ \t]*(["\']?)List\1[ \t]*(#.*)?\r?$'),
+        compile_pattern(r'^items:[ \t]*(#.*)?\r?$'),
+        compile_pattern(r'^( *)(?![\t\r\f\v ]*(?:\n|\Z))([^ #])'),
+        compile_pattern(r'(?:^|[ \t\[{,])[&*][^\s,\[\]{}]'),
+        *map(literal, ('\n', ' ', '-', 'Ingress', 'List')))
+
+
+def split_yaml_documents(stream) -> Iterator[str]:
+    """Split a YAML stream into raw document texts on ``---`` markers, without parsing.
+    
+    The marker line is kept at the start of the document it opens, so each
+    chunk can be parsed on its own and yields the same document as a full parse.
+    """
+    document_start = _scan_syntax(False).document_start
+    lines = []
+    for line in stream:
+        if line.startswith('---') and document_start.match(line):
+            if lines:
+                yield ''.join(lines)
+            lines = []
+        lines.append(line)
+    if lines:
+        yield ''.join(lines)
+
+
+def split_list_items(text: str) -> Optional[List[str]]:
+    """Split the ``items`` of a block-style ``kind: List`` document into raw item texts.
+    
+    Each returned text is a one-element YAML sequence that parses on its own.
+    Returns None when the document is not a List in block style, or uses
+    anchors or aliases, in which case it has to be parsed as a whole.
+    """
+    if _scan_syntax(False).anchor.search(text):
+        return None
+    first_item = _list_items_start(text, 0, len(text))
+    if first_item is None:
+        return None
+    pos, indent = first_item
+    return [text[start:end] for start, end in _list_item_ranges(text, pos, len(text), indent)]
+
+
+@functools.lru_cache(maxsize=None)
+def _kind_pattern(indent: int, binary: bool = False):
+    # The first key of a List item follows its dash, hence '[ -]'
+    pattern = r'^[ -]{%d}kind:[ \t]*(["\']?)([^\s"\'#]+)\1[ \t]*(#.*)?\r?$' % indent
+    return re.compile(pattern.encode() if binary else pattern, re.M)
+
+
+@functools.lru_cache(maxsize=None)
+def _item_boundary_pattern(indent: int, binary: bool = False):
+    # Content lines indented no deeper than the item dashes
+    pattern = r'^( {0,%d})(?![\t\r\f\v ]*(?:\n|\Z))([^ #])' % indent
+    return re.compile(pattern.encode() if binary else pattern, re.M)
+
+
+def _range_may_hold_ingress(buf, start: int, end: int, indent: int, kinds: Tuple) -> bool:
+    binary = not isinstance(buf, str)
+    if buf.find(_scan_syntax(binary).ingress, start, end) < 0:
+        return False
+    matches = _kind_pattern(indent, binary).findall(buf, start, end)
+    return len(matches) != 1 or matches[0][1] in kinds
+
+
+def _list_items_start(buf, start: int, end: int) -> Optional[Tuple[int, int]]:
+    """Position and indentation of the first item of a block-style List in ``buf[start:end]``"""
+    syntax = _scan_syntax(not isinstance(buf, str))
+    if not syntax.list_kind.search(buf, start, end):
+        return None
+    match = syntax.items_key.search(buf, start, end)
+    if not match:
+        return None
+    newline = buf.find(syntax.newline, match.end(), end)
+    if newline < 0:
+        return end, 0
+    first = syntax.content_line.search(buf, newline + 1, end)
+    if first is None:
+        return end, 0
+    if first.group(2) != syntax.dash:
+        return None
+    return first.start(), len(first.group(1))
+
+
+def _list_item_ranges(buf, pos: int, end: int, indent: int) -> Iterator[Tuple[int, int]]:
+    binary = not isinstance(buf, str)
+    syntax = _scan_syntax(binary)
+    item = None
+    for match in _item_boundary_pattern(indent, binary).finditer(buf, pos, end):
+        dash_end = match.end()
+        if len(match.group(1)) == indent and match.group(2) == syntax.dash:
+            newline = buf.find(syntax.newline, dash_end, end)
+            rest = buf[dash_end:newline if newline >= 0 else end]
+            if rest[:1] == syntax.space or not rest.strip():
+                if item is not None:
+                    yield item, match.start()
+                item = match.start()
+                continue
+        end = match.start()
+        break
+    if item is not None:
+        yield item, end
+
+
+def _scan_document(buf, start: int, end: int) -> Iterator[Tuple[bool, int, int, bool]]:
+    """Segments of the document ``buf[start:end]``, for ``scan_segments`` and ``scan_ranges``"""
+    syntax = _scan_syntax(not isinstance(buf, str))
+    # An alias can pull an Ingress from anywhere in its document, and an item
+    # cannot be parsed without the anchors of the items before it
+    if syntax.anchor.search(buf, start, end):
+        yield False, start, end, buf.find(syntax.ingress, start, end) >= 0
+        return
+    first_item = _list_items_start(buf, start, end)
+    if first_item is None:
+        keep = _range_may_hold_ingress(buf, start, end, 0, (syntax.ingress, syntax.list))
+        yield False, start, end, keep
+        return
+    pos, indent = first_item
+    for item_start, item_end in _list_item_ranges(buf, pos, end, indent):
+        keep = _range_may_hold_ingress(buf, item_start, item_end, indent + 2, (syntax.ingress,))
+        yield True, item_start, item_end, keep
+
+
+def scan_segments(lines) -> Iterator[Tuple[bool, Optional[str]]]:
+    """Split raw YAML lines into independently parseable segments, pre-filtered by kind.
+    
+    Segments are ``(is_list_items, text)``: whole documents, or single items
+    of block-style ``kind: List`` documents. A document or item whose
+    top-level ``kind`` is found by a cheap line scan and cannot be an Ingress
+    is yielded with ``None`` as text, so it is counted but never parsed.
+    Anything the scan cannot tell for sure (flow style, tags, anchors and
+    aliases, duplicate keys) is kept for a full parse; a document with
+    anchors or aliases is never split into items.
+    """
+    for text in split_yaml_documents(lines):
+        for is_list_items, start, end, keep in _scan_document(text, 0, len(text)):
+            yield is_list_items, text[start:end] if keep else None
+
+
+def scan_ranges(buf) -> Iterator[Tuple[bool, int, int, bool]]:
+    """Byte-range counterpart of ``scan_segments`` over a buffer such as an mmap.
+    
+    Yields ``(is_list_items, start, end, keep)`` for the same segments, found
+    by the same scanner running over the raw bytes: nothing is decoded or
+    copied, so only the ranges that are kept ever need to be read.
+    """
+    starts = (match.start() for match in _scan_syntax(True).document_start.finditer(buf))
+    start = 0
+    for end in itertools.chain(starts, (len(buf),)):
+        if end != start:
+            yield from _scan_document(buf, start, end)
+        start = end
+
+
+def map_file(filename: str):
+    """Memory-map a file read-only, or return None if it cannot be (pipes, empty files)"""
+    import mmap
+    
+    try:
+        with open(filename, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+
+def render_yaml_document(doc: Dict, dumper: type) -> str:
+    """Serialize a generated route the way ``yaml.dump_all`` would"""
+    import yaml
+    
+    return yaml.dump(doc, Dumper=dumper, default_flow_style=False, sort_keys=False)
+
+
+def render_failed_ingress(item: Dict, dumper: type) -> str:
+    """Serialize an unmigrated Ingress preceded by its failure reason"""
+    return (f"# Raison: {item['reason']}\n---\n"
+            f"{render_yaml_document(item['ingress'], dumper)}\n")
+
+
+def render_json_document(doc: Dict, dumper: type = None) -> str:
+    """Serialize a document as compact single-line JSON (``dumper`` is unused)"""
+    import json
+    
+    return json.dumps(doc, ensure_ascii=False, separators=(',', ':'))
+
+
+def render_ndjson_document(doc: Dict, dumper: type = None) -> str:
+    return render_json_document(doc) + '\n'
+
+
+def render_failed_json(item: Dict, dumper: type = None) -> str:
+    """Serialize an unmigrated Ingress as a ``{"reason", "ingress"}`` record"""
+    return render_json_document({'reason': item['reason'], 'ingress': item['ingress']})
+
+
+def render_failed_ndjson(item: Dict, dumper: type = None) -> str:
+    return render_failed_json(item) + '\n'
+
+
+def iter_json_documents(text: str) -> Iterator[Any]:
+    """Decode concatenated JSON values: a single document, or one per line (NDJSON)"""
+    import json
+    
+    decoder = json.JSONDecoder()
+    whitespace = re.compile(r'\s*')
+    pos, end = 0, len(text)
+    while True:
+        pos = whitespace.match(text, pos).end()
+        if pos == end:
+            return
+        doc, pos = decoder.raw_decode(text, pos)
+        yield doc
+
+
+# File extensions picked up in input directories, by --input-format
+INPUT_FORMATS = {
+    'yaml': ('.yaml', '.yml'),
+    'json': ('.json',),
+    'ndjson': ('.ndjson', '.jsonl'),
+}
+
+
+def expand_inputs(paths: List[str],
+                  extensions: Tuple[str, ...] = INPUT_FORMATS['yaml']) -> List[str]:
+    """Expand directories and glob patterns into a de-duplicated list of files.
+    
+    Directories are walked recursively for files with one of ``extensions``,
+    skipping hidden directories such as ``.git``; patterns support ``**``. Other paths
+    are kept as given, so a missing file is reported like any unreadable one.
+    """
+    import glob
+    
+    files = []
+    seen = set()
+    
+    def add(filename):
+        if filename not in seen:
+            seen.add(filename)
+            files.append(filename)
+    
+    def walk(directory):
+        for root, dirs, names in os.walk(directory):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            for name in sorted(names):
+                if name.endswith(extensions):
+                    add(os.path.join(root, name))
+    
+    for path in paths:
+        if os.path.isdir(path):
+            walk(path)
+        elif any(c in path for c in '*?['):
+            for match in sorted(glob.glob(path, recursive=True)):
+                if os.path.isdir(match):
+                    walk(match)
+                else:
+                    add(match)
+        else:
+            add(path)
+    return files
+
+
+def iter_manifest_documents(filename: str, loader: type) -> Iterator[Any]:
+    """Yield the objects of a YAML, JSON or NDJSON manifest, expanding ``List`` items"""
+    with open(filename) as f:
+        if filename.endswith(INPUT_FORMATS['yaml']):
+            import yaml
+            
+            docs = yaml.load_all(f, Loader=loader)
+        else:
+            docs = iter_json_documents(f.read())
+        for doc in docs:
+            if isinstance(doc, dict) and doc.get('kind') == 'List':
+                yield from doc.get('items') or []
+            else:
+                yield doc
+
+
+class KubernetesClient:
+    """Minimal read-only Kubernetes API client used to list Ingresses from a live cluster.
+    
+    Only the standard library is used. Without explicit settings the in-cluster
+    service account (``KUBERNETES_SERVICE_HOST``, token and CA bundle) is used;
+    an explicit ``server`` never receives the service account token.
+    ``kubectl proxy`` plus ``server='http://127.0.0.1:8001'`` works as well.
+    """
+    
+    SERVICE_ACCOUNT_DIR = '/var/run/secrets/kubernetes.io/serviceaccount'
+    INGRESS_API = '/apis/networking.k8s.io/v1'
+    
+    def __init__(self, server: str = None, token: str = None, ca_file: str = None,
+                 insecure: bool = False, timeout: float = 30):
+        if not server:
+            host = os.environ.get('KUBERNETES_SERVICE_HOST')
+            port = os.environ.get('KUBERNETES_SERVICE_PORT', '443')
+            if not host:
+                raise ValueError("No Kubernetes API server given and not running inside a cluster")
+            server = f"https://{host}:{port}"
+            # The service account credentials only ever go to the in-cluster API server
+            token_file = os.path.join(self.SERVICE_ACCOUNT_DIR, 'token')
+            if token is None and os.path.exists(token_file):
+                with open(token_file) as f:
+                    token = f.read().strip()
+            ca_default = os.path.join(self.SERVICE_ACCOUNT_DIR, 'ca.crt')
+            if ca_file is None and os.path.exists(ca_default):
+                ca_file = ca_default
+        
+        self.server = server.rstrip('/')
+        self.token = token
+        self.timeout = timeout
+        self._ssl_context = None
+        if self.server.startswith('https://'):
+            import ssl
+            self._ssl_context = ssl.create_default_context(cafile=ca_file)
+            if insecure:
+                self._ssl_context.check_hostname = False
+                self._ssl_context.verify_mode = ssl.CERT_NONE
+    
+    def _open(self, path: str, params: Dict[str, Any] = None, timeout: float = None):
+        import urllib.parse
+        import urllib.request
+        
+        url = self.server + path
+        if params:
+            url += '?' + urllib.parse.urlencode({k: v for k, v in params.items() if v})
+        request = urllib.request.Request(url, headers={'Accept': 'application/json'})
+        if self.token:
+            request.add_header('Authorization', f'Bearer {self.token}')
+        return urllib.request.urlopen(request, timeout=timeout or self.timeout,
+                                      context=self._ssl_context)
+    
+    def get_json(self, path: str, params: Dict[str, Any] = None) -> Dict:
+        """GET an API path and decode the JSON response"""
+        import json
+        
+        with self._open(path, params) as response:
+            return json.load(response)
+    
+    def list_paginated(self, path: str, page_size: int = 500) -> Iterator[List[Dict]]:
+        """Yield pages of items using ``limit``/``continue`` pagination"""
+        token = None
+        while True:
+            page = self.get_json(path, {'limit': page_size, 'continue': token})
+            yield page.get('items') or []
+            token = page.get('metadata', {}).get('continue')
+            if not token:
+                return
+    
+    def list_namespaces(self, page_size: int = 500) -> List[str]:
+        """Return the names of all namespaces"""
+        return [ns['metadata']['name']
+                for page in self.list_paginated('/api/v1/namespaces', page_size)
+                for ns in page]
+    
+    def iter_ingresses(self, namespaces: List[str] = None, page_size: int = 500,
+                       workers: int = 4) -> Iterator[Dict]:
+        """Yield Ingresses as pages arrive, listing several namespaces concurrently.
+        
+        At most ``workers`` namespaces are fetched at once and only a few pages
+        per namespace are buffered ahead of the consumer, so fetching overlaps
+        with migration without pulling the whole cluster into memory.
+        Ingresses are yielded namespace by namespace in the order of
+        ``namespaces``, so the output does not depend on thread timing. The
+        first API error stops every fetch before its next request and is
+        raised right away, as is closing the iterator early.
+        """
+        import queue
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        
+        if not namespaces:
+            namespaces = self.list_namespaces(page_size)
+        
+        stop = threading.Event()
+        errors = []
+        done = object()
+        
+        def put(pages, item) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def fetch(namespace, pages):
+            if stop.is_set():
+                return
+            try:
+                path = f"{self.INGRESS_API}/namespaces/{namespace}/ingresses"
+                for page in self.list_paginated(path, page_size):
+                    if not put(pages, page):
+                        return
+                put(pages, done)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+        
+        def get(pages):
+            while not errors:
+                try:
+                    return pages.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            raise errors[0]
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Namespaces start in order, so the one being read is always fetched
+            queues = [queue.Queue(maxsize=2) for _ in namespaces]
+            for namespace, pages in zip(namespaces, queues):
+                pool.submit(fetch, namespace, pages)
+            
+            try:
+                for pages in queues:
+                    page = get(pages)
+                    while page is not done:
+                        for item in page:
+                            # List responses omit apiVersion/kind on their items
+                            yield {'apiVersion': 'networking.k8s.io/v1', 'kind': 'Ingress', **item}
+                        page = get(pages)
+            finally:
+                stop.set()
+    
+    def watch_ingresses(self, page_size: int = 500, timeout_seconds: int = 300) -> Iterator[Dict]:
+        """Yield watch events for the Ingresses of all namespaces, list-then-watch style.
+        
+        The current state comes first as one ``SYNC`` event holding every
+        Ingress, then ``ADDED``, ``MODIFIED`` and ``DELETED`` events follow.
+        Watches closed by the server are re-opened from the last resourceVersion
+        seen; once that version has expired (410 Gone) the Ingresses are listed
+        again and sent as a new ``SYNC`` event.
+        """
+        import json
+        import urllib.error
+        
+        path = f"{self.INGRESS_API}/ingresses"
+        while True:
+            objects, token = [], None
+            while True:
+                page = self.get_json(path, {'limit': page_size, 'continue': token})
+                objects.extend({'apiVersion': 'networking.k8s.io/v1', 'kind': 'Ingress', **item}
+                               for item in page.get('items') or [])
+                token = page.get('metadata', {}).get('continue')
+                if not token:
+                    break
+            resource_version = page.get('metadata', {}).get('resourceVersion')
+            if not resource_version:
+                raise ValueError("Ingress list returned no resourceVersion to watch from")
+            yield {'type': 'SYNC', 'objects': objects}
+            del objects
+            
+            while resource_version:
+                params = {'watch': 'true', 'allowWatchBookmarks': 'true',
+                          'resourceVersion': resource_version, 'timeoutSeconds': timeout_seconds}
+                try:
+                    timeout = timeout_seconds + self.timeout
+                    with self._open(path, params, timeout=timeout) as response:
+                        for line in response:
+                            if not line.strip():
+                                continue
+                            event = json.loads(line)
+                            item = event.get('object') or {}
+                            if event.get('type') == 'ERROR':
+                                if item.get('code') != 410:
+                                    raise RuntimeError(f"Watch failed: {item.get('message', item)}")
+                                resource_version = None
+                                break
+                            resource_version = (item.get('metadata', {}).get('resourceVersion')
+                                                or resource_version)
+                            if event.get('type') != 'BOOKMARK':
+                                yield {'type': event.get('type'),
+                                       'object': {'apiVersion': 'networking.k8s.io/v1',
+                                                  'kind': 'Ingress', **item}}
+                except urllib.error.HTTPError as e:
+                    if e.code != 410:
+                        raise
+                    resource_version = None
+
+
+def iter_event_file(filename: str) -> Iterator[Dict]:
+    """Yield Ingress watch events from an NDJSON file, ``-`` for the standard input.
+    
+    Each line is a ``{"type": ..., "object": ...}`` event, as printed by
+    ``kubectl get ingress -A --watch --output-watch-events -o json | jq -c .``,
+    or a ``{"type": "SYNC", "objects": [...]}`` snapshot of all Ingresses.
+    """
+    import json
+    
+    f = sys.stdin if filename == '-' else open(filename, 'r')
+    try:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+class ApplyResult(NamedTuple):
+    """Outcome of the server-side apply of one route"""
+    kind: str
+    namespace: str
+    name: str
+    # Last HTTP status received, 0 when the API server could not be reached
+    status: int
+    attempts: int
+    error: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+
+class RouteApplier:
+    """Server-side applies routes to the API server with bounded concurrency.
+    
+    Every route is sent as a ``PATCH`` with an ``application/apply-patch+yaml``
+    body from an asyncio loop. At most ``concurrency`` requests are in flight,
+    each over a pooled HTTP/1.1 keep-alive connection that is reused by the
+    next request, so tens of thousands of routes need only a handful of
+    connections. 409 and 429 responses are retried with exponential backoff,
+    honouring ``Retry-After``; dropped connections are retried the same way.
+    """
+    
+    RETRY_STATUSES = (409, 429)
+    
+    def __init__(self, client: KubernetesClient, concurrency: int = 16,
+                 field_manager: str = 'ingress-to-gateway-migrator', force: bool = True,
+                 retries: int = 5, backoff: float = 0.5, max_backoff: float = 30):
+        import urllib.parse
+        
+        url = urllib.parse.urlsplit(client.server)
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == 'https' else 80)
+        self.base_path = url.path.rstrip('/')
+        self.ssl = client._ssl_context
+        self.token = client.token
+        self.timeout = client.timeout
+        self.concurrency = concurrency
+        self.query = '?' + urllib.parse.urlencode({'fieldManager': field_manager,
+                                                   'force': str(force).lower()})
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.connections = 0
+        self._idle = []
+    
+    @staticmethod
+    def path(doc: Dict) -> str:
+        """API path of a namespaced route, e.g. ``.../namespaces/ns/httproutes/name``"""
+        metadata = doc['metadata']
+        return (f"/apis/{doc['apiVersion']}/namespaces/{metadata.get('namespace', 'default')}"
+                f"/{doc['kind'].lower()}s/{metadata['name']}")
+    
+    def apply(self, routes: Iterator[Dict]) -> List[ApplyResult]:
+        """Apply routes and return their results in input order"""
+        import asyncio
+        
+        return asyncio.run(self._apply_all(routes))
+    
+    async def _apply_all(self, routes: Iterator[Dict]) -> List[ApplyResult]:
+        import asyncio
+        
+        results = {}
+        # Shared by the workers: pulling from it never yields to the loop
+        pending = enumerate(routes)
+        
+        async def worker():
+            for index, route in pending:
+                results[index] = await self._apply_one(route)
+        
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        finally:
+            while self._idle:
+                self._idle.pop()[1].close()
+        return [results[index] for index in range(len(results))]
+    
+    async def _apply_one(self, route: Dict) -> ApplyResult:
+        import asyncio
+        import json
+        
+        metadata = route.get('metadata') or {}
+        result = ApplyResult(route.get('kind'), metadata.get('namespace', 'default'),
+                             metadata.get('name'), 0, 0)
+        try:
+            path = self.path(route) + self.query
+        except (KeyError, TypeError, AttributeError) as e:
+            return result._replace(error=f"Not an applicable route: {e}")
+        body = json.dumps(route, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        
+        for attempt in range(1, self.retries + 2):
+            delay = self.backoff * 2 ** (attempt - 1)
+            try:
+                status, headers, payload = await asyncio.wait_for(self._request(path, body),
+                                                                  self.timeout)
+            except (OSError, EOFError, asyncio.TimeoutError, ValueError) as e:
+                result = result._replace(status=0, attempts=attempt,
+                                         error=str(e) or type(e).__name__)
+            else:
+                if 200 <= status < 300:
+                    return result._replace(status=status, attempts=attempt, error=None)
+                result = result._replace(status=status, attempts=attempt,
+                                         error=self._message(payload))
+                if status not in self.RETRY_STATUSES:
+                    return result
+                try:
+                    delay = float(headers['retry-after'])
+                except (KeyError, ValueError):
+                    pass
+            if attempt <= self.retries:
+                await asyncio.sleep(min(delay, self.max_backoff))
+        return result
+    
+    @staticmethod
+    def _message(payload: bytes) -> str:
+        import json
+        
+        # Errors come back as a Status object
+        try:
+            return json.loads(payload)['message']
+        except (ValueError, KeyError, TypeError):
+            return payload.decode('utf-8', 'replace')[:200]
+    
+    async def _request(self, path: str, body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        import asyncio
+        
+        # A pooled connection may have been closed by the server in the meantime:
+        # retry once on a fresh one when it fails before any response
+        while True:
+            reused = bool(self._idle)
+            if reused:
+                reader, writer = self._idle.pop()
+            else:
+                reader, writer = await asyncio.open_connection(
+                    self.host, self.port, ssl=self.ssl,
+                    server_hostname=self.host if self.ssl else None)
+                self.connections += 1
+            try:
+                head = [f"PATCH {self.base_path}{path} HTTP/1.1", f"Host: {self.host}",
+                        "Content-Type: application/apply-patch+yaml", "Accept: application/json",
+                        f"Content-Length: {len(body)}"]
+                if self.token:
+                    head.append(f"Authorization: Bearer {self.token}")
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+                await writer.drain()
+                status_line = await reader.readline()
+                if not status_line:
+                    raise ConnectionResetError("Connection closed by the API server")
+            except (OSError, EOFError):
+                writer.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            
+            try:
+                status, headers, payload, keep_alive = await self._read_response(
+                    status_line, reader)
+            except BaseException:
+                writer.close()
+                raise
+            if keep_alive:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+            return status, headers, payload
+    
+    @staticmethod
+    async def _read_response(status_line: bytes, reader) -> Tuple[int, Dict[str, str], bytes, bool]:
+        version, status = status_line.decode('latin-1').split(None, 2)[:2]
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            headers[key.strip().lower()] = value.strip()
+        
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if not size:
+                    # Skip trailers
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            payload = b''.join(chunks)
+        elif 'content-length' in headers:
+            payload = await reader.readexactly(int(headers['content-length']))
+        else:
+            payload = await reader.read()
+            keep_alive = False
+        return int(status), headers, payload, keep_alive
+
+
+def write_apply_report(results: List[ApplyResult], filename: Optional[str]) -> None:
+    """Print a summary of the apply results and the failed objects, and write them all as JSON"""
+    failed = [result for result in results if not result.ok]
+    if filename:
+        import json
+        
+        with open(filename, 'w') as f:
+            json.dump({'applied': len(results) - len(failed), 'failed': len(failed),
+                       'results': [dict(result._asdict(), ok=result.ok) for result in results]},
+                      f, indent=2)
+            f.write('\n')
+    for result in failed:
+        print(f"Error applying {result.kind} {result.namespace}/{result.name}: "
+              f"{result.status or 'no response'} {result.error}", file=sys.stderr)
+    retried = sum(1 for result in results if result.attempts > 1)
+    print(f"🚀 {len(results) - len(failed)} route(s) applied, {len(failed)} failed, "
+          f"{retried} retried" + (f" - voir {filename}" if filename else ""))
+
+
+class YamlStreamWriter:
+    """Writes YAML documents to a file incrementally with bounded buffering.
+    
+    Documents are serialized as soon as they are appended and flushed to disk
+    every ``flush_every`` documents (or once ``flush_bytes`` are buffered), so
+    memory stays flat and partial output survives an interrupted run. The file
+    is only created when the first document arrives, and the result is
+    byte-identical to ``yaml.dump_all`` over the same documents. A filename
+    of ``-`` writes to the standard output.
+    """
+    
+    extension = 'yaml'
+    header = ''
+    separator = '---\n'
+    footer = ''
+    render_document = staticmethod(render_yaml_document)
+    # Size of a buffered string; characters are close enough for flushing
+    _measure = staticmethod(len)
+    
+    def __init__(self, filename: str, flush_every: int = 256, flush_bytes: int = 1 << 20,
+                 dumper: type = None):
+        self.filename = filename
+        self.dumper = dumper or (resolve_yaml_backend()[2] if self.extension == 'yaml' else None)
+        self.flush_every = flush_every
+        self.flush_bytes = flush_bytes
+        self.count = 0
+        self._file = None
+        self._buffer = []
+        self._buffered_bytes = 0
+        self._finished = False
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def render(self, doc: Dict) -> str:
+        """Serialize a single document"""
+        return self.render_document(doc, self.dumper)
+    
+    def append(self, doc: Dict) -> None:
+        """Serialize and buffer a document, flushing when the buffer is full"""
+        self.write_rendered(self.render(doc))
+    
+    def write_rendered(self, text: str, doc: Dict = None) -> None:
+        """Buffer a document already serialized with ``render``"""
+        if self.count:
+            text = self.separator + text
+        elif self.header:
+            text = self.header + text
+        self._buffer.append(text)
+        self._buffered_bytes += self._measure(text)
+        self.count += 1
+        if len(self._buffer) >= self.flush_every or self._buffered_bytes >= self.flush_bytes:
+            self.flush()
+    
+    def flush(self) -> None:
+        """Write buffered documents to disk"""
+        if not self._buffer:
+            return
+        if self._file is None:
+            stdout = self.filename == '-'
+            self._file = open(1 if stdout else self.filename, 'w', closefd=not stdout)
+        self._file.write(''.join(self._buffer))
+        self._file.flush()
+        self._buffer = []
+        self._buffered_bytes = 0
+    
+    def tell(self) -> int:
+        """Bytes flushed to the file so far"""
+        return self._file.tell() if self._file is not None else 0
+    
+    def resume(self, size: int, count: int) -> None:
+        """Continue a file left by an interrupted run after its first ``size`` bytes.
+        
+        ``size`` and ``count`` are the values of ``tell`` and ``count`` when
+        the run was checkpointed; anything written after that is dropped.
+        """
+        if count:
+            os.truncate(self.filename, size)
+            self._file = open(self.filename, 'a')
+        elif os.path.exists(self.filename):
+            os.remove(self.filename)
+        self.count = count
+    
+    def _finish(self) -> None:
+        """Buffer the footer once, if any document was written"""
+        if self.count and self.footer and not self._finished:
+            self._buffer.append(self.footer)
+            self._buffered_bytes += self._measure(self.footer)
+        self._finished = True
+    
+    def close(self) -> None:
+        """Flush remaining documents and close the file"""
+        self._finish()
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class FailedIngressWriter(YamlStreamWriter):
+    """Streams unmigrated Ingresses, each preceded by its failure reason"""
+    
+    header = "# Ingresses non migrés\n\n"
+    separator = ''
+    render_document = staticmethod(render_failed_ingress)
+
+
+class NdjsonStreamWriter(YamlStreamWriter):
+    """Streams one compact JSON document per line"""
+    
+    extension = 'ndjson'
+    separator = ''
+    render_document = staticmethod(render_ndjson_document)
+
+
+class FailedIngressNdjsonWriter(NdjsonStreamWriter):
+    """Streams unmigrated Ingresses as ``{"reason", "ingress"}`` lines"""
+    
+    render_document = staticmethod(render_failed_ndjson)
+
+
+class JsonListWriter(YamlStreamWriter):
+    """Streams documents as the items of a single JSON ``List``, one item per line"""
+    
+    extension = 'json'
+    header = '{"apiVersion":"v1","kind":"List","items":[\n'
+    separator = ',\n'
+    footer = '\n]}\n'
+    render_document = staticmethod(render_json_document)
+
+
+class FailedIngressJsonWriter(JsonListWriter):
+    """Streams unmigrated Ingresses as a JSON array of ``{"reason", "ingress"}`` records"""
+    
+    header = '[\n'
+    footer = '\n]\n'
+    render_document = staticmethod(render_failed_json)
+
+
+# Route and failure writers for each --output-format
+OUTPUT_FORMATS = {
+    'yaml': (YamlStreamWriter, FailedIngressWriter),
+    'json': (JsonListWriter, FailedIngressJsonWriter),
+    'ndjson': (NdjsonStreamWriter, FailedIngressNdjsonWriter),
+}
+
+
+SHARD_MODES = ('namespace', 'hostname', 'count', 'bytes')
+
+
+def parse_shard_spec(spec: str) -> Tuple[str, int]:
+    """Parse ``namespace``, ``hostname``, ``count:N`` or ``bytes:N``"""
+    mode, _, value = spec.partition(':')
+    if mode in ('namespace', 'hostname') and not value:
+        return mode, 0
+    if mode in ('count', 'bytes') and value.isdigit() and int(value) > 0:
+        return mode, int(value)
+    raise ValueError(f"Invalid shard spec '{spec}' "
+                     "(expected namespace, hostname, count:N or bytes:N)")
+
+
+def _encoded_size(text: str) -> int:
+    return len(text.encode('utf-8'))
+
+
+class _ShardFile:
+    """One shard, written by a thread pool and reopened in append mode for each flush.
+    
+    Keeping no file open between flushes lets hostname sharding produce any
+    number of shards without running out of file descriptors. Mixed into the
+    writer class of the output format by ``_shard_file_class``. Sizes are
+    counted in UTF-8 bytes, as written to disk.
+    
+    Shards of formats without a header start with the document separator, so
+    ``cat`` of YAML shards in file name order is a valid stream: the
+    unsharded output preceded by ``---``.
+    """
+    
+    _measure = staticmethod(_encoded_size)
+    
+    def __init__(self, filename: str, pool, dumper: type = None):
+        super().__init__(filename, sys.maxsize, sys.maxsize, dumper)
+        self._written = 0
+        self._pool = pool
+        self._pending = None
+    
+    @property
+    def size(self) -> int:
+        return self._written + self._buffered_bytes
+    
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        data = ''.join(self._buffer)
+        self._written += self._buffered_bytes
+        self._buffer = []
+        self._buffered_bytes = 0
+        # Writes to one shard stay ordered, different shards are written concurrently
+        mode = 'w' if self._pending is None else 'a'
+        if self._pending is not None:
+            self._pending.result()
+        self._pending = self._pool.submit(self._write, data, mode)
+    
+    def _write(self, data: str, mode: str) -> None:
+        with open(self.filename, mode) as f:
+            f.write(data)
+    
+    def close(self) -> None:
+        self._finish()
+        self.flush()
+        if self._pending is not None:
+            self._pending.result()
+
+
+@functools.lru_cache(maxsize=None)
+def _shard_file_class(writer_class: type) -> type:
+    header = writer_class.header or writer_class.separator
+    return type(f"{writer_class.__name__}Shard", (_ShardFile, writer_class),
+                {'header': header})
+
+
+# Characters kept from namespaces and hostnames in shard file names
+_UNSAFE_SHARD_KEY_RE = re.compile(r'[^A-Za-z0-9._-]')
+
+
+class ShardedWriter:
+    """Splits the routes of one kind into a directory of shard files.
+    
+    Routes are grouped by namespace or first hostname, or cut into files of
+    at most ``count:N`` documents or about ``bytes:N`` bytes (a single larger
+    document still gets its own shard). Shards are buffered in memory up to
+    ``flush_bytes`` in total and then written concurrently by ``pool``;
+    ``index`` describes the resulting files.
+    """
+    
+    def __init__(self, directory: str, prefix: str, kind: str, spec: str, pool,
+                 dumper: type = None, flush_bytes: int = 8 << 20,
+                 writer_class: type = YamlStreamWriter):
+        self.filename = directory
+        self.prefix = prefix
+        self.kind = kind
+        self.writer_class = writer_class
+        self.mode, self.limit = parse_shard_spec(spec)
+        if dumper is None and writer_class.extension == 'yaml':
+            dumper = resolve_yaml_backend()[2]
+        self.dumper = dumper
+        self.flush_bytes = flush_bytes
+        self.count = 0
+        self.shards = {}
+        self._pool = pool
+        self._current = None
+        self._buffered_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        # Shards of an earlier run would otherwise be picked up with the new ones
+        extensions = tuple('.' + route_writer.extension
+                           for route_writer, _ in OUTPUT_FORMATS.values())
+        for name in os.listdir(directory):
+            if name.startswith(prefix + '-') and name.endswith(extensions):
+                os.remove(os.path.join(directory, name))
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def render(self, doc: Dict) -> str:
+        return self.writer_class.render_document(doc, self.dumper)
+    
+    def append(self, doc: Dict) -> None:
+        self.write_rendered(self.render(doc), doc)
+    
+    def _shard_key(self, doc: Dict, text: str) -> str:
+        # Keys become file names: anything but [A-Za-z0-9._-] turns into '_',
+        # which cannot appear in a namespace or hostname, so no key collides
+        # with a valid one and none can leave the directory
+        if self.mode == 'namespace':
+            namespace = doc.get('metadata', {}).get('namespace', 'default')
+            return _UNSAFE_SHARD_KEY_RE.sub('_', str(namespace))
+        if self.mode == 'hostname':
+            hostnames = doc.get('spec', {}).get('hostnames')
+            if not hostnames:
+                return '_default'
+            return _UNSAFE_SHARD_KEY_RE.sub('_', str(hostnames[0]))
+        
+        current = self._current
+        if current is None:
+            return '00001'
+        shard = self.shards[current]
+        if self.mode == 'count':
+            full = shard.count >= self.limit
+        else:
+            size = shard.size + len(shard.separator) + _encoded_size(text) + len(shard.footer)
+            full = size > self.limit
+        if shard.count and full:
+            # The previous shard is complete: hand it to the pool right away
+            shard.flush()
+            return f"{int(current) + 1:05d}"
+        return current
+    
+    def write_rendered(self, text: str, doc: Dict = None) -> None:
+        key = self._shard_key(doc, text)
+        shard = self.shards.get(key)
+        if shard is None:
+            extension = self.writer_class.extension
+            filename = os.path.join(self.filename, f"{self.prefix}-{key}.{extension}")
+            shard_class = _shard_file_class(self.writer_class)
+            shard = self.shards[key] = shard_class(filename, self._pool, self.dumper)
+            self._current = key
+        shard.write_rendered(text, doc)
+        self.count += 1
+        self._buffered_bytes += len(text)
+        if self._buffered_bytes >= self.flush_bytes:
+            self.flush()
+    
+    def flush(self) -> None:
+        for shard in self.shards.values():
+            shard.flush()
+        self._buffered_bytes = 0
+    
+    def close(self) -> None:
+        for shard in self.shards.values():
+            shard.close()
+    
+    def index(self) -> List[Dict[str, Any]]:
+        """Describe the shards written, in file name order"""
+        return [{
+            'file': os.path.basename(shard.filename),
+            'kind': self.kind,
+            'key': key,
+            'count': shard.count,
+            'bytes': shard.size,
+        } for key, shard in sorted(self.shards.items())]
+
+
+def write_shard_index(directory: str, spec: str, writers: List[ShardedWriter]) -> str:
+    """Write ``index.json`` listing every shard of ``writers``"""
+    import json
+    
+    filename = os.path.join(directory, 'index.json')
+    shards = [entry for writer in writers for entry in writer.index()]
+    with open(filename, 'w') as f:
+        json.dump({'shard_by': spec, 'shards': shards}, f, indent=2)
+        f.write('\n')
+    return filename
+
+
+class MigrationStats:
+    """Low-overhead counters and per-phase wall/CPU timers.
+    
+    Phases are timed inclusively (``create_http_route`` includes the
+    ``convert_http_path`` calls it makes). When profiling is enabled, each
+    outermost phase gets its own cProfile profiler so the slowest phase can
+    be dumped on its own.
+    """
+    
+    def __init__(self):
+        self.counters = defaultdict(int)
+        self.failures_by_reason = defaultdict(int)
+        self.phases = {}
+        self._depth = 0
+        self._profilers = None
+    
+    def enable_profiling(self) -> None:
+        self._profilers = {}
+    
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] += value
+    
+    def record_results(self, http_routes: int, tls_routes: int, failures: List[Dict]) -> None:
+        """Count routes emitted and failures by reason"""
+        self.counters['http_routes'] += http_routes
+        self.counters['tls_routes'] += tls_routes
+        self.counters['failed'] += len(failures)
+        for failure in failures:
+            self.failures_by_reason[failure['reason'].split(':')[0]] += 1
+    
+    def phase(self, name: str) -> '_PhaseTimer':
+        """Context manager timing one call of ``name``"""
+        return _PhaseTimer(self, name)
+    
+    def timed_iter(self, iterator, name: str) -> Iterator:
+        """Yield from ``iterator``, timing each step as phase ``name``"""
+        iterator = iter(iterator)
+        while True:
+            with self.phase(name):
+                item = next(iterator, _EXHAUSTED)
+            if item is _EXHAUSTED:
+                return
+            yield item
+    
+    def merge(self, snapshot: Dict) -> None:
+        """Add the counters and timings of another ``snapshot()``"""
+        for name, value in snapshot['counters'].items():
+            self.counters[name] += value
+        for reason, value in snapshot['failures_by_reason'].items():
+            self.failures_by_reason[reason] += value
+        for name, phase in snapshot['phases'].items():
+            record = self.phases.setdefault(name, [0, 0.0, 0.0])
+            record[0] += phase['calls']
+            record[1] += phase['wall_seconds']
+            record[2] += phase['cpu_seconds']
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable view of the collected statistics"""
+        return {
+            'counters': dict(self.counters),
+            'failures_by_reason': dict(self.failures_by_reason),
+            'phases': {name: {'calls': calls, 'wall_seconds': wall, 'cpu_seconds': cpu}
+                       for name, (calls, wall, cpu) in self.phases.items()},
+        }
+    
+    def dump_profile(self, filename: str) -> Optional[str]:
+        """Write the pstats file of the slowest profiled phase and return its name"""
+        if not self._profilers:
+            return None
+        slowest = max(self._profilers, key=lambda name: self.phases[name][1])
+        self._profilers[slowest].dump_stats(filename)
+        return slowest
+
+
+_EXHAUSTED = object()
+
+
+class _PhaseTimer:
+    __slots__ = ('stats', 'name', 'wall', 'cpu', 'profiler')
+    
+    def __init__(self, stats: MigrationStats, name: str):
+        self.stats = stats
+        self.name = name
+        self.profiler = None
+    
+    def __enter__(self):
+        stats = self.stats
+        if stats._profilers is not None and stats._depth == 0:
+            if self.name not in stats._profilers:
+                import cProfile
+                stats._profilers[self.name] = cProfile.Profile()
+            self.profiler = stats._profilers[self.name]
+            self.profiler.enable()
+        stats._depth += 1
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+    
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        stats = self.stats
+        stats._depth -= 1
+        if self.profiler is not None:
+            self.profiler.disable()
+        record = stats.phases.get(self.name)
+        if record is None:
+            record = stats.phases[self.name] = [0, 0.0, 0.0]
+        record[0] += 1
+        record[1] += wall
+        record[2] += cpu
+        return False
+
+
+def _timed(phase: str):
+    """Time a migrator method as ``phase`` when statistics are enabled"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.stats is None:
+                return method(self, *args, **kwargs)
+            with self.stats.phase(phase):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Gateway API limit on the number of rules in a single HTTPRoute
+MAX_RULES_PER_ROUTE = 16
+
+
+def split_http_route(route: Dict, max_rules: int = MAX_RULES_PER_ROUTE) -> List[Dict]:
+    """Split an HTTPRoute with more than ``max_rules`` rules into numbered routes.
+    
+    The first route keeps the name, the next ones get a ``-2``, ``-3``...
+    suffix. A route within the limit is returned unchanged (same object).
+    """
+    rules = route['spec']['rules']
+    if len(rules) <= max_rules:
+        return [route]
+    
+    routes = []
+    for chunk, index in enumerate(range(0, len(rules), max_rules)):
+        metadata = dict(route['metadata'])
+        if chunk:
+            metadata['name'] = f"{metadata['name']}-{chunk + 1}"
+        if 'labels' in metadata:
+            metadata['labels'] = dict(metadata['labels'])
+        spec = dict(route['spec'], rules=rules[index:index + max_rules])
+        if 'hostnames' in spec:
+            spec['hostnames'] = list(spec['hostnames'])
+        routes.append(dict(route, metadata=metadata, spec=spec))
+    return routes
+
+
+def consolidate_http_routes(routes: List[Dict], max_rules: int = MAX_RULES_PER_ROUTE) -> List[Dict]:
+    """Merge HTTPRoutes sharing namespace, hostnames and parentRefs into fewer routes.
+    
+    Routes are grouped through a dict index in a single pass, so the cost is
+    linear in the number of routes. The rules of a group are concatenated in
+    input order and split into routes of at most ``max_rules`` rules. The
+    first route of a group keeps its name, further chunks get a numbered
+    suffix; only labels common to all merged routes are kept. Routes that end
+    up alone are returned unchanged (same object).
+    """
+    groups = {}
+    taken = Counter()
+    for route in routes:
+        metadata = route['metadata']
+        spec = route['spec']
+        taken[metadata['namespace'], metadata['name']] += 1
+        key = (metadata['namespace'],
+               tuple(spec.get('hostnames') or ()),
+               tuple(tuple(sorted(ref.items())) for ref in spec.get('parentRefs') or ()))
+        groups.setdefault(key, []).append(route)
+    
+    consolidated = []
+    for group in groups.values():
+        first = group[0]
+        if len(group) == 1 and len(first['spec']['rules']) <= max_rules:
+            consolidated.append(first)
+            continue
+        
+        rules = [rule for route in group for rule in route['spec']['rules']]
+        labels = first['metadata'].get('labels')
+        for route in group[1:]:
+            if labels and route['metadata'].get('labels') != labels:
+                other = route['metadata'].get('labels') or {}
+                labels = {k: v for k, v in labels.items() if other.get(k) == v}
+        
+        namespace = first['metadata']['namespace']
+        base_name = first['metadata']['name']
+        # The merged routes give their names back, so split routes keep theirs
+        taken.subtract((namespace, route['metadata']['name']) for route in group)
+        for chunk, index in enumerate(range(0, len(rules), max_rules)):
+            name = base_name
+            if chunk:
+                suffix = chunk + 1
+                name = f"{base_name}-{suffix}"
+                while taken[namespace, name] > 0:
+                    suffix += 1
+                    name = f"{base_name}-{suffix}"
+            taken[namespace, name] += 1
+            
+            metadata = {'name': name, 'namespace': namespace}
+            if labels:
+                metadata['labels'] = labels
+            spec = {'parentRefs': first['spec']['parentRefs'],
+                    'rules': rules[index:index + max_rules]}
+            if 'hostnames' in first['spec']:
+                spec['hostnames'] = first['spec']['hostnames']
+            consolidated.append({
+                'apiVersion': first['apiVersion'],
+                'kind': first['kind'],
+                'metadata': metadata,
+                'spec': spec,
+            })
+    return consolidated
+
+
+class ConsolidatingWriter:
+    """Collects HTTPRoutes and writes them consolidated when closed.
+    
+    Consolidation needs the whole set of routes, so this trades the flat
+    memory profile of the streaming writers for fewer output objects.
+    Routes left unchanged are written from their pre-serialized text.
+    """
+    
+    def __init__(self, writer: YamlStreamWriter, max_rules: int = MAX_RULES_PER_ROUTE):
+        self.writer = writer
+        self.max_rules = max_rules
+        self.collected = 0
+        self._routes = []
+    
+    @property
+    def filename(self) -> str:
+        return self.writer.filename
+    
+    @property
+    def count(self) -> int:
+        return self.writer.count
+    
+    def __len__(self) -> int:
+        return self.writer.count + len(self._routes)
+    
+    def append(self, doc: Dict) -> None:
+        self._routes.append((doc, None))
+    
+    def write_rendered(self, text: str, doc: Dict = None) -> None:
+        self._routes.append((doc, text))
+    
+    def close(self) -> None:
+        """Consolidate the collected routes and write them out"""
+        texts = {id(doc): text for doc, text in self._routes}
+        routes = consolidate_http_routes([doc for doc, _ in self._routes], self.max_rules)
+        for route in routes:
+            text = texts.get(id(route))
+            if text is None:
+                self.writer.append(route)
+            else:
+                self.writer.write_rendered(text, route)
+        self.collected += len(self._routes)
+        self._routes = []
+        self.writer.close()
+
+
+class _PathNode:
+    __slots__ = ('children', 'prefixes', 'exacts')
+    
+    def __init__(self):
+        self.children = {}
+        self.prefixes = None
+        self.exacts = None
+
+
+class RouteConflictDetector:
+    """Finds overlapping path matches across generated HTTPRoutes.
+    
+    Every match is inserted in a per-hostname trie of path segments, then a
+    single traversal reports, in time linear in the number of paths:
+    
+    - ``duplicate``: the same host and path matched by several routes with the
+      same backends
+    - ``conflicting-backends``: the same host and path sent to different
+      backends by different routes
+    - ``shadowed-prefix``: a ``PathPrefix`` of one route partially taken over by
+      a longer ``PathPrefix`` of another route (nearest enclosing prefix only)
+    - ``exact-over-prefix``: an ``Exact`` path of one route inside a
+      ``PathPrefix`` of another route, which loses that path (nearest
+      enclosing prefix only)
+    - ``shadowed-host``: a hostname also matched by a wildcard hostname, or by
+      a route without hostnames, of other routes; the more specific hostname
+      takes that host over
+    """
+    
+    def __init__(self):
+        self._tries = {}
+        self._host_routes = defaultdict(set)
+        self.paths = 0
+    
+    def observe(self, kind: str, doc: Dict, text: str = None) -> None:
+        if kind == 'HTTPRoute':
+            self.add(doc)
+    
+    def add(self, route: Dict) -> None:
+        """Index all path matches of an HTTPRoute"""
+        metadata = route.get('metadata', {})
+        route_id = f"{metadata.get('namespace', 'default')}/{metadata.get('name')}"
+        spec = route.get('spec', {})
+        hostnames = [h.lower() for h in spec.get('hostnames') or ['*']]
+        
+        for rule in spec.get('rules') or []:
+            backends = tuple(sorted((str(b.get('name')), str(b.get('port')))
+                                    for b in rule.get('backendRefs') or []))
+            entry = (route_id, backends)
+            for match in rule.get('matches') or [{}]:
+                path = match.get('path') or {}
+                value = path.get('value', '/')
+                match_type = path.get('type', 'PathPrefix')
+                for hostname in hostnames:
+                    self._host_routes[hostname].add(route_id)
+                    node = self._tries.get(hostname)
+                    if node is None:
+                        node = self._tries[hostname] = _PathNode()
+                    for segment in value.split('/'):
+                        if segment:
+                            child = node.children.get(segment)
+                            if child is None:
+                                child = node.children[segment] = _PathNode()
+                            node = child
+                    self.paths += 1
+                    if match_type == 'Exact':
+                        if node.exacts is None:
+                            node.exacts = {}
+                        node.exacts.setdefault(value, []).append(entry)
+                    elif match_type == 'PathPrefix':
+                        if node.prefixes is None:
+                            node.prefixes = []
+                        node.prefixes.append(entry)
+    
+    @staticmethod
+    def _overlaps(hostname: str, match_type: str, path: str, entries: List) -> Optional[Dict]:
+        routes = sorted({route_id for route_id, _ in entries})
+        if len(routes) < 2:
+            return None
+        backends = {b for _, b in entries}
+        return {
+            'type': 'conflicting-backends' if len(backends) > 1 else 'duplicate',
+            'hostname': hostname,
+            'match': match_type,
+            'path': path,
+            'routes': routes,
+            'backends': sorted(f"{name}:{port}" for backend in backends for name, port in backend),
+        }
+    
+    def _wildcards(self, hostname: str) -> Iterator[str]:
+        """Indexed wildcard hostnames matching ``hostname``, most specific first"""
+        if hostname == '*':
+            return
+        labels = hostname.split('.')
+        for i in range(1, len(labels)):
+            wildcard = '*.' + '.'.join(labels[i:])
+            if wildcard != hostname and wildcard in self._host_routes:
+                yield wildcard
+        yield '*'
+    
+    def report(self) -> List[Dict]:
+        """Return all findings, sorted by hostname and path"""
+        findings = []
+        for hostname in sorted(self._tries):
+            routes = sorted(self._host_routes[hostname])
+            for wildcard in self._wildcards(hostname):
+                shadowed = sorted(self._host_routes[wildcard] - self._host_routes[hostname])
+                if shadowed:
+                    findings.append({
+                        'type': 'shadowed-host',
+                        'hostname': hostname,
+                        'routes': routes,
+                        'shadowed_hostname': wildcard,
+                        'shadowed_routes': shadowed,
+                    })
+            
+            # Iterative DFS carrying the nearest enclosing prefix (path, routes)
+            stack = [(self._tries[hostname], '/', None)]
+            while stack:
+                node, path, enclosing = stack.pop()
+                
+                if node.exacts:
+                    # A prefix on the same node covers the exact paths as well
+                    covering = enclosing
+                    if node.prefixes:
+                        covering = (path, sorted({route_id for route_id, _ in node.prefixes}))
+                    for value in sorted(node.exacts):
+                        entries = node.exacts[value]
+                        finding = self._overlaps(hostname, 'Exact', value, entries)
+                        if finding:
+                            findings.append(finding)
+                        if covering is not None:
+                            routes = sorted({route_id for route_id, _ in entries})
+                            shadowed = [r for r in covering[1] if r not in routes]
+                            if shadowed:
+                                findings.append({
+                                    'type': 'exact-over-prefix',
+                                    'hostname': hostname,
+                                    'match': 'Exact',
+                                    'path': value,
+                                    'routes': routes,
+                                    'shadowed_path': covering[0],
+                                    'shadowed_routes': shadowed,
+                                })
+                
+                if node.prefixes:
+                    finding = self._overlaps(hostname, 'PathPrefix', path, node.prefixes)
+                    if finding:
+                        findings.append(finding)
+                    routes = sorted({route_id for route_id, _ in node.prefixes})
+                    if enclosing is not None:
+                        shadowed = [r for r in enclosing[1] if r not in routes]
+                        if shadowed:
+                            findings.append({
+                                'type': 'shadowed-prefix',
+                                'hostname': hostname,
+                                'match': 'PathPrefix',
+                                'path': path,
+                                'routes': routes,
+                                'shadowed_path': enclosing[0],
+                                'shadowed_routes': shadowed,
+                            })
+                    enclosing = (path, routes)
+                
+                for segment in sorted(node.children, reverse=True):
+                    child_path = f"{path.rstrip('/')}/{segment}"
+                    stack.append((node.children[segment], child_path, enclosing))
+        return findings
+
+
+def route_key(kind: str, doc: Dict) -> Tuple[str, str, str]:
+    """Identity of a generated route: (kind, namespace, name)"""
+    metadata = doc.get('metadata') or {}
+    return kind, metadata.get('namespace', 'default'), metadata.get('name')
+
+
+def route_digest(doc: Dict) -> bytes:
+    """Content digest of a route, independent of key order and formatting"""
+    import hashlib
+    import json
+    
+    return hashlib.sha256(json.dumps(doc, sort_keys=True, separators=(',', ':')).encode()).digest()
+
+
+class RouteDiff:
+    """Compares generated routes with the output of a previous run.
+    
+    Previous HTTPRoutes and TLSRoutes are read from every YAML, JSON or NDJSON
+    file of ``previous_dir`` into an index of (kind, namespace, name) to
+    content digests, so only a key and 32 bytes are kept per object. New routes
+    are streamed through ``observe`` and written to ``added`` or ``changed``
+    manifests in ``output_dir``, in the format of ``writer_class``; whatever is
+    left in the index on ``close`` is written to the ``deleted`` manifest.
+    """
+    
+    KINDS = ('HTTPRoute', 'TLSRoute')
+    OUTPUTS = ('added', 'changed', 'deleted')
+    
+    def __init__(self, previous_dir: str, output_dir: str, loader: type = None, dumper: type = None,
+                 writer_class: type = YamlStreamWriter):
+        self.previous_dir = previous_dir
+        self.output_dir = output_dir
+        self.previous = {}
+        self.unchanged = 0
+        self._load_previous(loader or resolve_yaml_backend()[1])
+        
+        os.makedirs(output_dir, exist_ok=True)
+        # Never leave manifests of an older diff next to the new ones
+        for name in self.OUTPUTS:
+            for route_writer, _ in OUTPUT_FORMATS.values():
+                path = os.path.join(output_dir, f"{name}.{route_writer.extension}")
+                if os.path.exists(path):
+                    os.remove(path)
+        self.added, self.changed, self.deleted = (
+            writer_class(os.path.join(output_dir, f"{name}.{writer_class.extension}"),
+                         dumper=dumper)
+            for name in self.OUTPUTS)
+    
+    def _load_previous(self, loader: type) -> None:
+        if not os.path.isdir(self.previous_dir):
+            raise ValueError(f"Previous output directory not found: {self.previous_dir}")
+        extensions = tuple(e for formats in INPUT_FORMATS.values() for e in formats)
+        for name in sorted(os.listdir(self.previous_dir)):
+            if not name.endswith(extensions):
+                continue
+            for doc in iter_manifest_documents(os.path.join(self.previous_dir, name), loader):
+                if isinstance(doc, dict) and doc.get('kind') in self.KINDS:
+                    key = route_key(doc['kind'], doc)
+                    entry = self.previous.setdefault(key, (doc.get('apiVersion'), []))
+                    entry[1].append(route_digest(doc))
+    
+    def observe(self, kind: str, doc: Dict, text: str = None) -> None:
+        """Classify a generated route as added, changed or unchanged"""
+        key = route_key(kind, doc)
+        previous = self.previous.get(key)
+        if previous is None:
+            writer = self.added
+        else:
+            # Names are not always unique in the output: match identical content first
+            digests = previous[1]
+            digest = route_digest(doc)
+            if digest in digests:
+                digests.remove(digest)
+                writer = None
+            else:
+                digests.pop(0)
+                writer = self.changed
+            if not digests:
+                del self.previous[key]
+            if writer is None:
+                self.unchanged += 1
+                return
+        if text is None:
+            writer.append(doc)
+        else:
+            writer.write_rendered(text, doc)
+    
+    def close(self, complete: bool = True) -> Dict[str, int]:
+        """Write the deleted routes and return the summary counts.
+        
+        Deletions are only known once every route has been observed, so they
+        are not written for an incomplete run.
+        """
+        if complete:
+            for (kind, namespace, name), (api_version, digests) in sorted(self.previous.items()):
+                for _ in digests:
+                    self.deleted.append({
+                        'apiVersion': api_version,
+                        'kind': kind,
+                        'metadata': {'name': name, 'namespace': namespace},
+                    })
+        self.previous = {}
+        for writer in (self.added, self.changed, self.deleted):
+            writer.close()
+        return {
+            'added': self.added.count,
+            'changed': self.changed.count,
+            'deleted': self.deleted.count,
+            'unchanged': self.unchanged,
+        }
+
+
+class ObservedWriter:
+    """Passes every document written to a writer on to an observer"""
+    
+    def __init__(self, writer: YamlStreamWriter, kind: str, observer):
+        self.writer = writer
+        self.kind = kind
+        self.observer = observer
+    
+    @property
+    def filename(self) -> str:
+        return self.writer.filename
+    
+    @property
+    def count(self) -> int:
+        return self.writer.count
+    
+    def __len__(self) -> int:
+        return len(self.writer)
+    
+    def append(self, doc: Dict) -> None:
+        self.write_rendered(self.writer.render(doc), doc)
+    
+    def write_rendered(self, text: str, doc: Dict = None) -> None:
+        self.writer.write_rendered(text, doc)
+        self.observer.observe(self.kind, doc, text)
+    
+    def close(self) -> None:
+        self.writer.close()
+
+
+class WatchedIngress(NamedTuple):
+    """Index entry of an Ingress followed by ``IngressWatcher``"""
+    namespace: str
+    name: str
+    # (kind, name) of the generated routes
+    routes: Tuple[Tuple[str, str], ...]
+    # Output file -> documents this Ingress contributes to it
+    files: Dict[str, List[str]]
+
+
+class IngressWatcher:
+    """Keeps a directory of routes in step with a stream of Ingress events.
+    
+    Every route is written to its own ``<namespace>/<kind>-<name>`` file and
+    failures to ``<namespace>/failed-<ingress>``. ``index`` maps each Ingress
+    UID to the routes and files it produced, so an event only re-migrates
+    that Ingress and rewrites the files whose content changed, however many
+    Ingresses are watched.
+    
+    The directory must be empty unless ``clean`` is set, in which case the
+    route and failure files left by an earlier run are removed first; no
+    other file is touched. An Ingress whose namespace, name or route names
+    are not DNS-1123 names is rejected, leaving the directory unchanged, and
+    the reason is appended to ``rejected``.
+    """
+    
+    PREFIXES = ('httproute-', 'tlsroute-', 'failed-')
+    
+    def __init__(self, migrator: 'IngressMigrator', directory: str, namespaces: List[str] = None,
+                 clean: bool = False):
+        self.migrator = migrator
+        self.directory = directory
+        self.namespaces = set(namespaces) if namespaces else None
+        self.extension = migrator.route_writer.extension
+        self.index: Dict[str, WatchedIngress] = {}
+        # Output file -> {uid: documents}, for routes generated by several Ingresses
+        self._owners = defaultdict(dict)
+        self.events = 0
+        self.rejected: List[str] = []
+        
+        os.makedirs(directory, exist_ok=True)
+        if not clean:
+            if os.listdir(directory):
+                raise ValueError(f"Watch directory {directory} is not empty "
+                                 "(use --clean to replace its routes)")
+            return
+        extensions = tuple(f".{writer.extension}" for writer, _ in OUTPUT_FORMATS.values())
+        for entry in os.scandir(directory):
+            if entry.is_dir():
+                for name in os.listdir(entry.path):
+                    if name.startswith(self.PREFIXES) and name.endswith(extensions):
+                        os.remove(os.path.join(entry.path, name))
+    
+    @staticmethod
+    def uid(ingress: Dict) -> str:
+        metadata = ingress.get('metadata') or {}
+        return (metadata.get('uid')
+                or f"{metadata.get('namespace', 'default')}/{metadata.get('name')}")
+    
+    def _watched(self, ingress: Dict) -> bool:
+        return (self.namespaces is None
+                or (ingress.get('metadata') or {}).get('namespace', 'default') in self.namespaces)
+    
+    def apply(self, event: Dict) -> Tuple[int, int]:
+        """Apply one watch event; returns the number of files written and removed"""
+        self.events += 1
+        self.migrator._count('watch_events')
+        kind = event.get('type')
+        if kind == 'SYNC':
+            return self.sync(event.get('objects') or [])
+        ingress = event.get('object') or {}
+        if not self._watched(ingress):
+            return 0, 0
+        if kind in ('ADDED', 'MODIFIED'):
+            return self._update_checked(self.uid(ingress), ingress)
+        if kind == 'DELETED':
+            return self._update(self.uid(ingress), None)
+        raise ValueError(f"Unknown watch event type '{kind}'")
+    
+    def sync(self, ingresses: List[Dict]) -> Tuple[int, int]:
+        """Replace the watched state with a full list of Ingresses"""
+        written = removed = 0
+        seen = set()
+        for ingress in ingresses:
+            if self._watched(ingress):
+                uid = self.uid(ingress)
+                seen.add(uid)
+                w, r = self._update_checked(uid, ingress)
+                written, removed = written + w, removed + r
+        for uid in [uid for uid in self.index if uid not in seen]:
+            w, r = self._update(uid, None)
+            written, removed = written + w, removed + r
+        return written, removed
+    
+    def _path(self, namespace: Any, prefix: str, name: Any) -> str:
+        # Names from the event become paths: only DNS-1123 names stay inside the directory
+        if not (isinstance(namespace, str) and len(namespace) <= 63
+                and _NAMESPACE_RE.match(namespace)
+                and isinstance(name, str) and len(name) <= 253 and _OBJECT_NAME_RE.match(name)):
+            raise ValueError(f"invalid namespace or name '{namespace}/{name}'")
+        return os.path.join(self.directory, namespace, f"{prefix}{name}.{self.extension}")
+    
+    def _update_checked(self, uid: str, ingress: Dict) -> Tuple[int, int]:
+        try:
+            return self._update(uid, ingress)
+        except ValueError as e:
+            self.rejected.append(f"{uid}: {e}")
+            self.migrator._count('watch_rejected')
+            return 0, 0
+    
+    def _update(self, uid: str, ingress: Optional[Dict]) -> Tuple[int, int]:
+        files = {}
+        if ingress is not None:
+            batch = self.migrator.render_ingress(ingress)
+            routes = []
+            for kind, rendered in (('HTTPRoute', batch.http_routes),
+                                   ('TLSRoute', batch.tls_routes)):
+                for doc, text in rendered:
+                    metadata = doc['metadata']
+                    routes.append((kind, metadata['name']))
+                    filename = self._path(metadata['namespace'], f"{kind.lower()}-",
+                                          metadata['name'])
+                    files.setdefault(filename, []).append(text)
+            metadata = ingress.get('metadata') or {}
+            namespace, name = metadata.get('namespace', 'default'), metadata.get('name', 'unnamed')
+            failed = self._path(namespace, 'failed-', name)
+            for _, text in batch.failures:
+                files.setdefault(failed, []).append(text)
+        
+        old = self.index.pop(uid, None)
+        if ingress is not None:
+            self.index[uid] = WatchedIngress(namespace, name, tuple(routes), files)
+        old_files = old.files if old is not None else {}
+        written = removed = 0
+        for filename in old_files.keys() | files.keys():
+            if old_files.get(filename) == files.get(filename):
+                continue
+            owners = self._owners[filename]
+            if filename in files:
+                owners[uid] = files[filename]
+            else:
+                owners.pop(uid, None)
+            if owners:
+                self._write(filename, owners.values())
+                written += 1
+            else:
+                del self._owners[filename]
+                try:
+                    os.remove(filename)
+                except FileNotFoundError:
+                    pass
+                removed += 1
+        return written, removed
+    
+    def _write(self, filename: str, contributions) -> None:
+        """Atomically replace a file with the documents of all its owners"""
+        failed = os.path.basename(filename).startswith('failed-')
+        writer_class = self.migrator.failed_writer if failed else self.migrator.route_writer
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        writer = writer_class(f"{filename}.tmp", dumper=self.migrator._output_dumper)
+        for documents in contributions:
+            for text in documents:
+                writer.write_rendered(text)
+        writer.close()
+        os.replace(f"{filename}.tmp", filename)
+
+
+class RenderedBatch(NamedTuple):
+    """Converted and serialized results for one or more Ingresses.
+    
+    Each entry of ``http_routes``, ``tls_routes`` and ``failures`` is a
+    ``(document, text)`` pair, ``text`` being the exact serialized output.
+    """
+    loaded: int
+    cache_hits: int
+    http_routes: List[Tuple[Dict, str]]
+    tls_routes: List[Tuple[Dict, str]]
+    failures: List[Tuple[Dict, str]]
+    stats: Optional[Dict[str, Any]] = None
+    
+    def merge(self, other: 'RenderedBatch') -> 'RenderedBatch':
+        self.http_routes.extend(other.http_routes)
+        self.tls_routes.extend(other.tls_routes)
+        self.failures.extend(other.failures)
+        return self._replace(loaded=self.loaded + other.loaded,
+                             cache_hits=self.cache_hits + other.cache_hits)
+
+
+class MigrationCache:
+    """Persistent on-disk cache of migration results keyed by Ingress content.
+    
+    The key hashes the normalized Ingress together with the migrator settings
+    and the source of this script, so any change to the input, the gateway
+    configuration or the conversion code produces a miss. Entries hold the
+    pre-serialized output and are evicted least-recently-used first once the
+    cache grows over ``max_bytes``.
+    """
+    
+    DEFAULT_MAX_BYTES = 512 << 20
+    
+    def __init__(self, directory: str, salt: str = '', max_bytes: int = DEFAULT_MAX_BYTES):
+        import hashlib
+        
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        with open(os.path.abspath(__file__), 'rb') as f:
+            code_hash = hashlib.sha256(f.read()).hexdigest()
+        self._salt = f"{code_hash}:{salt}".encode()
+    
+    def key(self, ingress: Dict) -> Optional[str]:
+        """Content hash of a normalized Ingress, or None (a miss) if it cannot be normalized"""
+        import hashlib
+        import json
+        
+        digest = hashlib.sha256(self._salt)
+        try:
+            # Keys of mixed types cannot be sorted, and YAML aliases can make cycles
+            normalized = json.dumps(ingress, sort_keys=True, separators=(',', ':'), default=str)
+        except (TypeError, ValueError):
+            self.misses += 1
+            return None
+        digest.update(normalized.encode())
+        return digest.hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+    
+    def get(self, key: str) -> Optional[Tuple[List, List, List]]:
+        """Return the cached ``(http_routes, tls_routes, failures)`` or None"""
+        import json
+        
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return tuple([tuple(pair) for pair in entry[kind]] for kind in ('http', 'tls', 'failed'))
+    
+    def put(self, key: str, rendered: Tuple[List, List, List]) -> None:
+        """Store results atomically; failures to write are ignored"""
+        import json
+        
+        path = self._path(key)
+        entry = dict(zip(('http', 'tls', 'failed'), rendered))
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(entry, f, separators=(',', ':'), default=str)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits ``max_bytes``"""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+
+class MigrationCheckpoint:
+    """Progress of a run over one input file, saved so that it can be resumed.
+    
+    The file holds the number of input documents whose results are on disk,
+    a digest of those documents and the size and document count of every
+    output at that point. It is replaced atomically, so an interrupted run
+    always leaves a consistent checkpoint behind.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, filename: str, every: int = 1000):
+        self.filename = filename
+        self.every = every
+        self.saves = 0
+    
+    def load(self) -> Dict[str, Any]:
+        import json
+        
+        with open(self.filename, 'r') as f:
+            state = json.load(f)
+        if state.get('version') != self.VERSION:
+            raise ValueError(f"Unsupported checkpoint version in {self.filename}")
+        return state
+    
+    def save(self, state: Dict[str, Any]) -> None:
+        import json
+        
+        tmp = f"{self.filename}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(state, f, indent=2)
+            f.write('\n')
+        os.replace(tmp, self.filename)
+        self.saves += 1
+    
+    def remove(self) -> None:
+        try:
+            os.remove(self.filename)
+        except FileNotFoundError:
+            pass
+
+
+_DNS_LABEL = r'[a-z0-9]([-a-z0-9]*[a-z0-9])?'
+_DNS_SUBDOMAIN = rf'{_DNS_LABEL}(\.{_DNS_LABEL})*'
+_OBJECT_NAME_RE = re.compile(rf'{_DNS_SUBDOMAIN}\Z')
+_NAMESPACE_RE = re.compile(rf'{_DNS_LABEL}\Z')
+_HOSTNAME_RE = re.compile(rf'(\*\.)?{_DNS_SUBDOMAIN}\Z')
+# Exact and PathPrefix values: absolute, without '//', '/./', '/../', '%2f' or '#'
+_ABSOLUTE_PATH_RE = re.compile(r'/(?!.*(//|/\.{1,2}/|%2[fF]|#))(?!.*/\.{1,2}$)')
+
+# Limits of the Gateway API CRDs (v1.1) that generated routes are checked against
+MAX_PARENT_REFS = 32
+MAX_HOSTNAMES = 16
+MAX_ROUTE_RULES = 16
+MAX_RULE_MATCHES = 64
+MAX_BACKEND_REFS = 16
+MAX_RULE_FILTERS = 16
+MAX_PATH_LENGTH = 1024
+PATH_MATCH_TYPES = ('Exact', 'PathPrefix', 'RegularExpression')
+
+
+class RouteValidator:
+    """Checks generated routes against the Gateway API CRD rules they could break.
+    
+    Only what the migrator can get wrong is checked: object names and
+    hostnames, list bounds, ports, backend names, path matches, and the CRD
+    rule that a prefix rewrite needs a single PathPrefix match. Errors read
+    ``<kind> <name>: spec.rules[0].backendRefs[0].port: <message>``.
+    
+    The parentRefs and TLS rules every route shares are built from the
+    migrator settings; with ``templates=False`` they are left to
+    ``check_parent_refs`` and ``check_tls_rules``, called once.
+    """
+    
+    def __init__(self, templates: bool = True):
+        self.templates = templates
+        self._spec_checks = {'HTTPRoute': self._check_http_spec, 'TLSRoute': self._check_tls_spec}
+    
+    def validate(self, routes: List[Dict]) -> Optional[str]:
+        """Return the first error found in ``routes``, or None"""
+        for route in routes:
+            error = self.check(route)
+            if error:
+                return error
+        return None
+    
+    def check(self, route: Dict) -> Optional[str]:
+        """Return the error of one route, prefixed by its kind and name, or None"""
+        kind = route.get('kind')
+        check_spec = self._spec_checks.get(kind)
+        if check_spec is None:
+            return f"{kind}: Unsupported kind"
+        metadata = route.get('metadata')
+        name = metadata.get('name') if isinstance(metadata, dict) else None
+        error = (_required(route, ('apiVersion', 'metadata', 'spec'), '')
+                 or self._check_metadata(metadata)
+                 or _check_type(route['spec'], dict, 'spec')
+                 or check_spec(route['spec']))
+        return f"{kind} {name}: {error}" if error else None
+    
+    @staticmethod
+    def _check_metadata(metadata: Dict) -> Optional[str]:
+        error = (_check_type(metadata, dict, 'metadata')
+                 or _required(metadata, ('name',), 'metadata.'))
+        if error:
+            return error
+        error = _check_string(metadata['name'], 'metadata.name', 253, _OBJECT_NAME_RE)
+        if error or 'namespace' not in metadata:
+            return error
+        return _check_string(metadata['namespace'], 'metadata.namespace', 63, _NAMESPACE_RE)
+    
+    def _check_common_spec(self, spec: Dict) -> Optional[str]:
+        if self.templates and 'parentRefs' in spec:
+            error = self.check_parent_refs(spec['parentRefs'])
+            if error:
+                return error
+        hostnames = spec.get('hostnames', ())
+        error = _check_list(hostnames, 'spec.hostnames', MAX_HOSTNAMES)
+        if error:
+            return error
+        for index, hostname in enumerate(hostnames):
+            error = _check_string(hostname, f"spec.hostnames[{index}]", 253, _HOSTNAME_RE)
+            if error:
+                return error
+        return None
+    
+    def _check_http_spec(self, spec: Dict) -> Optional[str]:
+        error = self._check_common_spec(spec)
+        if error:
+            return error
+        rules = spec.get('rules', ())
+        error = _check_list(rules, 'spec.rules', MAX_ROUTE_RULES)
+        if error:
+            return error
+        for index, rule in enumerate(rules):
+            error = self._check_http_rule(rule, f"spec.rules[{index}]")
+            if error:
+                return error
+        return None
+    
+    @staticmethod
+    def _check_http_rule(rule: Dict, path: str) -> Optional[str]:
+        error = _check_type(rule, dict, path)
+        if error:
+            return error
+        matches = rule.get('matches', ())
+        filters = rule.get('filters', ())
+        error = (_check_list(matches, f"{path}.matches", MAX_RULE_MATCHES)
+                 or _check_backend_refs(rule.get('backendRefs', ()), f"{path}.backendRefs")
+                 or _check_list(filters, f"{path}.filters", MAX_RULE_FILTERS))
+        if error:
+            return error
+        
+        for index, match in enumerate(matches):
+            error = _check_type(match, dict, f"{path}.matches[{index}]")
+            if error or 'path' not in match:
+                if error:
+                    return error
+                continue
+            error = _check_path_match(match['path'], f"{path}.matches[{index}].path")
+            if error:
+                return error
+        
+        prefix_rewrite = False
+        for index, rule_filter in enumerate(filters):
+            error = (_check_type(rule_filter, dict, f"{path}.filters[{index}]")
+                     or _required(rule_filter, ('type',), f"{path}.filters[{index}]."))
+            if error:
+                return error
+            rewrite = rule_filter.get('urlRewrite')
+            if rule_filter['type'] == 'URLRewrite' and isinstance(rewrite, dict):
+                prefix_rewrite |= (rewrite.get('path') or {}).get('type') == 'ReplacePrefixMatch'
+        single_prefix = (len(matches) == 1
+                         and (matches[0].get('path') or {}).get('type') == 'PathPrefix')
+        if prefix_rewrite and not single_prefix:
+            return (f"{path}: Invalid value: When using URLRewrite filter with "
+                    "path.replacePrefixMatch, exactly one PathPrefix match must be specified")
+        return None
+    
+    def _check_tls_spec(self, spec: Dict) -> Optional[str]:
+        error = self._check_common_spec(spec) or _required(spec, ('rules',), 'spec.')
+        if error or not self.templates:
+            return error
+        return self.check_tls_rules(spec['rules'])
+    
+    @staticmethod
+    def check_parent_refs(parent_refs: List[Dict], path: str = 'spec.parentRefs') -> Optional[str]:
+        """Check the references of a route to its Gateway"""
+        error = _check_list(parent_refs, path, MAX_PARENT_REFS, 1)
+        if error:
+            return error
+        for index, ref in enumerate(parent_refs):
+            ref_path = f"{path}[{index}]"
+            error = (_check_type(ref, dict, ref_path)
+                     or _required(ref, ('name',), f"{ref_path}.")
+                     or _check_string(ref['name'], f"{ref_path}.name", 253))
+            if not error and 'namespace' in ref:
+                error = _check_string(ref['namespace'], f"{ref_path}.namespace", 63, _NAMESPACE_RE)
+            if not error and 'sectionName' in ref:
+                error = _check_string(ref['sectionName'], f"{ref_path}.sectionName", 253,
+                                      _OBJECT_NAME_RE)
+            if not error and 'port' in ref:
+                error = _check_integer(ref['port'], f"{ref_path}.port", 1, 65535)
+            if error:
+                return error
+        return None
+    
+    @staticmethod
+    def check_tls_rules(rules: List[Dict], path: str = 'spec.rules') -> Optional[str]:
+        """Check the rules of a TLSRoute"""
+        error = _check_list(rules, path, MAX_ROUTE_RULES, 1)
+        if error:
+            return error
+        for index, rule in enumerate(rules):
+            rule_path = f"{path}[{index}]"
+            error = (_check_type(rule, dict, rule_path)
+                     or _required(rule, ('backendRefs',), f"{rule_path}.")
+                     or _check_backend_refs(rule['backendRefs'], f"{rule_path}.backendRefs", 1))
+            if error:
+                return error
+        return None
+
+
+def _check_type(value: Any, expected: type, path: str) -> Optional[str]:
+    if not isinstance(value, expected):
+        return f"{path}: Invalid value: {value!r}: must be of type {expected.__name__}"
+    return None
+
+
+def _required(obj: Dict, keys: Tuple[str, ...], prefix: str) -> Optional[str]:
+    for key in keys:
+        if key not in obj:
+            return f"{prefix}{key}: Required value"
+    return None
+
+
+def _check_string(value: Any, path: str, max_length: int, pattern=None) -> Optional[str]:
+    if not isinstance(value, str):
+        return f"{path}: Invalid value: {value!r}: must be of type str"
+    if not 1 <= len(value) <= max_length:
+        return f"{path}: Invalid value: {value!r}: must be 1 to {max_length} characters"
+    if pattern is not None and not pattern.match(value):
+        return f"{path}: Invalid value: {value!r}: must match '{pattern.pattern[:-2]}'"
+    return None
+
+
+def _check_integer(value: Any, path: str, minimum: int, maximum: int) -> Optional[str]:
+    # bool is an int subclass
+    if not isinstance(value, int) or isinstance(value, bool) or not minimum <= value <= maximum:
+        return (f"{path}: Invalid value: {value!r}: "
+                f"must be an integer between {minimum} and {maximum}")
+    return None
+
+
+def _check_list(value: Any, path: str, max_items: int, min_items: int = 0) -> Optional[str]:
+    if not isinstance(value, (list, tuple)):
+        return f"{path}: Invalid value: {value!r}: must be of type list"
+    if not min_items <= len(value) <= max_items:
+        return (f"{path}: Invalid value: {len(value)} items: "
+                f"must have {min_items} to {max_items} items")
+    return None
+
+
+def _check_backend_refs(backend_refs: Any, path: str, min_items: int = 0) -> Optional[str]:
+    error = _check_list(backend_refs, path, MAX_BACKEND_REFS, min_items)
+    if error:
+        return error
+    for index, ref in enumerate(backend_refs):
+        ref_path = f"{path}[{index}]"
+        error = (_check_type(ref, dict, ref_path)
+                 or _required(ref, ('name', 'port'), f"{ref_path}.")
+                 or _check_string(ref['name'], f"{ref_path}.name", 253)
+                 or _check_integer(ref['port'], f"{ref_path}.port", 1, 65535))
+        if not error and 'weight' in ref:
+            error = _check_integer(ref['weight'], f"{ref_path}.weight", 0, 1000000)
+        if error:
+            return error
+    return None
+
+
+def _check_path_match(match: Any, path: str) -> Optional[str]:
+    error = _check_type(match, dict, path)
+    if error:
+        return error
+    match_type = match.get('type', 'PathPrefix')
+    if match_type not in PATH_MATCH_TYPES:
+        return (f"{path}.type: Unsupported value: {match_type!r}: "
+                f"supported values: {', '.join(PATH_MATCH_TYPES)}")
+    value = match.get('value', '/')
+    if not isinstance(value, str) or len(value) > MAX_PATH_LENGTH:
+        return (f"{path}.value: Invalid value: {value!r}: "
+                f"must be at most {MAX_PATH_LENGTH} characters")
+    if match_type != 'RegularExpression' and not _ABSOLUTE_PATH_RE.match(value):
+        return (f"{path}: Invalid value: value must be an absolute path without "
+                "'//', '/./', '/../', '%2f' or '#'")
+    return None
+
+
+class IngressAnnotations(NamedTuple):
+    """Annotation values used by the route builders, extracted once per Ingress"""
+    unsupported: Tuple[str, ...] = ()
+    rewrite_target: Optional[str] = None
+    has_rewrite_target: bool = False
+    ssl_passthrough: Any = ''
+
+
+class AnnotationClassifier:
+    """Single-pass annotation classifier, built once per migrator.
+    
+    Every known key is mapped to its category and to the field of
+    ``IngressAnnotations`` it feeds, so classifying an Ingress costs one dict
+    lookup per annotation instead of prefix checks and list scans.
+    """
+    
+    SUPPORTED = 'supported'
+    UNSUPPORTED = 'unsupported'
+    UNKNOWN = 'unknown'
+    
+    PREFIX = 'nginx.ingress.kubernetes.io/'
+    
+    def __init__(self, supported: Dict[str, str], unsupported: List[str]):
+        self._categories = {key: self.SUPPORTED for key in supported}
+        self._categories.update((key, self.UNSUPPORTED) for key in unsupported)
+        # Annotations whose values the route builders need
+        self._fields = {
+            self.PREFIX + 'rewrite-target': 'rewrite',
+            self.PREFIX + 'ssl-passthrough': 'ssl-passthrough',
+        }
+    
+    def classify(self, key: str) -> str:
+        """Return whether an annotation is supported, unsupported or unknown"""
+        return self._categories.get(key, self.UNKNOWN)
+    
+    def extract(self, annotations: Dict[str, Any]) -> IngressAnnotations:
+        """Classify all annotations of an Ingress and pick out the relevant values"""
+        categories = self._categories
+        fields = self._fields
+        unsupported_category = self.UNSUPPORTED
+        unsupported = []
+        rewrite_target = None
+        has_rewrite_target = False
+        ssl_passthrough = ''
+        
+        for key, value in annotations.items():
+            if categories.get(key) == unsupported_category:
+                unsupported.append(key)
+            field = fields.get(key)
+            if field is None:
+                continue
+            if field == 'rewrite':
+                rewrite_target = value
+                has_rewrite_target = True
+            else:
+                ssl_passthrough = value
+        
+        return IngressAnnotations(tuple(unsupported), rewrite_target, has_rewrite_target,
+                                  ssl_passthrough)
+
+
+# Intermediate model shared by the route builders. Each Ingress is read once
+# into these tuples, which hold references to the original strings and lists.
+
+class IngressBackend(NamedTuple):
+    """Service backend of an Ingress path"""
+    name: Optional[str]
+    port: Any = 80
+    
+    @classmethod
+    def from_dict(cls, backend: Dict) -> Optional['IngressBackend']:
+        # Resource backends have no Gateway API equivalent
+        if 'service' not in backend:
+            return None
+        service = backend['service']
+        return cls(service.get('name'), service.get('port', {}).get('number', 80))
+
+
+class IngressPath(NamedTuple):
+    """HTTP path of an Ingress rule"""
+    path: str = '/'
+    path_type: str = 'Prefix'
+    backend: Optional[IngressBackend] = None
+    
+    @classmethod
+    def from_dict(cls, path: Dict) -> 'IngressPath':
+        path_value = path.get('path', '/')
+        path_type = path.get('pathType', 'Prefix')
+        return cls(path_value, path_type, IngressBackend.from_dict(path.get('backend', {})))
+
+
+class IngressRule(NamedTuple):
+    """Host rule of an Ingress"""
+    host: str = ''
+    paths: Tuple[IngressPath, ...] = ()
+    
+    @classmethod
+    def from_dict(cls, rule: Dict) -> 'IngressRule':
+        host = rule.get('host', '')
+        return cls(host, tuple(map(IngressPath.from_dict, rule.get('http', {}).get('paths', []))))
+
+
+class IngressTLS(NamedTuple):
+    """TLS entry of an Ingress"""
+    hosts: List[str] = ()
+    secret_name: Optional[str] = None
+    
+    @classmethod
+    def from_dict(cls, tls_config: Dict) -> 'IngressTLS':
+        return cls(tls_config.get('hosts', []), tls_config.get('secretName'))
+
+
+class IngressInfo(NamedTuple):
+    """The parts of an Ingress the route builders use.
+    
+    ``tls`` only holds entries of ssl-passthrough Ingresses, the only ones
+    turned into TLSRoutes.
+    """
+    name: str
+    namespace: str
+    labels: Optional[Dict[str, str]]
+    annotations: IngressAnnotations
+    rules: Tuple[IngressRule, ...] = ()
+    tls: Tuple[IngressTLS, ...] = ()
+    
+    @classmethod
+    def from_ingress(cls, ingress: Dict, annotations: IngressAnnotations,
+                     rules: List[Dict] = (), tls_configs: List[Dict] = ()) -> 'IngressInfo':
+        metadata = ingress.get('metadata', {})
+        return cls(metadata.get('name', 'unnamed'), metadata.get('namespace', 'default'),
+                   metadata.get('labels'), annotations,
+                   tuple(map(IngressRule.from_dict, rules)),
+                   tuple(IngressTLS.from_dict(tls_config) for tls_config in tls_configs or ()
+                         if annotations.ssl_passthrough.lower() == 'true'))
+
+
+class MigrationResult(NamedTuple):
+    """One item yielded by ``IngressMigrator.migrate_many``"""
+    # Source Ingress
+    ingress: Dict
+    # Generated HTTPRoute or TLSRoute, None when the Ingress could not be migrated
+    route: Optional[Dict] = None
+    reason: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.route is not None
+    
+    @property
+    def kind(self) -> Optional[str]:
+        return self.route['kind'] if self.route is not None else None
 
 
 class IngressMigrator:
@@ -40,183 +2492,780 @@ class IngressMigrator:
         'nginx.ingress.kubernetes.io/limit-rpm',
     ]
     
+    HTTPROUTE_API_VERSION = 'gateway.networking.k8s.io/v1'
+    TLSROUTE_API_VERSION = 'gateway.networking.k8s.io/v1alpha2'
+    
     def __init__(self, gateway_class: str, gateway_name: str = None, 
                  gateway_namespace: str = 'istio-system', gateway_port: int = None,
-                 gateway_section: str = None):
+                 gateway_section: str = None, yaml_backend: str = 'auto',
+                 cache_dir: str = None, cache_max_bytes: int = None,
+                 collect_stats: bool = False, input_format: str = 'yaml',
+                 output_format: str = 'yaml', validate: bool = True):
+        if input_format not in INPUT_FORMATS:
+            raise ValueError(f"Unknown input format '{input_format}' "
+                             f"(expected one of {', '.join(INPUT_FORMATS)})")
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format '{output_format}' "
+                             f"(expected one of {', '.join(OUTPUT_FORMATS)})")
         self.gateway_class = gateway_class
         self.gateway_name = gateway_name or gateway_class
         self.gateway_namespace = gateway_namespace
         self.gateway_port = gateway_port
         self.gateway_section = gateway_section
+        self._yaml_backend_name = yaml_backend
+        self._yaml = None
+        if yaml_backend not in ('auto', 'python') or 'yaml' in (input_format, output_format):
+            # Report an unknown or unavailable backend right away
+            self._resolve_yaml()
+        self.input_format = input_format
+        self.output_format = output_format
+        self.route_writer, self.failed_writer = OUTPUT_FORMATS[output_format]
+        self.annotation_classifier = AnnotationClassifier(self.SUPPORTED_ANNOTATIONS,
+                                                          self.UNSUPPORTED_ANNOTATIONS)
+        
+        # Substructures shared by every generated route. They are built once
+        # from the settings and referenced, never copied: only these two are
+        # shared, and routes stored on the migrator must be treated as read-only.
+        parent_ref = {
+            'name': self.gateway_name,
+            'namespace': self.gateway_namespace
+        }
+        if self.gateway_port:
+            parent_ref['port'] = self.gateway_port
+        if self.gateway_section:
+            parent_ref['sectionName'] = self.gateway_section
+        self._parent_refs = [parent_ref]
+        self._tls_rules = [{
+            'backendRefs': [{
+                'name': self.gateway_name,
+                'port': 443
+            }]
+        }]
+        # The shared parentRefs and TLS rules are checked once, not per route
+        self.validator = RouteValidator(templates=False) if validate else None
+        if self.validator is not None:
+            error = (self.validator.check_parent_refs(self._parent_refs)
+                     or self.validator.check_tls_rules(self._tls_rules))
+            if error:
+                raise ValueError(f"Invalid gateway reference: {error}")
         self.http_routes = []
         self.tls_routes = []
         self.failed_ingresses = []
+        # Writers opened by open_outputs, used instead of the lists above
+        self._http_output = None
+        self._tls_output = None
+        self._failed_output = None
+        self.stats = MigrationStats() if collect_stats else None
+        self.observers = []
+        self.cache = None
+        self.cache_hits = 0
+        if cache_dir:
+            self.cache = MigrationCache(cache_dir, self.cache_salt(),
+                                        cache_max_bytes or MigrationCache.DEFAULT_MAX_BYTES)
     
     def load_ingresses(self, filename: str) -> List[Dict]:
-        """Load Ingresses from a YAML file (supports both multi-doc and List formats)"""
-        try:
-            with open(filename, 'r') as f:
-                content = f.read()
-                docs = list(yaml.safe_load_all(content))
-                ingresses = []
-                
-                for doc in docs:
-                    if not doc:
-                        continue
-                    
-                    # Handle Kubernetes List format (kubectl get -o yaml)
-                    if doc.get('kind') == 'List' and 'items' in doc:
-                        list_items = doc['items']
-                        ingresses.extend([item for item in list_items if item.get('kind') == 'Ingress'])
-                    # Handle standard Ingress documents
-                    elif doc.get('kind') == 'Ingress':
-                        ingresses.append(doc)
+        """Load Ingresses from a YAML file (supports both multi-doc and List formats).
+        
+        Unreadable or invalid files raise ``OSError``, ``ValueError`` or
+        ``yaml.YAMLError``.
+        """
+        return list(self.iter_ingresses(filename))
+    
+    def iter_ingresses(self, filename: str) -> Iterator[Dict]:
+        """Yield Ingresses one at a time, parsing the file as a stream.
+        
+        Documents are read straight from the file handle, so only the
+        document being parsed is held in memory, never the whole dump.
+        Items of Kubernetes List documents are yielded individually. JSON
+        input (``kubectl get -o json``) is decoded as a whole by the C json
+        module, NDJSON one line at a time.
+        """
+        if self.input_format == 'json':
+            docs = self._load_json_file(filename)
+        else:
+            docs = self._load_segments(self.iter_segments(filename))
+        if self.stats is not None:
+            docs = self.stats.timed_iter(docs, 'load_ingresses')
+        for ingresses in docs:
+            self._count('docs_parsed')
+            yield from ingresses
+    
+    def load_file(self, filename: str) -> Tuple[List[Dict], int, int]:
+        """Read and parse a whole file: returns its Ingresses, documents parsed and size.
+        
+        Files that do not even contain the word ``Ingress`` are not parsed.
+        This touches no migrator state, so files can be loaded from threads.
+        """
+        with open(filename, 'rb') as f:
+            data = f.read()
+        if b'Ingress' not in data:
+            return [], 0, len(data)
+        
+        text = data.decode('utf-8')
+        if self.input_format == 'yaml':
+            found = self._load_segments(scan_segments(text.splitlines(keepends=True)))
+        else:
+            found = (list(self._ingresses_in(doc)) for doc in iter_json_documents(text))
+        
+        ingresses = []
+        docs = 0
+        for document_ingresses in found:
+            docs += 1
+            ingresses.extend(document_ingresses)
+        return ingresses, docs, len(data)
+    
+    def _count(self, name: str, value: int = 1) -> None:
+        if self.stats is not None:
+            self.stats.count(name, value)
+    
+    @staticmethod
+    def _ingresses_in(doc: Any, is_list_items: bool = False) -> Iterator[Dict]:
+        """Yield the Ingresses contained in a parsed document"""
+        if is_list_items:
+            for item in doc or []:
+                if isinstance(item, dict) and item.get('kind') == 'Ingress':
+                    yield item
+            return
+        if not isinstance(doc, dict):
+            return
+        
+        # Handle Kubernetes List format (kubectl get -o yaml)
+        if doc.get('kind') == 'List' and 'items' in doc:
+            for item in doc['items'] or []:
+                if isinstance(item, dict) and item.get('kind') == 'Ingress':
+                    yield item
+        # Handle standard Ingress documents
+        elif doc.get('kind') == 'Ingress':
+            yield doc
+    
+    def iter_segments(self, filename: str) -> Iterator[Tuple[bool, str]]:
+        """Yield raw, independently parseable chunks of the input file.
+        
+        Each chunk is ``(is_list_items, text)``: either a whole YAML document,
+        or a single item of a block-style ``kind: List`` document so that big
+        ``kubectl get -o yaml`` dumps can be parsed in parallel as well.
+        Documents that cannot hold an Ingress are counted and left out.
+        Regular YAML files are memory-mapped and only the kept ranges decoded.
+        A JSON file is decoded as a whole, so its chunks are the decoded
+        Ingress dicts themselves instead of text.
+        """
+        mapped = map_file(filename) if self.input_format == 'yaml' else None
+        if mapped is not None:
+            with mapped:
+                for is_list_items, start, end in self.iter_ranges(mapped):
+                    yield is_list_items, mapped[start:end].decode('utf-8')
+            return
+        
+        if self.input_format == 'json':
+            # Decoding is cheap next to conversion: hand Ingresses out one by one
+            for ingresses in self._load_json_file(filename):
+                for ingress in ingresses:
+                    yield False, ingress
+            return
+        
+        with open(filename, 'r') as f:
+            if self.input_format == 'ndjson':
+                segments = ((False, line if 'Ingress' in line else None)
+                            for line in f if line.strip())
+            else:
+                segments = scan_segments(f)
+            for is_list_items, text in segments:
+                if text is None:
+                    self._count('docs_skipped')
+                else:
+                    yield is_list_items, text
+            self._count('bytes_read', os.fstat(f.fileno()).st_size)
+    
+    def iter_ranges(self, mapped) -> Iterator[Tuple[bool, int, int]]:
+        """Yield ``(is_list_items, start, end)`` byte ranges of a mapped YAML file worth parsing"""
+        for is_list_items, start, end, keep in scan_ranges(mapped):
+            if keep:
+                yield is_list_items, start, end
+            else:
+                self._count('docs_skipped')
+        self._count('bytes_read', len(mapped))
+    
+    def _load_segments(self, segments: Iterator[Tuple[bool, str]]) -> Iterator[List[Dict]]:
+        """Parse segments, yielding the Ingresses found in each document"""
+        import json
+        
+        for is_list_items, text in segments:
+            if text is None:
+                continue
+            if self.input_format == 'yaml':
+                import yaml
                 
-                return ingresses
-        except Exception as e:
-            print(f"Error loading file: {e}", file=sys.stderr)
-            sys.exit(1)
+                docs = yaml.load_all(text, Loader=self.yaml_loader)
+            elif isinstance(text, dict):
+                # Already decoded by iter_segments
+                docs = (text,)
+            else:
+                docs = (json.loads(text),)
+            for doc in docs:
+                yield list(self._ingresses_in(doc, is_list_items))
+    
+    def _load_json_file(self, filename: str) -> Iterator[List[Dict]]:
+        with open(filename, 'r') as f:
+            text = f.read()
+            self._count('bytes_read', os.fstat(f.fileno()).st_size)
+        for doc in iter_json_documents(text):
+            yield list(self._ingresses_in(doc))
     
     def check_annotations(self, ingress: Dict) -> Tuple[bool, List[str]]:
         """Vérifie si les annotations sont supportées"""
-        annotations = ingress.get('metadata', {}).get('annotations', {})
-        unsupported = []
-        
-        for anno in annotations.keys():
-            if anno.startswith('nginx.ingress.kubernetes.io/'):
-                if anno in self.UNSUPPORTED_ANNOTATIONS:
-                    unsupported.append(anno)
-        
+        unsupported = list(self.extract_annotations(ingress).unsupported)
         return len(unsupported) == 0, unsupported
     
+    @_timed('check_annotations')
+    def extract_annotations(self, ingress: Dict) -> IngressAnnotations:
+        """Classify the annotations of an Ingress in a single pass"""
+        annotations = ingress.get('metadata', {}).get('annotations', {})
+        return self.annotation_classifier.extract(annotations)
+    
     def migrate_ingress(self, ingress: Dict) -> None:
         """Migre un Ingress vers HTTPRoute/TLSRoute"""
+        http_routes, tls_routes, failures = self.convert_ingress(ingress)
+        if self._http_output is not None:
+            http_sink, tls_sink, failed_sink = self._outputs()
+        else:
+            http_sink, tls_sink, failed_sink = (self.http_routes, self.tls_routes,
+                                                self.failed_ingresses)
+        for http_route in http_routes:
+            http_sink.append(http_route)
+        for tls_route in tls_routes:
+            tls_sink.append(tls_route)
+        for failure in failures:
+            failed_sink.append(failure)
+    
+    def convert_ingress(self, ingress: Dict) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+        """Convert one Ingress without touching the migrator state.
+        
+        Returns the generated HTTPRoutes, TLSRoutes and failure records.
+        """
+        http_routes, tls_routes, failures = self._convert_ingress(ingress)
+        if self.stats is not None:
+            self.stats.count('ingresses')
+            self.stats.record_results(len(http_routes), len(tls_routes), failures)
+        return http_routes, tls_routes, failures
+    
+    def migrate_many(self, ingresses: Iterable[Dict]) -> Iterator[MigrationResult]:
+        """Lazily convert Ingresses into a stream of ``MigrationResult``.
+        
+        Each Ingress yields one result per generated HTTPRoute and TLSRoute,
+        or a single failure carrying the reason, and nothing is kept on the
+        migrator. Conversion only reads the migrator settings, so one migrator
+        can serve many threads or event-loop tasks at once. Every yielded
+        route owns all of its substructures and can be modified freely.
+        """
+        if self.stats is not None:
+            # Phase timers and counters are not thread-safe
+            raise ValueError("migrate_many() cannot be used on a migrator collecting statistics")
+        return self._iter_results(ingresses)
+    
+    def _iter_results(self, ingresses: Iterable[Dict]) -> Iterator[MigrationResult]:
+        for ingress in ingresses:
+            http_routes, tls_routes, failures = self._convert_ingress(ingress)
+            for route in itertools.chain(http_routes, tls_routes):
+                yield MigrationResult(ingress, self._unshare(route))
+            for failure in failures:
+                yield MigrationResult(ingress, reason=failure['reason'])
+    
+    @staticmethod
+    def _unshare(route: Dict) -> Dict:
+        """Copy the parts of a route shared with other routes or with the source Ingress"""
+        import copy
+        
+        spec = route['spec']
+        spec['parentRefs'] = copy.deepcopy(spec['parentRefs'])
+        if route['kind'] == 'TLSRoute':
+            spec['hostnames'] = list(spec['hostnames'])
+            spec['rules'] = copy.deepcopy(spec['rules'])
+        return route
+    
+    def _convert_ingress(self, ingress: Dict) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+        http_routes, tls_routes = [], []
         try:
-            is_supported, unsupported_annos = self.check_annotations(ingress)
+            annotations = self.extract_annotations(ingress)
             
-            if not is_supported:
-                self.failed_ingresses.append({
+            if annotations.unsupported:
+                return [], [], [{
                     'ingress': ingress,
-                    'reason': f"Annotations non supportées: {', '.join(unsupported_annos)}"
-                })
-                return
+                    'reason': f"Annotations non supportées: {', '.join(annotations.unsupported)}"
+                }]
             
             spec = ingress.get('spec', {})
             tls_configs = spec.get('tls', [])
             rules = spec.get('rules', [])
             
             if not rules:
-                self.failed_ingresses.append({
+                return [], [], [{
                     'ingress': ingress,
                     'reason': "Aucune règle définie dans l'Ingress"
-                })
-                return
+                }]
+            
+            info = IngressInfo.from_ingress(ingress, annotations, rules, tls_configs)
             
-            # Créer HTTPRoute pour chaque règle
-            for rule in rules:
-                http_route = self.create_http_route(ingress, rule, tls_configs)
+            # Créer HTTPRoute pour chaque règle, découpée au-delà de la limite de règles
+            for rule in info.rules:
+                http_route = self._build_http_route(info, rule)
                 if http_route:
-                    self.http_routes.append(http_route)
+                    http_routes.extend(split_http_route(http_route))
             
             # Créer TLSRoute si TLS est configuré
-            if tls_configs:
-                for tls_config in tls_configs:
-                    tls_route = self.create_tls_route(ingress, tls_config)
-                    if tls_route:
-                        self.tls_routes.append(tls_route)
+            for tls in info.tls:
+                tls_route = self._build_tls_route(info, tls)
+                if tls_route:
+                    tls_routes.append(tls_route)
+            
+            # Valider les routes générées contre les schémas Gateway API
+            if self.validator is not None:
+                error = (self.validator.validate(http_routes)
+                         or self.validator.validate(tls_routes))
+                if error:
+                    return [], [], [{
+                        'ingress': ingress,
+                        'reason': f"Route invalide: {error}"
+                    }]
         
         except Exception as e:
-            self.failed_ingresses.append({
+            return [], [], [{
                 'ingress': ingress,
                 'reason': f"Erreur lors de la migration: {str(e)}"
-            })
+            }]
+        
+        return http_routes, tls_routes, []
     
-    def create_http_route(self, ingress: Dict, rule: Dict, tls_configs: List) -> Dict:
-        """Creates an HTTPRoute from an Ingress rule"""
-        metadata = ingress.get('metadata', {})
-        name = metadata.get('name', 'unnamed')
-        namespace = metadata.get('namespace', 'default')
-        host = rule.get('host', '')
+    def render_ingress(self, ingress: Dict) -> 'RenderedBatch':
+        """Convert and serialize one Ingress, served from the cache when possible"""
+        key = self.cache.key(ingress) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                if self.stats is not None:
+                    self.stats.count('ingresses')
+                    self.stats.count('cache_hits')
+                    self.stats.record_results(len(cached[0]), len(cached[1]),
+                                              [failure for failure, _ in cached[2]])
+                return RenderedBatch(1, 1, *cached)
         
-        # Unique name for HTTPRoute
-        route_name = f"{name}-{host.replace('.', '-')}" if host else name
+        http_routes, tls_routes, failures = self.convert_ingress(ingress)
+        rendered = self._render_results(http_routes, tls_routes, failures)
+        if key is not None:
+            self.cache.put(key, rendered)
+        return RenderedBatch(1, 0, *rendered)
+    
+    @_timed('render_routes')
+    def _render_results(self, http_routes: List[Dict], tls_routes: List[Dict],
+                        failures: List[Dict]) -> Tuple[List, List, List]:
+        render = self.route_writer.render_document
+        dumper = self._output_dumper
+        return ([(r, render(r, dumper)) for r in http_routes],
+                [(r, render(r, dumper)) for r in tls_routes],
+                [(f, self.failed_writer.render_document(f, dumper)) for f in failures])
+    
+    def render_segments(self, segments: List[Tuple[bool, str]]) -> 'RenderedBatch':
+        """Parse, convert and serialize a chunk of raw input segments, in input order"""
+        batch = RenderedBatch(0, 0, [], [], [])
+        docs = self._load_segments(segments)
+        if self.stats is not None:
+            docs = self.stats.timed_iter(docs, 'load_ingresses')
+        for ingresses in docs:
+            self._count('docs_parsed')
+            for ingress in ingresses:
+                batch = batch.merge(self.render_ingress(ingress))
+        return batch
+    
+    def migrate_parallel(self, filename: str, jobs: int, chunk_size: int = 64,
+                         chunk_bytes: int = 1 << 20) -> int:
+        """Migrate a file across a pool of ``jobs`` worker processes.
         
-        # Build parentRef with custom values
-        parent_ref = {
-            'name': self.gateway_name,
-            'namespace': self.gateway_namespace
+        The input is split into raw chunks that workers parse, convert and
+        serialize independently; results are written back in input order
+        through the writers opened by ``open_outputs``, so the output is
+        identical to a serial run. Returns the number of Ingresses migrated.
+        
+        A regular YAML file is memory-mapped: workers map it as well and only
+        receive byte ranges, so the input is never copied between processes.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        
+        mapped = map_file(filename) if self.input_format == 'yaml' else None
+        if mapped is None:
+            tasks = ((_render_segments, chunk) for chunk in
+                     _chunk_segments(self.iter_segments(filename), chunk_size, chunk_bytes))
+        else:
+            ranges = self.iter_ranges(mapped)
+            tasks = ((_render_ranges, filename, chunk) for chunk in
+                     _chunk_segments(ranges, chunk_size, chunk_bytes, _range_size))
+        
+        loaded = 0
+        pending = deque()
+        try:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                     initargs=(self.settings(),)) as pool:
+                for task in tasks:
+                    pending.append(pool.submit(*task))
+                    # Bound the number of in-flight chunks to keep memory flat
+                    if len(pending) >= jobs * 2:
+                        loaded += self.emit_rendered(pending.popleft().result())
+                while pending:
+                    loaded += self.emit_rendered(pending.popleft().result())
+        finally:
+            if mapped is not None:
+                # The scan holds views of the mapping until it is closed
+                ranges.close()
+                mapped.close()
+        return loaded
+    
+    def migrate_checkpointed(self, filename: str, checkpoint: MigrationCheckpoint, jobs: int = 1,
+                             resume: bool = False, chunk_size: int = 64,
+                             chunk_bytes: int = 1 << 20) -> int:
+        """Migrate a file while recording progress in ``checkpoint``.
+        
+        Every ``checkpoint.every`` input documents, and when rendering fails,
+        the writers opened by ``open_outputs`` are flushed and the checkpoint
+        saved. With ``resume`` the documents it records are checked against
+        its digest and skipped without being parsed, and the outputs are
+        truncated back to their recorded sizes, so the result is identical to
+        an uninterrupted run. With ``jobs`` > 1 chunks are rendered by a
+        worker pool as in ``migrate_parallel``.
+        
+        Returns the number of Ingresses migrated, including the resumed ones.
+        """
+        import hashlib
+        from concurrent.futures import ProcessPoolExecutor
+        from contextlib import nullcontext
+        
+        writers = self._outputs()
+        state = {
+            'version': MigrationCheckpoint.VERSION,
+            'input': os.path.abspath(filename),
+            'input_format': self.input_format,
+            'settings': self.cache_salt(),
+            'documents': 0,
+            'digest': None,
+            'loaded': 0,
+            'outputs': [],
         }
-        if self.gateway_port:
-            parent_ref['port'] = self.gateway_port
-        if self.gateway_section:
-            parent_ref['sectionName'] = self.gateway_section
+        digest = hashlib.sha256()
+        mapped = map_file(filename) if jobs > 1 and self.input_format == 'yaml' else None
+        if mapped is None:
+            segments = self.iter_segments(filename)
+            data, size_of = _segment_bytes, _segment_size
+        else:
+            segments = self.iter_ranges(mapped)
+            size_of = _range_size
+            
+            def data(segment):
+                return mapped[segment[1]:segment[2]]
+        
+        try:
+            if resume:
+                self._resume_checkpoint(filename, checkpoint, state, writers,
+                                        (data(segment) for segment in segments), digest)
+            
+            pool = None
+            if jobs > 1:
+                pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                           initargs=(self.settings(),))
+            with pool or nullcontext():
+                saved_at = state['documents']
+                documents = saved_at
+                pending = deque()
+                
+                def drain():
+                    nonlocal saved_at
+                    result, chunk_documents, chunk_digest = pending.popleft()
+                    try:
+                        batch = result()
+                    except BaseException:
+                        # Keep the progress made up to the failing chunk
+                        if state['documents'] > saved_at:
+                            self._save_checkpoint(checkpoint, state, writers)
+                        raise
+                    state['loaded'] += self.emit_rendered(batch)
+                    state['documents'], state['digest'] = chunk_documents, chunk_digest
+                    if chunk_documents - saved_at >= checkpoint.every:
+                        self._save_checkpoint(checkpoint, state, writers)
+                        saved_at = chunk_documents
+                
+                for chunk in _chunk_segments(segments, chunk_size, chunk_bytes, size_of):
+                    for segment in chunk:
+                        digest.update(data(segment))
+                    documents += len(chunk)
+                    if pool is None:
+                        result = functools.partial(self.render_segments, chunk)
+                    elif mapped is None:
+                        result = pool.submit(_render_segments, chunk).result
+                    else:
+                        result = pool.submit(_render_ranges, filename, chunk).result
+                    pending.append((result, documents, digest.hexdigest()))
+                    # Bound the number of in-flight chunks to keep memory flat
+                    if len(pending) >= jobs * 2:
+                        drain()
+                while pending:
+                    drain()
+        finally:
+            if mapped is not None:
+                # The scan holds views of the mapping until it is closed
+                segments.close()
+                mapped.close()
+        return state['loaded']
+    
+    @staticmethod
+    def _save_checkpoint(checkpoint: MigrationCheckpoint, state: Dict[str, Any], writers) -> None:
+        """Flush the outputs and record their sizes along with the progress in ``state``"""
+        for writer in writers:
+            writer.flush()
+        state['outputs'] = [
+            {'filename': writer.filename, 'size': writer.tell(), 'count': writer.count}
+            for writer in writers
+        ]
+        checkpoint.save(state)
+    
+    @staticmethod
+    def _resume_checkpoint(filename: str, checkpoint: MigrationCheckpoint, state: Dict[str, Any],
+                           writers, documents: Iterator[bytes], digest) -> None:
+        """Check a saved checkpoint against this run and move past the documents it records.
+        
+        ``documents`` yields the raw bytes of the input documents in order;
+        the recorded ones are consumed and added to ``digest``. The writers
+        are truncated back to the recorded outputs and ``state`` takes over
+        the saved progress.
+        """
+        saved = checkpoint.load()
+        for key in ('input', 'input_format', 'settings'):
+            if saved[key] != state[key]:
+                raise ValueError(f"{checkpoint.filename} was recorded with a different "
+                                 f"{key.replace('_', ' ')}")
+        recorded = [output['filename'] for output in saved['outputs']]
+        if recorded != [writer.filename for writer in writers]:
+            raise ValueError(f"{checkpoint.filename} was recorded with different output files")
+        for output in saved['outputs']:
+            if output['count'] and not (os.path.isfile(output['filename'])
+                                        and os.path.getsize(output['filename']) >= output['size']):
+                raise ValueError(f"{output['filename']} is shorter than recorded "
+                                 f"in {checkpoint.filename}")
+        
+        skipped = 0
+        for document in itertools.islice(documents, saved['documents']):
+            digest.update(document)
+            skipped += 1
+        if skipped != saved['documents'] or digest.hexdigest() != saved['digest']:
+            raise ValueError(f"{filename} changed before the position recorded "
+                             f"in {checkpoint.filename}")
+        
+        for writer, output in zip(writers, saved['outputs']):
+            writer.resume(output['size'], output['count'])
+        state.update(documents=saved['documents'], digest=saved['digest'], loaded=saved['loaded'])
+    
+    def migrate_files(self, filenames: List[str], jobs: int = 1,
+                      workers: int = 4) -> Tuple[int, List[Tuple[str, str]]]:
+        """Migrate many files, loading them concurrently.
+        
+        With ``jobs`` > 1 whole files are parsed, converted and serialized by a
+        pool of worker processes; otherwise ``workers`` threads read and parse
+        files ahead of the conversion. Results are written in input order
+        through the writers opened by ``open_outputs``. A file that cannot be
+        read or parsed is skipped and reported instead of aborting the run.
+        
+        Returns the number of Ingresses migrated and ``(filename, error)`` pairs.
+        """
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        
+        if jobs > 1:
+            pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                       initargs=(self.settings(),))
+            task, window = _render_file, jobs * 2
+        else:
+            pool = ThreadPoolExecutor(max_workers=workers)
+            task, window = self.load_file, workers * 2
+        
+        loaded = 0
+        errors = []
+        pending = deque()
+        
+        def drain():
+            filename, future = pending.popleft()
+            try:
+                result = future.result()
+            except Exception as e:
+                errors.append((filename, str(e)))
+                self._count('files_failed')
+                return 0
+            self._count('files_read')
+            if jobs > 1:
+                return self.emit_rendered(result)
+            
+            ingresses, docs, size = result
+            self._count('docs_parsed', docs)
+            self._count('bytes_read', size)
+            return sum(self.emit_rendered(self.render_ingress(ingress)) for ingress in ingresses)
+        
+        with pool:
+            for filename in filenames:
+                pending.append((filename, pool.submit(task, filename)))
+                # Bound the number of files loaded ahead of the writers
+                if len(pending) >= window:
+                    loaded += drain()
+            while pending:
+                loaded += drain()
+        return loaded, errors
+    
+    @_timed('save_routes')
+    def emit_rendered(self, batch: 'RenderedBatch') -> int:
+        """Write pre-serialized results to the writers opened by ``open_outputs``.
+        
+        Generated routes are also passed to every ``observers`` entry (an
+        object with ``observe(kind, doc, text)``). Returns the number of
+        Ingresses the batch was built from.
+        """
+        for observer in self.observers:
+            for kind, rendered in (('HTTPRoute', batch.http_routes),
+                                   ('TLSRoute', batch.tls_routes)):
+                for doc, text in rendered:
+                    observer.observe(kind, doc, text)
+        self.cache_hits += batch.cache_hits
+        if batch.stats and self.stats is not None:
+            self.stats.merge(batch.stats)
+        results = (batch.http_routes, batch.tls_routes, batch.failures)
+        for writer, rendered in zip(self._outputs(), results):
+            for doc, text in rendered:
+                writer.write_rendered(text, doc)
+        return batch.loaded
+    
+    def _resolve_yaml(self) -> Tuple[str, type, type]:
+        # PyYAML is only imported once a YAML document is read or written
+        if self._yaml is None:
+            self._yaml = resolve_yaml_backend(self._yaml_backend_name)
+        return self._yaml
+    
+    @property
+    def yaml_backend(self) -> str:
+        """Label of the YAML backend in use: ``libyaml`` or ``python``"""
+        return self._resolve_yaml()[0]
+    
+    @property
+    def yaml_loader(self) -> type:
+        return self._resolve_yaml()[1]
+    
+    @property
+    def yaml_dumper(self) -> type:
+        return self._resolve_yaml()[2]
+    
+    @property
+    def _output_dumper(self) -> Optional[type]:
+        # JSON writers ignore the dumper, do not import PyYAML for them
+        return self.yaml_dumper if self.output_format == 'yaml' else None
+    
+    def settings(self) -> Dict[str, Any]:
+        """Constructor arguments needed to rebuild an equivalent migrator"""
+        return {
+            'gateway_class': self.gateway_class,
+            'gateway_name': self.gateway_name,
+            'gateway_namespace': self.gateway_namespace,
+            'gateway_port': self.gateway_port,
+            'gateway_section': self.gateway_section,
+            'yaml_backend': self._yaml[0] if self._yaml else self._yaml_backend_name,
+            'cache_dir': self.cache.directory if self.cache else None,
+            'cache_max_bytes': (self.cache.max_bytes if self.cache
+                                else MigrationCache.DEFAULT_MAX_BYTES),
+            'collect_stats': self.stats is not None,
+            'input_format': self.input_format,
+            'output_format': self.output_format,
+            'validate': self.validator is not None,
+        }
+    
+    # Settings that change the generated output
+    OUTPUT_SETTINGS = ('gateway_name', 'gateway_namespace', 'gateway_port', 'gateway_section',
+                       'output_format', 'validate')
+    
+    def cache_salt(self) -> str:
+        """Settings that change the generated output, mixed into cache keys"""
+        settings = self.settings()
+        return repr([(name, settings[name]) for name in self.OUTPUT_SETTINGS])
+    
+    def create_http_route(self, ingress: Dict, rule: Dict, tls_configs: List,
+                          annotations: IngressAnnotations = None) -> Dict:
+        """Creates an HTTPRoute from an Ingress rule"""
+        if annotations is None:
+            annotations = self.extract_annotations(ingress)
+        return self._build_http_route(IngressInfo.from_ingress(ingress, annotations),
+                                      IngressRule.from_dict(rule))
+    
+    @_timed('create_http_route')
+    def _build_http_route(self, info: IngressInfo, rule: IngressRule) -> Optional[Dict]:
+        host = rule.host
+        
+        # Unique name for HTTPRoute
+        route_name = f"{info.name}-{host.replace('.', '-')}" if host else info.name
         
         http_route = {
-            'apiVersion': 'gateway.networking.k8s.io/v1',
+            'apiVersion': self.HTTPROUTE_API_VERSION,
             'kind': 'HTTPRoute',
             'metadata': {
                 'name': route_name,
-                'namespace': namespace,
+                'namespace': info.namespace,
             },
             'spec': {
-                'parentRefs': [parent_ref],
+                'parentRefs': self._parent_refs,
                 'rules': []
             }
         }
         
-        # Copy relevant labels and annotations
-        if metadata.get('labels'):
-            http_route['metadata']['labels'] = metadata['labels'].copy()
+        # Copy labels: the Ingress belongs to the caller
+        if info.labels:
+            http_route['metadata']['labels'] = dict(info.labels)
         
         # Add hostname if present
         if host:
             http_route['spec']['hostnames'] = [host]
         
         # Convert HTTP paths
-        http_paths = rule.get('http', {}).get('paths', [])
-        for path in http_paths:
-            route_rule = self.convert_http_path(path, ingress)
+        for path in rule.paths:
+            route_rule = self._build_http_rule(path, info.annotations)
             if route_rule:
                 http_route['spec']['rules'].append(route_rule)
         
         return http_route if http_route['spec']['rules'] else None
     
-    def convert_http_path(self, path: Dict, ingress: Dict) -> Dict:
+    def convert_http_path(self, path: Dict, ingress: Dict,
+                          annotations: IngressAnnotations = None) -> Dict:
         """Convertit un path HTTP Ingress en règle HTTPRoute"""
-        path_value = path.get('path', '/')
-        path_type = path.get('pathType', 'Prefix')
-        backend = path.get('backend', {})
-        
+        if annotations is None:
+            annotations = self.extract_annotations(ingress)
+        return self._build_http_rule(IngressPath.from_dict(path), annotations)
+    
+    @_timed('convert_http_path')
+    def _build_http_rule(self, path: IngressPath, annotations: IngressAnnotations) -> Dict:
         # Conversion du pathType
         match_type = 'PathPrefix'
-        if path_type == 'Exact':
+        if path.path_type == 'Exact':
             match_type = 'Exact'
-        elif path_type == 'ImplementationSpecific':
+        elif path.path_type == 'ImplementationSpecific':
             match_type = 'PathPrefix'  # Par défaut
         
         rule = {
             'matches': [{
                 'path': {
                     'type': match_type,
-                    'value': path_value
+                    'value': path.path
                 }
             }],
             'backendRefs': []
         }
         
         # Convertir le backend
-        if 'service' in backend:
-            service = backend['service']
+        if path.backend is not None:
             backend_ref = {
-                'name': service.get('name'),
-                'port': service.get('port', {}).get('number', 80)
+                'name': path.backend.name,
+                'port': path.backend.port
             }
             rule['backendRefs'].append(backend_ref)
         
         # Gérer les annotations de rewrite
-        annotations = ingress.get('metadata', {}).get('annotations', {})
-        if 'nginx.ingress.kubernetes.io/rewrite-target' in annotations:
-            rewrite_target = annotations['nginx.ingress.kubernetes.io/rewrite-target']
+        if annotations.has_rewrite_target:
+            rewrite_target = annotations.rewrite_target
             rule['filters'] = [{
                 'type': 'URLRewrite',
                 'urlRewrite': {
@@ -229,101 +3278,258 @@ class IngressMigrator:
         
         return rule
     
-    def create_tls_route(self, ingress: Dict, tls_config: Dict) -> Dict:
+    def create_tls_route(self, ingress: Dict, tls_config: Dict,
+                         annotations: IngressAnnotations = None) -> Dict:
         """Creates a TLSRoute from TLS configuration - ONLY if ssl-passthrough is enabled"""
-        metadata = ingress.get('metadata', {})
-        annotations = metadata.get('annotations', {})
+        if annotations is None:
+            annotations = self.extract_annotations(ingress)
         
         # Only create TLSRoute if ssl-passthrough is explicitly enabled
-        ssl_passthrough = annotations.get('nginx.ingress.kubernetes.io/ssl-passthrough', '').lower()
+        ssl_passthrough = annotations.ssl_passthrough.lower()
         if ssl_passthrough != 'true':
             return None
         
-        name = metadata.get('name', 'unnamed')
-        namespace = metadata.get('namespace', 'default')
-        hosts = tls_config.get('hosts', [])
-        secret_name = tls_config.get('secretName')
-        
+        return self._build_tls_route(IngressInfo.from_ingress(ingress, annotations),
+                                     IngressTLS.from_dict(tls_config))
+    
+    @_timed('create_tls_route')
+    def _build_tls_route(self, info: IngressInfo, tls: IngressTLS) -> Optional[Dict]:
+        hosts = tls.hosts
         if not hosts:
             return None
         
         # Unique name for TLSRoute
-        route_name = f"{name}-tls-{hosts[0].replace('.', '-')}"
-        
-        # Build parentRef with custom values if provided
-        parent_ref = {
-            'name': self.gateway_name,
-            'namespace': self.gateway_namespace
-        }
-        if self.gateway_port:
-            parent_ref['port'] = self.gateway_port
-        if self.gateway_section:
-            parent_ref['sectionName'] = self.gateway_section
+        route_name = f"{info.name}-tls-{hosts[0].replace('.', '-')}"
         
         tls_route = {
-            'apiVersion': 'gateway.networking.k8s.io/v1alpha2',
+            'apiVersion': self.TLSROUTE_API_VERSION,
             'kind': 'TLSRoute',
             'metadata': {
                 'name': route_name,
-                'namespace': namespace,
+                'namespace': info.namespace,
             },
             'spec': {
-                'parentRefs': [parent_ref],
+                'parentRefs': self._parent_refs,
                 'hostnames': hosts,
-                'rules': [{
-                    'backendRefs': [{
-                        'name': self.gateway_name,
-                        'port': 443
-                    }]
-                }]
+                'rules': self._tls_rules
             }
         }
         
         # Copy labels
-        if metadata.get('labels'):
-            tls_route['metadata']['labels'] = metadata['labels'].copy()
+        if info.labels:
+            tls_route['metadata']['labels'] = dict(info.labels)
         
         # Add annotation to reference TLS secret if present
-        if secret_name:
+        if tls.secret_name:
             tls_route['metadata']['annotations'] = {
-                'gateway.istio.io/tls-secret': secret_name
+                'gateway.istio.io/tls-secret': tls.secret_name
             }
         
         return tls_route
     
+    @_timed('save_routes')
     def save_routes(self, http_output: str, tls_output: str, failed_output: str) -> None:
         """Sauvegarde les routes générées et les échecs"""
-        # Sauvegarder HTTPRoutes
-        if self.http_routes:
-            with open(http_output, 'w') as f:
-                yaml.dump_all(self.http_routes, f, default_flow_style=False, sort_keys=False)
-            print(f"✓ {len(self.http_routes)} HTTPRoute(s) générée(s) dans {http_output}")
+        writers = self._create_writers(http_output, tls_output, failed_output)
+        results = (self.http_routes, self.tls_routes, self.failed_ingresses)
+        for writer, docs in zip(writers, results):
+            for doc in docs:
+                writer.append(doc)
+        self._close_writers(writers)
+    
+    def open_outputs(self, http_output: str, tls_output: str, failed_output: str,
+                     flush_every: int = 256) -> None:
+        """Stream results to disk as they are produced instead of buffering them.
+        
+        Until ``close_outputs``, every route produced by ``migrate_ingress`` is
+        serialized immediately instead of being kept in ``http_routes``,
+        ``tls_routes`` and ``failed_ingresses``, which stay lists. Call
+        ``close_outputs`` to flush and report the counts.
+        """
+        self._http_output, self._tls_output, self._failed_output = self._create_writers(
+            http_output, tls_output, failed_output, flush_every)
+    
+    @_timed('save_routes')
+    def close_outputs(self) -> None:
+        """Flush and close the writers opened by ``open_outputs``"""
+        writers = self._outputs()
+        self._http_output = self._tls_output = self._failed_output = None
+        self._close_writers(writers)
+    
+    def _outputs(self) -> Tuple[YamlStreamWriter, ...]:
+        if self._http_output is None:
+            raise ValueError("No output open, call open_outputs first")
+        return self._http_output, self._tls_output, self._failed_output
+    
+    def _create_writers(self, http_output: str, tls_output: str, failed_output: str,
+                        flush_every: int = 256) -> Tuple[YamlStreamWriter, ...]:
+        dumper = self._output_dumper
+        return (self.route_writer(http_output, flush_every, dumper=dumper),
+                self.route_writer(tls_output, flush_every, dumper=dumper),
+                self.failed_writer(failed_output, flush_every, dumper=dumper))
+    
+    @staticmethod
+    def _close_writers(writers) -> None:
+        http_writer, tls_writer, failed_writer = writers
+        for writer in writers:
+            writer.close()
+        
+        if http_writer.count:
+            print(f"✓ {http_writer.count} HTTPRoute(s) générée(s) dans {http_writer.filename}")
         else:
             print("⚠ Aucun HTTPRoute généré")
         
-        # Sauvegarder TLSRoutes
-        if self.tls_routes:
-            with open(tls_output, 'w') as f:
-                yaml.dump_all(self.tls_routes, f, default_flow_style=False, sort_keys=False)
-            print(f"✓ {len(self.tls_routes)} TLSRoute(s) générée(s) dans {tls_output}")
+        if tls_writer.count:
+            print(f"✓ {tls_writer.count} TLSRoute(s) générée(s) dans {tls_writer.filename}")
         else:
             print("⚠ Aucun TLSRoute généré")
         
-        # Sauvegarder les échecs
-        if self.failed_ingresses:
-            with open(failed_output, 'w') as f:
-                f.write("# Ingresses non migrés\n\n")
-                for item in self.failed_ingresses:
-                    f.write(f"# Raison: {item['reason']}\n")
-                    f.write("---\n")
-                    yaml.dump(item['ingress'], f, default_flow_style=False, sort_keys=False)
-                    f.write("\n")
-            print(f"⚠ {len(self.failed_ingresses)} Ingress non migré(s) - voir {failed_output}")
+        if failed_writer.count:
+            print(f"⚠ {failed_writer.count} Ingress non migré(s) - voir {failed_writer.filename}")
         else:
             print("✓ Tous les Ingress ont été migrés avec succès")
 
 
+# Per-process migrator used by the --jobs worker pool
+_worker_migrator = None
+
+
+def _init_worker(settings: Dict[str, Any]) -> None:
+    global _worker_migrator
+    _worker_migrator = IngressMigrator(**settings)
+
+
+def _render_segments(segments: List[Tuple[bool, str]]) -> RenderedBatch:
+    return _ship_stats(_worker_migrator.render_segments(segments))
+
+
+# Per-process memory maps of the inputs, by filename
+_worker_maps = {}
+
+
+def _render_ranges(filename: str, ranges: List[Tuple[bool, int, int]]) -> RenderedBatch:
+    mapped = _worker_maps.get(filename)
+    if mapped is None:
+        mapped = _worker_maps[filename] = map_file(filename)
+    return _render_segments([(is_list_items, mapped[start:end].decode('utf-8'))
+                             for is_list_items, start, end in ranges])
+
+
+def _render_file(filename: str) -> RenderedBatch:
+    ingresses, docs, size = _worker_migrator.load_file(filename)
+    _worker_migrator._count('docs_parsed', docs)
+    _worker_migrator._count('bytes_read', size)
+    batch = RenderedBatch(0, 0, [], [], [])
+    for ingress in ingresses:
+        batch = batch.merge(_worker_migrator.render_ingress(ingress))
+    return _ship_stats(batch)
+
+
+def _ship_stats(batch: RenderedBatch) -> RenderedBatch:
+    stats = _worker_migrator.stats
+    if stats is not None:
+        # Ship this chunk's statistics back to the main process and start afresh
+        _worker_migrator.stats = MigrationStats()
+        batch = batch._replace(stats=stats.snapshot())
+    return batch
+
+
+def _segment_size(segment: Tuple) -> int:
+    return len(segment[1])
+
+
+def _range_size(segment: Tuple) -> int:
+    return segment[2] - segment[1]
+
+
+def _segment_bytes(segment: Tuple) -> bytes:
+    text = segment[1]
+    if isinstance(text, dict):
+        import json
+        
+        # Decoded JSON Ingresses are digested in their canonical form
+        return json.dumps(text, sort_keys=True).encode('utf-8')
+    return text.encode('utf-8')
+
+
+def _chunk_segments(segments: Iterator[Tuple], chunk_size: int, chunk_bytes: int,
+                    size_of=_segment_size) -> Iterator[List[Tuple]]:
+    """Group segments into chunks bounded by count and size"""
+    chunk, size = [], 0
+    for segment in segments:
+        chunk.append(segment)
+        size += size_of(segment)
+        if len(chunk) >= chunk_size or size >= chunk_bytes:
+            yield chunk
+            chunk, size = [], 0
+    if chunk:
+        yield chunk
+
+
+def run_watch(watcher: IngressWatcher, events: Iterator[Dict]) -> None:
+    """Apply events as they arrive and report what each one changed"""
+    for event in events:
+        started = time.perf_counter()
+        rejected = len(watcher.rejected)
+        written, removed = watcher.apply(event)
+        elapsed = (time.perf_counter() - started) * 1000
+        for reason in watcher.rejected[rejected:]:
+            print(f"⚠️  Ingress rejected: {reason}")
+        if event.get('type') == 'SYNC':
+            print(f"🔁 Synced {len(watcher.index)} Ingress: {written} file(s) written, "
+                  f"{removed} removed ({elapsed:.0f} ms)")
+        elif written or removed:
+            metadata = (event.get('object') or {}).get('metadata') or {}
+            name = f"{metadata.get('namespace', 'default')}/{metadata.get('name')}"
+            print(f"✎ {event.get('type')} {name}: {written} file(s) written, {removed} removed "
+                  f"({elapsed:.1f} ms)")
+        sys.stdout.flush()
+
+
+def report_stats(stats: MigrationStats, fmt: Optional[str], profile: Optional[str],
+                 wall_seconds: float) -> None:
+    """Print collected statistics and write the profile of the slowest phase"""
+    if profile:
+        phase = stats.dump_profile(profile)
+        if phase:
+            print(f"📈 Profile of slowest phase '{phase}' written to {profile}")
+    if fmt == 'json':
+        import json
+        report = stats.snapshot()
+        report['wall_seconds'] = wall_seconds
+        print(json.dumps(report, indent=2, sort_keys=True, ensure_ascii=False), file=sys.stderr)
+
+
+def write_conflict_report(detector: RouteConflictDetector, filename: str) -> None:
+    """Write the conflict findings as JSON and print a summary"""
+    import json
+    
+    findings = detector.report()
+    by_type = defaultdict(int)
+    for finding in findings:
+        by_type[finding['type']] += 1
+    with open(filename, 'w') as f:
+        json.dump({'paths': detector.paths, 'summary': dict(by_type), 'findings': findings},
+                  f, indent=2)
+        f.write('\n')
+    
+    if findings:
+        details = ', '.join(f"{count} {kind}" for kind, count in sorted(by_type.items()))
+        print(f"⚠ {len(findings)} path conflict(s) across {detector.paths} paths ({details}) "
+              f"- voir {filename}")
+    else:
+        print(f"✓ No path conflict across {detector.paths} paths")
+
+
+def default_cache_dir() -> str:
+    """Per-user cache location, honouring ``$XDG_CACHE_HOME``"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ingress-to-gateway-migrator')
+
+
 def main():
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description='Migrate Nginx Ingress to Gateway API (HTTPRoute/TLSRoute) for Istio',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -334,9 +3540,17 @@ Examples:
   %(prog)s -i ingresses.yaml -g my-gateway -o routes.yaml -t tls-routes.yaml --gateway-port 443
         """
     )
+    parser.add_argument('--version', action='version', version=f"%(prog)s {__version__}")
     
-    parser.add_argument('-i', '--input', required=True,
-                        help='YAML file containing Ingresses to migrate')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('-i', '--input', nargs='+', action='append',
+                        help='YAML files, directories or glob patterns containing Ingresses '
+                             'to migrate')
+    source.add_argument('--from-cluster', action='store_true',
+                        help='Read Ingresses directly from the Kubernetes API instead of a file')
+    source.add_argument('--events', metavar='FILE',
+                        help='Follow Ingress watch events from an NDJSON file, - for stdin '
+                             '(implies --watch)')
     parser.add_argument('-g', '--gateway-class', required=True,
                         help='Target Gateway class name (e.g., istio-gateway)')
     parser.add_argument('--gateway-name', 
@@ -347,17 +3561,196 @@ Examples:
                         help='Gateway port to specify in parentRef (optional)')
     parser.add_argument('--gateway-section',
                         help='Gateway listener section name (optional)')
-    parser.add_argument('-o', '--http-output', default='httproutes.yaml',
-                        help='Output file for HTTPRoutes (default: httproutes.yaml)')
-    parser.add_argument('-t', '--tls-output', default='tlsroutes.yaml',
-                        help='Output file for TLSRoutes (default: tlsroutes.yaml)')
-    parser.add_argument('-f', '--failed-output', default='failed-ingresses.yaml',
-                        help='Output file for unmigrated Ingresses (default: failed-ingresses.yaml)')
+    parser.add_argument('-o', '--http-output',
+                        help='Output file for HTTPRoutes, - for stdout (default: httproutes.yaml)')
+    parser.add_argument('-t', '--tls-output',
+                        help='Output file for TLSRoutes, - for stdout (default: tlsroutes.yaml)')
+    parser.add_argument('-f', '--failed-output',
+                        help='Output file for unmigrated Ingresses, - for stdout '
+                             '(default: failed-ingresses.yaml)')
+    parser.add_argument('--input-format', choices=tuple(INPUT_FORMATS), default='yaml',
+                        help='Input format: YAML, JSON (kubectl get -o json) or one object per '
+                             'line (default: yaml)')
+    parser.add_argument('--output-format', choices=tuple(OUTPUT_FORMATS), default='yaml',
+                        help='Output format; json writes a List, ndjson one object per line '
+                             '(default: yaml)')
+    parser.add_argument('--no-validate', action='store_true',
+                        help='Skip checking generated routes against the Gateway API CRD rules')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of worker processes used to parse, convert and serialize '
+                             '(default: 1)')
+    parser.add_argument('--read-workers', type=int, default=4,
+                        help='Input files read and parsed concurrently when there are several '
+                             '(default: 4)')
+    parser.add_argument('--yaml-backend', choices=YAML_BACKENDS, default='auto',
+                        help='YAML implementation: libyaml C bindings, pure Python, or auto-detect '
+                             '(default: auto)')
+    parser.add_argument('--consolidate', action='store_true',
+                        help='Merge HTTPRoutes sharing namespace, hostnames and parentRefs into '
+                             'fewer routes')
+    parser.add_argument('--max-rules-per-route', type=int, default=MAX_RULES_PER_ROUTE,
+                        help='Rule limit per consolidated HTTPRoute '
+                             f'(default: {MAX_RULES_PER_ROUTE})')
+    parser.add_argument('--conflicts', metavar='FILE',
+                        help='Detect duplicate, conflicting and shadowed paths across routes and '
+                             'write a JSON report')
+    parser.add_argument('--shard-by', metavar='SPEC',
+                        help='Split routes into a directory of files: namespace, hostname, count:N '
+                             'or bytes:N')
+    parser.add_argument('--shard-dir', metavar='DIR', default='routes',
+                        help='Directory for sharded output, replaces -o/-t (default: routes)')
+    parser.add_argument('--shard-workers', type=int, default=4,
+                        help='Shard files written concurrently (default: 4)')
+    parser.add_argument('--previous', metavar='DIR',
+                        help='Directory holding a previous run\'s output; write only added, '
+                             'changed and deleted routes')
+    parser.add_argument('--diff-output', metavar='DIR', default='route-diff',
+                        help='Directory for the added/changed/deleted manifests of --previous '
+                             '(default: route-diff)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and re-migrate Ingresses as they change '
+                             '(with --from-cluster)')
+    parser.add_argument('--watch-dir', metavar='DIR', default='watched-routes',
+                        help='Directory of per-route files kept up to date in watch mode '
+                             '(default: watched-routes)')
+    parser.add_argument('--clean', action='store_true',
+                        help='Remove the route files of an earlier watch run from --watch-dir '
+                             'instead of refusing a non-empty directory')
+    parser.add_argument('--checkpoint', metavar='FILE',
+                        help='Record progress in FILE so that an interrupted run can be resumed')
+    parser.add_argument('--checkpoint-every', type=int, default=1000,
+                        help='Input documents between two checkpoints (default: 1000)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue the run recorded in --checkpoint, skipping the documents '
+                             'already migrated')
+    parser.add_argument('--stats', choices=('json',),
+                        help='Print per-phase timings and counters to stderr at the end of the run')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='Profile the run with cProfile and write the pstats file of the '
+                             'slowest phase')
+    parser.add_argument('--cache-dir', nargs='?', const=default_cache_dir(), metavar='DIR',
+                        help='Enable the migration cache to skip unchanged Ingresses on re-runs '
+                             f'(directory: {default_cache_dir()} when DIR is omitted)')
+    parser.add_argument('--cache-max-size', type=int,
+                        default=MigrationCache.DEFAULT_MAX_BYTES >> 20,
+                        help='Maximum cache size in MB before least recently used entries are '
+                             'evicted (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Disable the migration cache even when --cache-dir is given')
+    
+    cluster = parser.add_argument_group('Kubernetes API (--from-cluster, --watch, --apply)')
+    cluster.add_argument('--kube-server',
+                         help='Kubernetes API URL, e.g. http://127.0.0.1:8001 with kubectl proxy '
+                              '(default: in-cluster)')
+    cluster.add_argument('--kube-token', default=os.environ.get('KUBE_TOKEN'),
+                         help='Bearer token '
+                              '(default: $KUBE_TOKEN or the in-cluster service account)')
+    cluster.add_argument('--kube-ca',
+                         help='CA bundle used to verify the API server certificate')
+    cluster.add_argument('--kube-insecure', action='store_true',
+                         help='Skip TLS verification of the API server')
+    cluster.add_argument('-n', '--namespace', action='append', dest='namespaces',
+                         help='Namespace to read Ingresses from, repeatable '
+                              '(default: all namespaces)')
+    cluster.add_argument('--page-size', type=int, default=500,
+                         help='Objects requested per API call (default: 500)')
+    cluster.add_argument('--kube-workers', type=int, default=4,
+                         help='Namespaces listed concurrently (default: 4)')
+    cluster.add_argument('--apply', action='store_true',
+                         help='Server-side apply the generated routes once they are written')
+    cluster.add_argument('--apply-concurrency', type=int, default=16,
+                         help='Apply requests in flight, each on a pooled keep-alive connection '
+                              '(default: 16)')
+    cluster.add_argument('--field-manager', default='ingress-to-gateway-migrator',
+                         help='Field manager of the applied routes (default: %(default)s)')
+    cluster.add_argument('--apply-report', metavar='FILE',
+                         help='Write the result of every apply request as JSON')
     
     args = parser.parse_args()
+    if args.input:
+        # Repeated -i options, flattened here since action='extend' needs Python 3.8
+        args.input = [path for group in args.input for path in group]
+    
+    extension = OUTPUT_FORMATS[args.output_format][0].extension
+    args.http_output = args.http_output or f"httproutes.{extension}"
+    args.tls_output = args.tls_output or f"tlsroutes.{extension}"
+    args.failed_output = args.failed_output or f"failed-ingresses.{extension}"
+    if '-' in (args.http_output, args.tls_output, args.failed_output):
+        # Keep the standard output for the generated objects
+        sys.stdout = sys.stderr
+    
+    # Create migrator with gateway configuration
+    try:
+        migrator = IngressMigrator(
+            gateway_class=args.gateway_class,
+            gateway_name=args.gateway_name,
+            gateway_namespace=args.gateway_namespace,
+            gateway_port=args.gateway_port,
+            gateway_section=args.gateway_section,
+            yaml_backend=args.yaml_backend,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            cache_max_bytes=args.cache_max_size << 20,
+            collect_stats=bool(args.stats or args.profile),
+            input_format=args.input_format,
+            output_format=args.output_format,
+            validate=not args.no_validate
+        )
+        if args.profile:
+            migrator.stats.enable_profiling()
+        if args.shard_by:
+            parse_shard_spec(args.shard_by)
+        if args.resume and not args.checkpoint:
+            raise ValueError("--resume requires --checkpoint")
+        if args.checkpoint:
+            # Only the plain writers can be truncated back to a checkpoint
+            incompatible = [option for option, enabled in (
+                ('--from-cluster', args.from_cluster), ('--consolidate', args.consolidate),
+                ('--conflicts', args.conflicts), ('--shard-by', args.shard_by),
+                ('--previous', args.previous),
+                ('output to stdout',
+                 '-' in (args.http_output, args.tls_output, args.failed_output)),
+            ) if enabled]
+            if incompatible:
+                raise ValueError(f"--checkpoint cannot be combined with {', '.join(incompatible)}")
+            if args.resume and not os.path.exists(args.checkpoint):
+                raise ValueError(f"no checkpoint to resume in {args.checkpoint}")
+        if args.watch and not args.from_cluster:
+            raise ValueError("--watch requires --from-cluster, or --events FILE")
+        if args.watch or args.events:
+            incompatible = [option for option, enabled in (
+                ('--consolidate', args.consolidate), ('--conflicts', args.conflicts),
+                ('--shard-by', args.shard_by), ('--previous', args.previous),
+                ('--checkpoint', args.checkpoint), ('--apply', args.apply),
+            ) if enabled]
+            if incompatible:
+                raise ValueError(f"watch mode cannot be combined with {', '.join(incompatible)}")
+        if args.apply and '-' in (args.http_output, args.tls_output):
+            raise ValueError("--apply reads the routes back from their output files, "
+                             "not from stdout")
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    inputs = []
+    if args.input:
+        inputs = expand_inputs(args.input, INPUT_FORMATS[args.input_format])
+        if not inputs:
+            print(f"Error: no input file found in {' '.join(args.input)}", file=sys.stderr)
+            sys.exit(1)
+        if args.checkpoint and len(inputs) > 1:
+            print(f"Error: --checkpoint requires a single input file, got {len(inputs)}",
+                  file=sys.stderr)
+            sys.exit(1)
     
     print(f"🔄 Migrating Ingress to Gateway API")
-    print(f"   Input file: {args.input}")
+    if args.from_cluster:
+        print(f"   Input: cluster {args.kube_server or 'in-cluster'}")
+    elif args.events:
+        print(f"   Input: events {args.events}")
+    elif len(inputs) == 1:
+        print(f"   Input file: {inputs[0]}")
+    else:
+        print(f"   Input: {len(inputs)} files")
     print(f"   Gateway class: {args.gateway_class}")
     if args.gateway_name:
         print(f"   Gateway name: {args.gateway_name}")
@@ -366,29 +3759,186 @@ Examples:
         print(f"   Gateway port: {args.gateway_port}")
     if args.gateway_section:
         print(f"   Gateway section: {args.gateway_section}")
+    if 'yaml' in (args.input_format, args.output_format):
+        print(f"   YAML backend: {migrator.yaml_backend}")
+    if args.input_format != 'yaml' or args.output_format != 'yaml':
+        print(f"   Formats: {args.input_format} → {args.output_format}")
+    if args.jobs > 1 and not args.from_cluster:
+        print(f"   Jobs: {args.jobs}")
+    if migrator.cache:
+        print(f"   Cache: {migrator.cache.directory}")
+    if args.shard_by:
+        print(f"   Sharded output: {args.shard_dir} (by {args.shard_by})")
+    if args.previous:
+        print(f"   Previous output: {args.previous}")
+    if args.checkpoint:
+        print(f"   Checkpoint: {args.checkpoint}{' (resuming)' if args.resume else ''}")
+    if args.watch or args.events:
+        print(f"   Watch directory: {args.watch_dir}")
+    if args.apply:
+        print(f"   Apply to: {args.kube_server or 'in-cluster'} "
+              f"({args.apply_concurrency} requests in flight)")
     print()
     
-    # Create migrator with gateway configuration
-    migrator = IngressMigrator(
-        gateway_class=args.gateway_class,
-        gateway_name=args.gateway_name,
-        gateway_namespace=args.gateway_namespace,
-        gateway_port=args.gateway_port,
-        gateway_section=args.gateway_section
-    )
-    
-    # Load Ingresses
-    ingresses = migrator.load_ingresses(args.input)
-    print(f"📥 {len(ingresses)} Ingress loaded")
-    print()
+    if args.watch or args.events:
+        # Long-running mode: per-route files updated event by event
+        started = time.perf_counter()
+        try:
+            watcher = IngressWatcher(migrator, args.watch_dir, args.namespaces, args.clean)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        try:
+            if args.events:
+                events = iter_event_file(args.events)
+            else:
+                client = KubernetesClient(args.kube_server, args.kube_token, args.kube_ca,
+                                          args.kube_insecure)
+                events = client.watch_ingresses(args.page_size)
+            run_watch(watcher, events)
+        except KeyboardInterrupt:
+            print()
+        except Exception as e:
+            print(f"Error watching {'events' if args.events else 'cluster'}: {e}", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            print(f"👀 {watcher.events} event(s) applied, {len(watcher.index)} Ingress tracked "
+                  f"in {args.watch_dir}")
+            if migrator.cache:
+                migrator.cache.evict()
+            if migrator.stats is not None:
+                report_stats(migrator.stats, args.stats, args.profile,
+                             time.perf_counter() - started)
+        return
     
-    # Migrate each Ingress
-    for ingress in ingresses:
-        migrator.migrate_ingress(ingress)
+    # Stream Ingresses from the input, migrating and writing each one as it is parsed
+    started = time.perf_counter()
+    migrator.open_outputs(args.http_output, args.tls_output, args.failed_output)
+    shard_pool = None
+    if args.shard_by:
+        from concurrent.futures import ThreadPoolExecutor
+        
+        shard_pool = ThreadPoolExecutor(max_workers=args.shard_workers)
+        shard_writers = [
+            ShardedWriter(args.shard_dir, 'httproutes', 'HTTPRoute', args.shard_by, shard_pool,
+                          migrator._output_dumper, writer_class=migrator.route_writer),
+            ShardedWriter(args.shard_dir, 'tlsroutes', 'TLSRoute', args.shard_by, shard_pool,
+                          migrator._output_dumper, writer_class=migrator.route_writer),
+        ]
+        migrator._http_output, migrator._tls_output = shard_writers
+    route_diff = None
+    if args.previous:
+        import yaml
+        
+        try:
+            route_diff = RouteDiff(args.previous, args.diff_output, migrator.yaml_loader,
+                                   migrator.yaml_dumper, migrator.route_writer)
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            print(f"Error loading previous output: {e}", file=sys.stderr)
+            sys.exit(1)
+        migrator._http_output = ObservedWriter(migrator._http_output, 'HTTPRoute', route_diff)
+        migrator._tls_output = ObservedWriter(migrator._tls_output, 'TLSRoute', route_diff)
+    if args.consolidate:
+        migrator._http_output = ConsolidatingWriter(migrator._http_output, args.max_rules_per_route)
+    # close_outputs() forgets the writers, their counts are reported afterwards
+    http_writer, tls_writer = migrator._http_output, migrator._tls_output
+    if args.conflicts:
+        conflict_detector = RouteConflictDetector()
+        migrator.observers.append(conflict_detector)
+    checkpoint = None
+    if args.checkpoint:
+        checkpoint = MigrationCheckpoint(args.checkpoint, args.checkpoint_every)
+    loaded = 0
+    file_errors = []
+    completed = False
+    try:
+        if checkpoint is not None:
+            loaded = migrator.migrate_checkpointed(inputs[0], checkpoint, args.jobs, args.resume)
+        elif len(inputs) > 1:
+            loaded, file_errors = migrator.migrate_files(inputs, args.jobs, args.read_workers)
+        elif args.jobs > 1 and not args.from_cluster:
+            loaded = migrator.migrate_parallel(inputs[0], args.jobs)
+        else:
+            if args.from_cluster:
+                client = KubernetesClient(args.kube_server, args.kube_token, args.kube_ca,
+                                          args.kube_insecure)
+                ingresses = client.iter_ingresses(args.namespaces, args.page_size,
+                                                  args.kube_workers)
+            else:
+                ingresses = migrator.iter_ingresses(inputs[0])
+            for ingress in ingresses:
+                loaded += migrator.emit_rendered(migrator.render_ingress(ingress))
+        if args.conflicts:
+            write_conflict_report(conflict_detector, args.conflicts)
+        completed = True
+    except Exception as e:
+        source = 'cluster' if args.from_cluster else 'file'
+        print(f"Error loading {source}: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        print(f"📥 {loaded} Ingress loaded")
+        for filename, error in file_errors:
+            print(f"Error loading file {filename}: {error}", file=sys.stderr)
+        if file_errors:
+            print(f"⚠ {len(file_errors)} input file(s) skipped after errors")
+        if migrator.cache:
+            print(f"♻️  {migrator.cache_hits} Ingress served from cache")
+        print()
+        migrator.close_outputs()
+        if checkpoint is not None:
+            if completed:
+                checkpoint.remove()
+            elif checkpoint.saves or args.resume:
+                print(f"💾 Progress saved in {args.checkpoint}, re-run with --resume to continue")
+        if shard_pool is not None:
+            shard_pool.shutdown()
+            index = write_shard_index(args.shard_dir, args.shard_by, shard_writers)
+            print(f"🗂  {sum(len(w.shards) for w in shard_writers)} shard(s) indexed in {index}")
+        if args.consolidate:
+            consolidator = http_writer
+            print(f"🔗 {consolidator.collected} HTTPRoute(s) consolidated into {consolidator.count} "
+                  f"({consolidator.collected - consolidator.count} fewer objects)")
+        if route_diff is not None:
+            summary = route_diff.close(completed)
+            print(f"🔀 Diff vs {args.previous}: {summary['added']} added, "
+                  f"{summary['changed']} changed, {summary['deleted']} deleted, "
+                  f"{summary['unchanged']} unchanged - voir {args.diff_output}")
+        if migrator.cache:
+            migrator.cache.evict()
+        if migrator.stats is not None:
+            report_stats(migrator.stats, args.stats, args.profile, time.perf_counter() - started)
     
-    # Save results
-    print()
-    migrator.save_routes(args.http_output, args.tls_output, args.failed_output)
+    if args.apply:
+        # Only what changed is applied in diff mode
+        if route_diff is not None:
+            writers = (route_diff.added, route_diff.changed)
+        elif shard_pool is not None:
+            writers = [shard for writer in shard_writers
+                       for _, shard in sorted(writer.shards.items())]
+        else:
+            writers = (http_writer, tls_writer)
+        files = [writer.filename for writer in writers if writer.count]
+        # PyYAML is only loaded when there are YAML files to read back
+        errors, loader = (OSError, ValueError), None
+        if any(filename.endswith(INPUT_FORMATS['yaml']) for filename in files):
+            import yaml
+            
+            errors, loader = errors + (yaml.YAMLError,), migrator.yaml_loader
+        try:
+            client = KubernetesClient(args.kube_server, args.kube_token, args.kube_ca,
+                                      args.kube_insecure)
+            applier = RouteApplier(client, args.apply_concurrency, args.field_manager)
+            routes = (doc for filename in files
+                      for doc in iter_manifest_documents(filename, loader)
+                      if isinstance(doc, dict) and doc.get('kind') in ('HTTPRoute', 'TLSRoute'))
+            results = applier.apply(routes)
+        except errors as e:
+            print(f"Error applying routes: {e}", file=sys.stderr)
+            sys.exit(1)
+        print()
+        write_apply_report(results, args.apply_report)
+        if any(not result.ok for result in results):
+            sys.exit(1)
     print()
     print("✅ Migration completed")
     print()
@@ -2,15 +2,30 @@
 Tests unitaires pour le script de migration Ingress vers Gateway API
 """
 
+import json
 import pytest
 import yaml
 import sys
 import os
+import itertools
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
 
 # Ajouter le répertoire parent au path pour importer le module
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from migrate import IngressMigrator
+from migrate import (IngressMigrator, YamlStreamWriter, resolve_yaml_backend,
+                     split_yaml_documents, split_list_items, KubernetesClient,
+                     MigrationCache, MigrationStats, consolidate_http_routes,
+                     RouteConflictDetector, RouteDiff, ObservedWriter, ShardedWriter,
+                     parse_shard_spec, write_shard_index, expand_inputs, scan_segments,
+                     scan_ranges, map_file, IngressInfo, IngressPath, IngressBackend,
+                     MigrationCheckpoint, IngressWatcher, iter_event_file, RouteApplier,
+                     RouteValidator, MigrationResult, main)
+import benchmark
 
 
 class TestIngressMigrator:
@@ -71,6 +86,41 @@ class TestIngressMigrator:
         assert is_supported is False
         assert len(unsupported) == 1
     
+    def test_annotation_classifier(self, migrator):
+        """Test la classification des annotations en une seule passe"""
+        classifier = migrator.annotation_classifier
+        assert classifier.classify('nginx.ingress.kubernetes.io/rewrite-target') == 'supported'
+        assert classifier.classify('nginx.ingress.kubernetes.io/auth-type') == 'unsupported'
+        assert classifier.classify('nginx.ingress.kubernetes.io/whatever') == 'unknown'
+        
+        info = classifier.extract({
+            'nginx.ingress.kubernetes.io/rewrite-target': '/$2',
+            'nginx.ingress.kubernetes.io/ssl-passthrough': 'true',
+            'nginx.ingress.kubernetes.io/proxy-read-timeout': '60',
+            'nginx.ingress.kubernetes.io/cors-allow-origin': '*',
+            'nginx.ingress.kubernetes.io/limit-rps': '5',
+        })
+        assert info.unsupported == ('nginx.ingress.kubernetes.io/limit-rps',)
+        assert info.rewrite_target == '/$2'
+        assert info.ssl_passthrough == 'true'
+    
+    def test_annotations_extracted_once_per_ingress(self, migrator, monkeypatch):
+        """Test que les annotations ne sont analysées qu'une fois par Ingress"""
+        calls = []
+        extract = migrator.annotation_classifier.extract
+        monkeypatch.setattr(migrator.annotation_classifier, 'extract',
+                            lambda annotations: calls.append(1) or extract(annotations))
+        ingress = make_ingress('app')
+        ingress['metadata']['annotations'] = {'nginx.ingress.kubernetes.io/rewrite-target': '/'}
+        ingress['spec']['rules'] *= 3
+        ingress['spec']['rules'][0]['http']['paths'] *= 5
+        
+        migrator.migrate_ingress(ingress)
+        
+        assert len(calls) == 1
+        assert all(rule['filters'][0]['type'] == 'URLRewrite'
+                   for route in migrator.http_routes for rule in route['spec']['rules'])
+    
     def test_http_route_creation(self, migrator):
         """Test la création d'un HTTPRoute"""
         ingress = {
@@ -235,6 +285,24 @@ class TestIngressMigrator:
         assert len(migrator.failed_ingresses) == 1
         assert 'Aucune règle' in migrator.failed_ingresses[0]['reason']
     
+    def test_shared_parent_refs_without_anchors(self, migrator):
+        """Test que les parentRefs sont partagés sans ancres YAML à la sérialisation"""
+        ingress = make_ingress('app')
+        ingress['metadata']['labels'] = {'app': 'app'}
+        ingress['metadata']['annotations'] = {'nginx.ingress.kubernetes.io/ssl-passthrough': 'true'}
+        ingress['spec']['rules'].append(dict(ingress['spec']['rules'][0], host='other.example.com'))
+        ingress['spec']['tls'] = [{'hosts': ['example.com']}]
+        
+        http_routes, tls_routes, _ = migrator.convert_ingress(ingress)
+        
+        assert http_routes[0]['spec']['parentRefs'] is http_routes[1]['spec']['parentRefs']
+        assert tls_routes[0]['spec']['parentRefs'] is http_routes[0]['spec']['parentRefs']
+        _, _, dumper = resolve_yaml_backend()
+        shared = {'first': http_routes[0], 'second': http_routes[1], 'tls': tls_routes[0]}
+        text = yaml.dump(shared, Dumper=dumper)
+        assert '&id' not in text and '*id' not in text
+        assert text.count('name: test-gateway') == 4
+    
     def test_labels_preservation(self, migrator):
         """Test que les labels sont préservés"""
         ingress = {
@@ -274,6 +342,1437 @@ class TestIngressMigrator:
         assert 'labels' in http_route['metadata']
         assert http_route['metadata']['labels']['app'] == 'myapp'
         assert http_route['metadata']['labels']['env'] == 'production'
+    
+    def test_ingress_model(self, migrator):
+        """Test le modèle intermédiaire partagé par les constructeurs de routes"""
+        ingress = {
+            'metadata': {
+                'name': 'shop',
+                'namespace': 'prod',
+                'annotations': {'nginx.ingress.kubernetes.io/ssl-passthrough': 'true'}
+            },
+            'spec': {
+                'rules': [{
+                    'host': 'shop.example.com',
+                    'http': {'paths': [
+                        {'path': '/api', 'pathType': 'Exact',
+                         'backend': {'service': {'name': 'api', 'port': {'number': 8080}}}},
+                        {'backend': {'resource': {'kind': 'Bucket', 'name': 'static'}}}
+                    ]}
+                }],
+                'tls': [{'hosts': ['shop.example.com'], 'secretName': 'shop-tls'}]
+            }
+        }
+        annotations = migrator.extract_annotations(ingress)
+        
+        info = IngressInfo.from_ingress(ingress, annotations, ingress['spec']['rules'],
+                                        ingress['spec']['tls'])
+        
+        assert (info.name, info.namespace, info.labels) == ('shop', 'prod', None)
+        rule = info.rules[0]
+        assert rule.host == 'shop.example.com'
+        assert rule.paths[0] == IngressPath('/api', 'Exact', IngressBackend('api', 8080))
+        assert rule.paths[1] == IngressPath('/', 'Prefix', None)
+        assert info.tls[0].secret_name == 'shop-tls'
+        
+        # Les TLS ne sont conservés que pour les Ingress en ssl-passthrough
+        plain = IngressInfo.from_ingress(ingress, annotations._replace(ssl_passthrough='false'),
+                                         [], ingress['spec']['tls'])
+        assert plain.tls == ()
+        
+        http_routes, tls_routes, failures = migrator.convert_ingress(ingress)
+        assert http_routes == [migrator.create_http_route(ingress, ingress['spec']['rules'][0], [])]
+        assert tls_routes == [migrator.create_tls_route(ingress, ingress['spec']['tls'][0])]
+        assert failures == []
+
+
+class TestStreamingOutput:
+    """Tests pour l'écriture incrémentale des routes"""
+    
+    def test_writer_matches_dump_all(self, tmp_path):
+        """Test que le writer produit exactement la sortie de yaml.dump_all"""
+        docs = [{'kind': 'HTTPRoute', 'metadata': {'name': f'route-{i}'}} for i in range(5)]
+        output = tmp_path / "routes.yaml"
+        
+        writer = YamlStreamWriter(str(output), flush_every=2)
+        for doc in docs:
+            writer.append(doc)
+        writer.close()
+        
+        assert len(writer) == 5
+        assert output.read_text() == yaml.dump_all(docs, default_flow_style=False, sort_keys=False)
+    
+    def test_writer_flushes_periodically(self, tmp_path):
+        """Test que les documents sont écrits sur disque avant la fin"""
+        output = tmp_path / "routes.yaml"
+        writer = YamlStreamWriter(str(output), flush_every=2)
+        
+        writer.append({'name': 'a'})
+        assert not output.exists()
+        writer.append({'name': 'b'})
+        assert list(yaml.safe_load_all(output.read_text())) == [{'name': 'a'}, {'name': 'b'}]
+        writer.close()
+    
+    def test_yaml_backends_are_byte_identical(self, tmp_path):
+        """Test que libyaml et l'implémentation Python produisent la même sortie"""
+        docs = [
+            {'kind': 'HTTPRoute',
+             'metadata': {'name': 'a', 'annotations': {'note': 'héllo: wörld'}}},
+            {'kind': 'HTTPRoute',
+             'spec': {'hostnames': ['*.example.com'], 'rules': [{'value': 'x' * 120}]}},
+        ]
+        outputs = []
+        for backend in ('python', 'auto'):
+            _, _, dumper = resolve_yaml_backend(backend)
+            output = tmp_path / f"{backend}.yaml"
+            writer = YamlStreamWriter(str(output), dumper=dumper)
+            for doc in docs:
+                writer.append(doc)
+            writer.close()
+            outputs.append(output.read_bytes())
+        
+        assert outputs[0] == outputs[1]
+    
+    def test_resolve_yaml_backend(self):
+        """Test la sélection du backend YAML"""
+        label, loader, dumper = resolve_yaml_backend('python')
+        assert label == 'python'
+        assert loader is yaml.SafeLoader
+        assert issubclass(dumper, yaml.SafeDumper)
+        
+        label, _, _ = resolve_yaml_backend('auto')
+        assert label == ('libyaml' if yaml.__with_libyaml__ else 'python')
+        
+        with pytest.raises(ValueError):
+            resolve_yaml_backend('rust')
+    
+    def test_open_outputs_streams_results(self, tmp_path):
+        """Test que migrate_ingress écrit directement dans les fichiers ouverts"""
+        migrator = IngressMigrator("test-gateway")
+        http_file = tmp_path / "http.yaml"
+        failed_file = tmp_path / "failed.yaml"
+        migrator.open_outputs(str(http_file), str(tmp_path / "tls.yaml"), str(failed_file))
+        
+        migrator.migrate_ingress({
+            'metadata': {'name': 'app', 'namespace': 'default'},
+            'spec': {'rules': [{'host': 'example.com', 'http': {'paths': [{
+                'path': '/', 'pathType': 'Prefix',
+                'backend': {'service': {'name': 'app', 'port': {'number': 80}}}
+            }]}}]}
+        })
+        migrator.migrate_ingress({'metadata': {'name': 'empty'}, 'spec': {}})
+        migrator.close_outputs()
+        
+        assert migrator.http_routes == [] and migrator.failed_ingresses == []
+        routes = list(yaml.safe_load_all(http_file.read_text()))
+        assert [route['metadata']['name'] for route in routes] == ['app-example-com']
+        assert failed_file.read_text().startswith("# Ingresses non migrés")
+        assert not (tmp_path / "tls.yaml").exists()
+
+
+class TestParallelMigration:
+    """Tests pour la migration parallèle (--jobs)"""
+    
+    LIST_CONTENT = """apiVersion: v1
+items:
+- apiVersion: networking.k8s.io/v1
+  kind: Ingress
+  metadata:
+    name: first
+    annotations:
+      note: |
+        ---
+        kind: List
+  spec:
+    rules:
+    - host: first.example.com
+      http:
+        paths:
+        - path: /
+          pathType: Prefix
+          backend:
+            service:
+              name: first
+              port:
+                number: 80
+- apiVersion: v1
+  kind: Service
+  metadata:
+    name: not-an-ingress
+kind: List
+metadata:
+  resourceVersion: ""
+"""
+    
+    def test_split_yaml_documents(self):
+        """Test le découpage brut sur les séparateurs ---"""
+        content = "a: 1\n---\nb: 2\n--- \nc: 3\n----x: 4\n"
+        docs = list(split_yaml_documents(content.splitlines(keepends=True)))
+        
+        assert len(docs) == 3
+        assert [yaml.safe_load(doc) for doc in docs] == [{'a': 1}, {'b': 2}, {'c': 3, '----x': 4}]
+    
+    def test_split_list_items(self):
+        """Test le découpage des items d'un document List"""
+        items = split_list_items(self.LIST_CONTENT)
+        
+        assert len(items) == 2
+        parsed = [yaml.safe_load(item)[0] for item in items]
+        assert parsed == yaml.safe_load(self.LIST_CONTENT)['items']
+        assert split_list_items("kind: Ingress\nitems:\n- a: 1\n") is None
+        assert split_list_items("kind: List\nitems: []\n") is None
+    
+    def test_scan_segments_skips_other_kinds(self):
+        """Test le pré-filtrage par kind sans parsing complet"""
+        content = """kind: Deployment
+metadata:
+  name: web
+  annotations:
+    note: served by an Ingress
+---
+kind: IngressClass
+metadata:
+  name: nginx
+---
+{kind: Ingress, metadata: {name: flow}}
+---
+apiVersion: networking.k8s.io/v1
+kind: Ingress
+metadata:
+  name: block
+---
+""" + self.LIST_CONTENT.replace("kind: Service", "kind: Service  # not an Ingress")
+        
+        segments = list(scan_segments(content.splitlines(keepends=True)))
+        
+        assert [(is_list_items, text is not None) for is_list_items, text in segments] == [
+            (False, False), (False, False), (False, True), (False, True),
+            (True, True), (True, False)]
+        assert yaml.safe_load(segments[4][1])[0]['metadata']['name'] == 'first'
+    
+    def test_anchors_and_aliases_are_parsed_whole(self, tmp_path):
+        """Test qu'une List avec ancres et alias n'est pas découpée en items"""
+        content = self.LIST_CONTENT.replace("- apiVersion: networking.k8s.io/v1",
+                                            "- &base\n  apiVersion: networking.k8s.io/v1", 1)
+        content = content.replace("\nkind: List\n", "\n- *base\n- <<: *base\n  metadata:\n"
+                                  "    name: merged\nkind: List\n")
+        ingress_file = tmp_path / "ingresses.yaml"
+        ingress_file.write_text(content + "---\nkind: Deployment\nmetadata: &m {name: web}\n")
+        
+        segments = list(scan_segments(content.splitlines(keepends=True)))
+        assert [(is_list_items, text is not None) for is_list_items, text in segments] == [
+            (False, True)]
+        assert split_list_items(content) is None
+        mapped = map_file(str(ingress_file))
+        assert [keep for _, _, _, keep in scan_ranges(mapped)] == [True, False]
+        mapped.close()
+        
+        migrator = IngressMigrator("test-gateway")
+        names = [ingress['metadata']['name']
+                 for ingress in migrator.iter_ingresses(str(ingress_file))]
+        assert names == ['first', 'first', 'merged']
+    
+    def test_scan_ranges_matches_scan_segments(self, tmp_path):
+        """Test que le lecteur mmap découpe le fichier comme le lecteur texte"""
+        content = "kind: Deployment\nmetadata:\n  name: web\n---\n" + self.LIST_CONTENT
+        ingress_file = tmp_path / "ingresses.yaml"
+        ingress_file.write_text(content)
+        
+        mapped = map_file(str(ingress_file))
+        ranges = [(is_list_items, mapped[start:end].decode() if keep else None)
+                  for is_list_items, start, end, keep in scan_ranges(mapped)]
+        mapped.close()
+        
+        assert ranges == list(scan_segments(content.splitlines(keepends=True)))
+        assert map_file(str(tmp_path / "missing.yaml")) is None
+    
+    def test_parallel_output_matches_serial(self, tmp_path):
+        """Test que --jobs produit exactement la même sortie que le mode série"""
+        ingress_file = tmp_path / "ingresses.yaml"
+        ingress_file.write_text(self.LIST_CONTENT + "---\n" + """
+apiVersion: networking.k8s.io/v1
+kind: Ingress
+metadata:
+  name: empty
+spec: {}
+""")
+        
+        outputs = []
+        for jobs in (1, 2):
+            out = tmp_path / f"jobs-{jobs}"
+            out.mkdir()
+            migrator = IngressMigrator("test-gateway")
+            migrator.open_outputs(str(out / "http.yaml"), str(out / "tls.yaml"),
+                                  str(out / "failed.yaml"))
+            if jobs == 1:
+                loaded = sum(1 for ingress in migrator.iter_ingresses(str(ingress_file))
+                             if migrator.migrate_ingress(ingress) is None)
+            else:
+                loaded = migrator.migrate_parallel(str(ingress_file), jobs, chunk_size=1)
+            migrator.close_outputs()
+            outputs.append((loaded, (out / "http.yaml").read_text(),
+                            (out / "failed.yaml").read_text()))
+        
+        assert outputs[0][0] == 2
+        assert outputs[0] == outputs[1]
+
+
+class TestMultiFileInput:
+    """Tests pour la lecture de plusieurs fichiers, répertoires et motifs"""
+    
+    @pytest.fixture
+    def tree(self, tmp_path):
+        for directory in ('apps/a', 'apps/b', 'apps/.git'):
+            (tmp_path / directory).mkdir(parents=True)
+        for i, directory in enumerate(('apps/a', 'apps/b', 'apps/b')):
+            ingress = dict(make_ingress(f'app{i}'), apiVersion='networking.k8s.io/v1',
+                           kind='Ingress')
+            (tmp_path / directory / f"app{i}.yaml").write_text(yaml.safe_dump(ingress))
+        (tmp_path / 'apps/a/config.yml').write_text("kind: ConfigMap\nmetadata:\n  name: x\n")
+        (tmp_path / 'apps/a/README.md').write_text("kind: Ingress")
+        (tmp_path / 'apps/.git/hidden.yaml').write_text("kind: Ingress")
+        (tmp_path / 'apps/b/broken.yaml').write_text("kind: Ingress\n  spec: [\n")
+        return tmp_path
+    
+    def test_expand_inputs(self, tree):
+        """Test l'expansion des répertoires et des motifs glob"""
+        files = expand_inputs([str(tree / 'apps'), str(tree / 'apps/b/*.yaml'),
+                               str(tree / 'missing.yaml')])
+        
+        assert [os.path.relpath(f, tree) for f in files] == [
+            'apps/a/app0.yaml', 'apps/a/config.yml', 'apps/b/app1.yaml', 'apps/b/app2.yaml',
+            'apps/b/broken.yaml', 'missing.yaml',
+        ]
+    
+    @pytest.mark.parametrize('jobs', [1, 2])
+    def test_migrate_files_reports_errors_per_file(self, tree, jobs):
+        """Test la migration concurrente avec une erreur par fichier sans interruption"""
+        files = expand_inputs([str(tree / 'apps'), str(tree / 'missing.yaml')])
+        migrator = IngressMigrator("test-gateway", collect_stats=True)
+        out = tree / "out"
+        out.mkdir()
+        migrator.open_outputs(str(out / "http.yaml"), str(out / "tls.yaml"),
+                              str(out / "failed.yaml"))
+        
+        loaded, errors = migrator.migrate_files(files, jobs=jobs, workers=2)
+        migrator.close_outputs()
+        
+        assert loaded == 3
+        assert [os.path.relpath(f, tree) for f, _ in errors] == [
+            'apps/b/broken.yaml', 'missing.yaml']
+        with open(out / "http.yaml") as f:
+            assert [d['metadata']['name'] for d in yaml.safe_load_all(f)] == [
+                'app0-example-com', 'app1-example-com', 'app2-example-com']
+        assert migrator.stats.counters['docs_parsed'] == 3
+        assert migrator.stats.counters['files_failed'] == 2
+
+
+class StubKubernetesAPI:
+    """Serveur d'API Kubernetes minimal pour les tests (pagination limit/continue)"""
+    
+    def __init__(self, ingresses_by_namespace, watch_events=()):
+        self.ingresses = ingresses_by_namespace
+        # Événements renvoyés par chaque connexion de watch successive
+        self.watch_events = list(watch_events)
+        self.requests = []
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def do_GET(self):
+                stub.requests.append((self.path, self.headers.get('Authorization')))
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                parts = url.path.strip('/').split('/')
+                metadata = {}
+                if url.path == '/apis/networking.k8s.io/v1/ingresses' and 'watch' in query:
+                    events = stub.watch_events.pop(0) if stub.watch_events else []
+                    body = ''.join(json.dumps(event) + '\n' for event in events).encode()
+                    self.send_response(200)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                elif url.path == '/apis/networking.k8s.io/v1/ingresses':
+                    items = [ingress for ingresses in stub.ingresses.values()
+                             for ingress in ingresses]
+                    metadata['resourceVersion'] = '1'
+                elif url.path == '/api/v1/namespaces':
+                    items = [{'metadata': {'name': ns}} for ns in stub.ingresses]
+                elif parts[-1] == 'ingresses' and parts[-2] in stub.ingresses:
+                    items = stub.ingresses[parts[-2]]
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                
+                start = int(query.get('continue', ['0'])[0])
+                limit = int(query.get('limit', [len(items) or 1])[0])
+                page = items[start:start + limit]
+                if start + limit < len(items):
+                    metadata['continue'] = str(start + limit)
+                body = json.dumps({'kind': 'List', 'metadata': metadata, 'items': page}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_ingress(name, namespace='default', host='example.com'):
+    """Construit un Ingress simple pour les tests"""
+    return {
+        'metadata': {'name': name, 'namespace': namespace},
+        'spec': {'rules': [{'host': host, 'http': {'paths': [{
+            'path': '/', 'pathType': 'Prefix',
+            'backend': {'service': {'name': name, 'port': {'number': 80}}}
+        }]}}]}
+    }
+
+
+class TestClusterInput:
+    """Tests pour la lecture des Ingress depuis l'API Kubernetes"""
+    
+    @pytest.fixture
+    def api(self):
+        api = StubKubernetesAPI({
+            'team-a': [make_ingress(f'a{i}', 'team-a') for i in range(7)],
+            'team-b': [make_ingress(f'b{i}', 'team-b') for i in range(3)],
+            'empty': [],
+        })
+        yield api
+        api.close()
+    
+    def test_paginated_concurrent_listing(self, api):
+        """Test la pagination et la lecture concurrente de tous les namespaces"""
+        client = KubernetesClient(api.url, token='secret')
+        ingresses = list(client.iter_ingresses(page_size=2, workers=3))
+        
+        # Les namespaces sont rendus dans l'ordre de la liste, quel que soit le timing
+        names = [ing['metadata']['name'] for ing in ingresses]
+        assert names == [f'a{i}' for i in range(7)] + [f'b{i}' for i in range(3)]
+        assert all(ing['kind'] == 'Ingress' for ing in ingresses)
+        assert any('continue=' in path for path, _ in api.requests)
+        assert all(auth == 'Bearer secret' for _, auth in api.requests)
+    
+    def test_service_account_only_for_in_cluster_server(self, tmp_path, monkeypatch):
+        """Test que le token du service account n'est jamais envoyé à un serveur explicite"""
+        (tmp_path / "token").write_text("sa-token\n")
+        monkeypatch.setattr(KubernetesClient, 'SERVICE_ACCOUNT_DIR', str(tmp_path))
+        monkeypatch.setenv('KUBERNETES_SERVICE_HOST', '10.0.0.1')
+        
+        assert KubernetesClient('https://api.example.com').token is None
+        assert KubernetesClient().token == 'sa-token'
+    
+    def test_selected_namespaces_feed_migration(self, api):
+        """Test que les Ingress lus depuis l'API sont migrés directement"""
+        client = KubernetesClient(api.url)
+        migrator = IngressMigrator("test-gateway")
+        for ingress in client.iter_ingresses(['team-b'], page_size=1):
+            migrator.migrate_ingress(ingress)
+        
+        assert len(migrator.http_routes) == 3
+        assert not any(path.startswith('/api/v1/namespaces') for path, _ in api.requests)
+    
+    def test_watch_relists_after_expiry(self):
+        """Test le watch : SYNC initial, reprise après BOOKMARK et nouvelle liste après 410"""
+        listed = {'team-a': [make_ingress('a0', 'team-a'), make_ingress('a1', 'team-a')]}
+        api = StubKubernetesAPI(listed, [
+            [{'type': 'ADDED', 'object': make_ingress('a2', 'team-a')},
+             {'type': 'MODIFIED', 'object': make_ingress('a0', 'team-a', 'other.example.com')},
+             {'type': 'BOOKMARK', 'object': {'metadata': {'resourceVersion': '7'}}}],
+            [{'type': 'ERROR', 'object': {'code': 410, 'message': 'too old resource version'}}],
+        ])
+        try:
+            client = KubernetesClient(api.url)
+            events = list(itertools.islice(client.watch_ingresses(page_size=1), 4))
+        finally:
+            api.close()
+        
+        assert [event['type'] for event in events] == ['SYNC', 'ADDED', 'MODIFIED', 'SYNC']
+        assert [i['metadata']['name'] for i in events[0]['objects']] == ['a0', 'a1']
+        assert events[1]['object']['kind'] == 'Ingress'
+        assert any('resourceVersion=7' in path for path, _ in api.requests)
+    
+    def test_api_errors_are_raised(self, api):
+        """Test qu'une erreur d'API interrompt la lecture"""
+        client = KubernetesClient(api.url)
+        with pytest.raises(Exception):
+            list(client.iter_ingresses(['missing']))
+        
+        # Les namespaces en attente ne font aucune requête après l'erreur
+        api.requests.clear()
+        with pytest.raises(Exception):
+            list(client.iter_ingresses(['missing', 'team-a', 'team-b'], workers=1))
+        assert [path.split('?')[0] for path, _ in api.requests] == [
+            '/apis/networking.k8s.io/v1/namespaces/missing/ingresses']
+
+
+class TestMigrationCache:
+    """Tests pour le cache de migration"""
+    
+    def test_unchanged_ingress_served_from_cache(self, tmp_path):
+        """Test qu'un Ingress inchangé est servi depuis le cache sans conversion"""
+        cache_dir = str(tmp_path / "cache")
+        ingress = make_ingress('app')
+        
+        first = IngressMigrator("test-gateway", cache_dir=cache_dir).render_ingress(ingress)
+        
+        migrator = IngressMigrator("test-gateway", cache_dir=cache_dir)
+        migrator.convert_ingress = None  # aucune conversion ne doit avoir lieu
+        second = migrator.render_ingress(ingress)
+        
+        assert first.cache_hits == 0
+        assert second.cache_hits == 1
+        assert [text for _, text in second.http_routes] == [text for _, text in first.http_routes]
+    
+    def test_unsortable_keys_are_a_miss(self, tmp_path):
+        """Test qu'un Ingress aux clés de types mixtes est migré sans passer par le cache"""
+        ingress = make_ingress('app')
+        ingress['metadata']['annotations'] = {1: 'x', 'team': 'y'}
+        migrator = IngressMigrator("test-gateway", cache_dir=str(tmp_path / "cache"))
+        
+        for _ in range(2):
+            batch = migrator.render_ingress(ingress)
+            assert (batch.cache_hits, len(batch.http_routes) + len(batch.failures)) == (0, 1)
+        assert migrator.cache.misses == 2
+    
+    def test_key_depends_on_gateway_settings(self, tmp_path):
+        """Test que la clé change avec la configuration de la Gateway"""
+        cache_dir = str(tmp_path / "cache")
+        ingress = make_ingress('app')
+        
+        keys = {
+            IngressMigrator("gw", cache_dir=cache_dir).cache.key(ingress),
+            IngressMigrator("gw", gateway_port=443, cache_dir=cache_dir).cache.key(ingress),
+            IngressMigrator("gw", gateway_section="https", cache_dir=cache_dir).cache.key(ingress),
+            IngressMigrator("gw", gateway_namespace="other",
+                            cache_dir=cache_dir).cache.key(ingress),
+        }
+        assert len(keys) == 4
+        
+        changed = make_ingress('app', host='other.example.com')
+        assert IngressMigrator("gw", cache_dir=cache_dir).cache.key(changed) not in keys
+    
+    def test_size_based_eviction(self, tmp_path):
+        """Test l'éviction des entrées les moins récemment utilisées"""
+        cache = MigrationCache(str(tmp_path / "cache"), max_bytes=0)
+        for i in range(3):
+            cache.put(f"{i:064d}", ([({'name': 'r'}, 'name: r\n')], [], []))
+        assert cache.get(f"{0:064d}") is not None
+        
+        assert cache.evict() == 3
+        assert cache.get(f"{0:064d}") is None
+    
+    def test_cache_is_opt_in(self, tmp_path, monkeypatch):
+        """Test qu'une exécution sans --cache-dir n'écrit aucun cache"""
+        input_file = tmp_path / "ingresses.yaml"
+        input_file.write_text(yaml.dump(dict(make_ingress('app'), kind='Ingress')))
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / "xdg"))
+        
+        monkeypatch.setattr(sys, 'argv', ['migrate', '-i', str(input_file), '-g', 'gw'])
+        main()
+        assert not (tmp_path / "xdg").exists()
+        
+        monkeypatch.setattr(sys, 'argv', ['migrate', '-i', str(input_file), '-g', 'gw',
+                                          '--cache-dir', 'cache'])
+        main()
+        assert os.listdir(tmp_path / "cache")
+
+
+class TestBenchmark:
+    """Tests pour la suite de benchmark"""
+    
+    def test_generated_corpus_shape(self, tmp_path):
+        """Test que le corpus synthétique respecte la forme demandée"""
+        ingresses = benchmark.generate_ingresses(
+            50, hosts_per_ingress=3, paths_per_rule=4, passthrough_ratio=1.0,
+            annotation_mix='mixed', unsupported_ratio=1.0)
+        
+        assert len(ingresses) == 50
+        assert all(len(ing['spec']['rules']) == 3 for ing in ingresses)
+        assert all(len(rule['http']['paths']) == 4
+                   for ing in ingresses for rule in ing['spec']['rules'])
+        assert all('tls' in ing['spec'] for ing in ingresses)
+        assert benchmark.generate_ingresses(50, seed=1) == benchmark.generate_ingresses(50, seed=1)
+        
+        corpus = tmp_path / "corpus.yaml"
+        benchmark.write_corpus(str(corpus), ingresses, 'list')
+        assert yaml.safe_load(corpus.read_text())['kind'] == 'List'
+    
+    def test_report_phases(self, tmp_path):
+        """Test que le rapport mesure chaque phase séparément"""
+        corpus = tmp_path / "corpus.yaml"
+        benchmark.write_corpus(str(corpus), benchmark.generate_ingresses(20, passthrough_ratio=1.0))
+        
+        report = benchmark.run_benchmark(str(corpus))
+        
+        assert set(report['phases']) == {'load', 'migrate', 'save'}
+        assert report['ingresses'] == 20
+        assert report['tls_routes'] == 20
+        assert report['peak_rss_bytes'] > 0
+        json.dumps(report)
+
+    def test_startup_report(self):
+        """Test que le démarrage à froid est mesuré et n'importe pas les modules optionnels"""
+        report = benchmark.run_startup_benchmark(runs=1, budget_ms=60000)
+        
+        assert set(report['commands']) == set(benchmark.STARTUP_COMMANDS)
+        assert report['modules_loaded_by_import'] == []
+        assert report['over_budget'] == []
+
+
+class TestStats:
+    """Tests pour l'instrumentation (--stats / --profile)"""
+    
+    def test_phases_and_counters(self, tmp_path):
+        """Test que chaque phase est chronométrée et que les compteurs sont tenus"""
+        ingress_file = tmp_path / "ingresses.yaml"
+        ingress_file.write_text(yaml.safe_dump_all([
+            dict(make_ingress('app'), kind='Ingress'),
+            {'kind': 'Ingress', 'metadata': {'name': 'empty'}, 'spec': {}},
+            {'kind': 'ConfigMap', 'metadata': {'name': 'ignored'}},
+        ]))
+        
+        migrator = IngressMigrator("test-gateway", collect_stats=True)
+        migrator.open_outputs(str(tmp_path / "http.yaml"), str(tmp_path / "tls.yaml"),
+                              str(tmp_path / "failed.yaml"))
+        for ingress in migrator.iter_ingresses(str(ingress_file)):
+            migrator.emit_rendered(migrator.render_ingress(ingress))
+        migrator.close_outputs()
+        
+        report = migrator.stats.snapshot()
+        assert report['counters']['docs_parsed'] == 2
+        assert report['counters']['docs_skipped'] == 1
+        assert report['counters']['bytes_read'] == ingress_file.stat().st_size
+        assert report['counters']['http_routes'] == 1
+        assert report['failures_by_reason'] == {"Aucune règle définie dans l'Ingress": 1}
+        for phase in ('load_ingresses', 'check_annotations', 'create_http_route',
+                      'convert_http_path', 'render_routes', 'save_routes'):
+            assert report['phases'][phase]['calls'] >= 1
+            assert report['phases'][phase]['wall_seconds'] >= 0
+    
+    def test_stats_disabled_by_default(self):
+        """Test que l'instrumentation est inactive sans --stats"""
+        migrator = IngressMigrator("test-gateway")
+        migrator.migrate_ingress(make_ingress('app'))
+        assert migrator.stats is None
+    
+    def test_profile_of_slowest_phase(self, tmp_path):
+        """Test l'écriture du profil de la phase la plus lente"""
+        import pstats
+        
+        stats = MigrationStats()
+        stats.enable_profiling()
+        with stats.phase('fast'):
+            pass
+        with stats.phase('slow'):
+            sum(range(200000))
+        
+        profile = tmp_path / "slow.prof"
+        assert stats.dump_profile(str(profile)) == 'slow'
+        pstats.Stats(str(profile))
+
+
+class TestConsolidation:
+    """Tests pour la consolidation des HTTPRoutes"""
+    
+    @staticmethod
+    def routes_for(migrator, ingresses):
+        routes = []
+        for ingress in ingresses:
+            routes.extend(migrator.convert_ingress(ingress)[0])
+        return routes
+    
+    def test_merge_routes_sharing_host(self):
+        """Test la fusion des routes d'un même host et namespace"""
+        migrator = IngressMigrator("test-gateway")
+        routes = self.routes_for(migrator, [
+            make_ingress('a'), make_ingress('b'), make_ingress('c', host='other.example.com'),
+            make_ingress('d', namespace='team-x'),
+        ])
+        
+        merged = consolidate_http_routes(routes)
+        
+        assert len(merged) == 3
+        assert merged[0]['metadata']['name'] == 'a-example-com'
+        assert [r['backendRefs'][0]['name'] for r in merged[0]['spec']['rules']] == ['a', 'b']
+        assert merged[1] is routes[2]
+        assert merged[2] is routes[3]
+    
+    def test_rule_limit_and_unique_names(self):
+        """Test le respect de la limite de règles et l'unicité des noms"""
+        migrator = IngressMigrator("test-gateway")
+        ingresses = [make_ingress('app') for _ in range(5)]
+        routes = self.routes_for(migrator, ingresses)
+        routes.append(self.routes_for(migrator, [make_ingress('app-example-com-2', host='')])[0])
+        
+        merged = consolidate_http_routes(routes, max_rules=2)
+        
+        assert [len(r['spec']['rules']) for r in merged[:3]] == [2, 2, 1]
+        names = [r['metadata']['name'] for r in merged]
+        assert names[:3] == ['app-example-com', 'app-example-com-3', 'app-example-com-4']
+        assert len(set(names)) == len(names)
+    
+    def test_oversized_route_is_split(self):
+        """Test qu'un host de plus de 16 chemins donne des routes valides, consolidées ou non"""
+        ingress = make_ingress('big', host='big.example.com')
+        paths = ingress['spec']['rules'][0]['http']['paths']
+        paths[:] = [dict(paths[0], path=f'/p{i}') for i in range(20)]
+        
+        migrator = IngressMigrator("test-gateway")
+        migrator.migrate_ingress(ingress)
+        
+        assert migrator.failed_ingresses == []
+        for routes in (migrator.http_routes, consolidate_http_routes(migrator.http_routes)):
+            assert [r['metadata']['name'] for r in routes] == [
+                'big-big-example-com', 'big-big-example-com-2']
+            assert [len(r['spec']['rules']) for r in routes] == [16, 4]
+            assert RouteValidator().validate(routes) is None
+        
+        first, second = migrator.http_routes
+        assert first['spec']['hostnames'] is not second['spec']['hostnames']
+    
+    def test_common_labels_only(self):
+        """Test que seuls les labels communs sont conservés"""
+        migrator = IngressMigrator("test-gateway")
+        first, second = make_ingress('a'), make_ingress('b')
+        first['metadata']['labels'] = {'team': 'x', 'app': 'a'}
+        second['metadata']['labels'] = {'team': 'x', 'app': 'b'}
+        
+        merged = consolidate_http_routes(self.routes_for(migrator, [first, second]))
+        
+        assert merged[0]['metadata']['labels'] == {'team': 'x'}
+
+
+class TestConflictDetection:
+    """Tests pour la détection des chemins en conflit entre routes"""
+    
+    @staticmethod
+    def route(name, paths, host='example.com'):
+        ingress = make_ingress(name, host=host)
+        ingress['spec']['rules'][0]['http']['paths'] = [{
+            'path': path, 'pathType': path_type,
+            'backend': {'service': {'name': backend, 'port': {'number': 80}}}
+        } for path, path_type, backend in paths]
+        return IngressMigrator("test-gateway").convert_ingress(ingress)[0][0]
+    
+    def test_duplicates_and_conflicting_backends(self):
+        """Test la détection des doublons et des backends en conflit"""
+        detector = RouteConflictDetector()
+        detector.add(self.route('a', [('/api', 'Prefix', 'svc'), ('/health', 'Exact', 'svc')]))
+        detector.add(self.route('b', [('/api/', 'Prefix', 'svc'), ('/health', 'Exact', 'other')]))
+        detector.add(self.route('c', [('/api', 'Prefix', 'svc')], host='other.example.com'))
+        
+        findings = detector.report()
+        
+        assert [(f['type'], f['match'], f['path']) for f in findings] == [
+            ('duplicate', 'PathPrefix', '/api'),
+            ('conflicting-backends', 'Exact', '/health'),
+        ]
+        assert findings[1]['routes'] == ['default/a-example-com', 'default/b-example-com']
+        assert findings[1]['backends'] == ['other:80', 'svc:80']
+    
+    def test_shadowed_prefix(self):
+        """Test la détection d'un préfixe masqué par un préfixe plus long"""
+        detector = RouteConflictDetector()
+        detector.add(self.route('a', [('/', 'Prefix', 'front'), ('/api/v1', 'Prefix', 'front')]))
+        detector.add(self.route('b', [('/api', 'Prefix', 'api'), ('/apiv2', 'Prefix', 'api')]))
+        
+        findings = detector.report()
+        
+        found = [(f['path'], f['shadowed_path'], f['routes'], f['shadowed_routes'])
+                 for f in findings]
+        assert found == [
+            ('/api', '/', ['default/b-example-com'], ['default/a-example-com']),
+            ('/api/v1', '/api', ['default/a-example-com'], ['default/b-example-com']),
+            ('/apiv2', '/', ['default/b-example-com'], ['default/a-example-com']),
+        ]
+        assert {f['type'] for f in findings} == {'shadowed-prefix'}
+    
+    def test_exact_inside_prefix(self):
+        """Test la détection d'un chemin Exact pris à un PathPrefix d'une autre route"""
+        detector = RouteConflictDetector()
+        detector.add(self.route('a', [('/api', 'Prefix', 'api'), ('/', 'Prefix', 'front')]))
+        detector.add(self.route('b', [('/api/health', 'Exact', 'health'),
+                                      ('/api', 'Exact', 'health')]))
+        
+        findings = detector.report()
+        
+        found = [(f['type'], f['path'], f['shadowed_path'], f['shadowed_routes'])
+                 for f in findings]
+        assert found == [
+            ('exact-over-prefix', '/api', '/api', ['default/a-example-com']),
+            ('exact-over-prefix', '/api/health', '/api', ['default/a-example-com']),
+        ]
+    
+    def test_wildcard_and_hostless_routes(self):
+        """Test la détection des hôtes repris à une route wildcard ou sans hostname"""
+        detector = RouteConflictDetector()
+        detector.add(self.route('a', [('/', 'Prefix', 'a')], host='shop.example.com'))
+        wildcard = self.route('w', [('/', 'Prefix', 'w')])
+        wildcard['spec']['hostnames'] = ['*.example.com']
+        detector.add(wildcard)
+        hostless = self.route('any', [('/', 'Prefix', 'any')])
+        del hostless['spec']['hostnames']
+        detector.add(hostless)
+        
+        findings = detector.report()
+        
+        found = [(f['type'], f['hostname'], f['shadowed_hostname'], f['shadowed_routes'])
+                 for f in findings]
+        assert found == [
+            ('shadowed-host', '*.example.com', '*', ['default/any-example-com']),
+            ('shadowed-host', 'shop.example.com', '*.example.com', ['default/w-example-com']),
+            ('shadowed-host', 'shop.example.com', '*', ['default/any-example-com']),
+        ]
+
+
+class TestShardedOutput:
+    """Tests pour l'écriture des routes en fichiers partitionnés"""
+    
+    @pytest.fixture
+    def pool(self):
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            yield pool
+    
+    @staticmethod
+    def write(writer, ingresses):
+        migrator = IngressMigrator("test-gateway")
+        for ingress in ingresses:
+            for route in migrator.convert_ingress(ingress)[0]:
+                writer.append(route)
+        writer.close()
+    
+    def test_shard_by_namespace_with_index(self, tmp_path, pool):
+        """Test le partitionnement par namespace et l'index des fichiers"""
+        writer = ShardedWriter(str(tmp_path), 'httproutes', 'HTTPRoute', 'namespace', pool,
+                               flush_bytes=1)
+        self.write(writer, [make_ingress('a', 'team-a'), make_ingress('b', 'team-b'),
+                            make_ingress('c', 'team-a')])
+        
+        index = write_shard_index(str(tmp_path), 'namespace', [writer])
+        
+        with open(index) as f:
+            shards = json.load(f)['shards']
+        assert [(s['file'], s['count']) for s in shards] == [
+            ('httproutes-team-a.yaml', 2), ('httproutes-team-b.yaml', 1)]
+        with open(tmp_path / 'httproutes-team-a.yaml') as f:
+            assert [d['metadata']['name'] for d in yaml.safe_load_all(f)] == [
+                'a-example-com', 'c-example-com']
+        assert shards[0]['bytes'] == (tmp_path / 'httproutes-team-a.yaml').stat().st_size
+    
+    def test_size_bounded_shards(self, tmp_path, pool):
+        """Test les partitions bornées en nombre et en taille"""
+        (tmp_path / 'httproutes-stale.yaml').write_text("stale")
+        ingresses = [make_ingress(f'app{i}') for i in range(5)]
+        
+        writer = ShardedWriter(str(tmp_path), 'httproutes', 'HTTPRoute', 'count:2', pool)
+        self.write(writer, ingresses)
+        assert [s['count'] for s in writer.index()] == [2, 2, 1]
+        assert not (tmp_path / 'httproutes-stale.yaml').exists()
+        
+        limit = writer.index()[0]['bytes']
+        writer = ShardedWriter(str(tmp_path), 'httproutes', 'HTTPRoute', f'bytes:{limit}', pool)
+        self.write(writer, ingresses)
+        assert all(s['bytes'] <= limit for s in writer.index())
+        assert sum(s['count'] for s in writer.index()) == 5
+        
+        # La limite porte sur les octets écrits (JSON non échappé), pas sur les caractères
+        for ingress in ingresses:
+            ingress['metadata']['labels'] = {'owner': '\u00e9quipe-donn\u00e9es'}
+        json_writer = IngressMigrator("test-gateway", output_format='json').route_writer
+        writer = ShardedWriter(str(tmp_path), 'httproutes', 'HTTPRoute', f'bytes:{limit}', pool,
+                               writer_class=json_writer)
+        self.write(writer, ingresses)
+        assert len(writer.index()) > 1
+        for shard in writer.index():
+            assert shard['bytes'] == (tmp_path / shard['file']).stat().st_size <= limit
+    
+    @pytest.mark.parametrize('fmt,prefix', [('yaml', '---\n'), ('ndjson', '')])
+    def test_concatenated_shards(self, tmp_path, pool, fmt, prefix):
+        """Test que la concaténation des partitions redonne la sortie non partitionnée"""
+        route_writer = IngressMigrator("test-gateway", output_format=fmt).route_writer
+        ingresses = [make_ingress(f'app{i}') for i in range(5)]
+        unsharded = route_writer(str(tmp_path / f'all.{fmt}'))
+        self.write(unsharded, ingresses)
+        
+        writer = ShardedWriter(str(tmp_path / 'shards'), 'httproutes', 'HTTPRoute', 'count:2',
+                               pool, writer_class=route_writer)
+        self.write(writer, ingresses)
+        
+        shards = [(tmp_path / 'shards' / s['file']).read_text() for s in writer.index()]
+        assert all(shard.startswith(prefix) for shard in shards)
+        assert ''.join(shards) == prefix + (tmp_path / f'all.{fmt}').read_text()
+    
+    def test_hostname_keys_stay_in_directory(self, tmp_path, pool):
+        """Test que les clés de partition ne sortent pas du répertoire"""
+        ingress = make_ingress('app', namespace='../team')
+        writer = ShardedWriter(str(tmp_path / 'shards'), 'httproutes', 'HTTPRoute', 'hostname',
+                               pool)
+        migrator = IngressMigrator("test-gateway", validate=False)
+        for host in ('../../evil', '*.example.com'):
+            ingress['spec']['rules'][0]['host'] = host
+            for route in migrator.convert_ingress(ingress)[0]:
+                writer.append(route)
+        writer.close()
+        
+        assert [s['file'] for s in writer.index()] == [
+            'httproutes-.._.._evil.yaml', 'httproutes-_.example.com.yaml']
+        assert os.listdir(tmp_path) == ['shards']
+        
+        writer = ShardedWriter(str(tmp_path / 'shards'), 'ns', 'HTTPRoute', 'namespace', pool)
+        for route in migrator.convert_ingress(ingress)[0]:
+            writer.append(route)
+        writer.close()
+        assert [s['file'] for s in writer.index()] == ['ns-.._team.yaml']
+    
+    def test_invalid_spec(self):
+        """Test le rejet d'une spécification invalide"""
+        with pytest.raises(ValueError):
+            parse_shard_spec('count:0')
+        assert parse_shard_spec('bytes:1000') == ('bytes', 1000)
+
+
+class TestRouteDiff:
+    """Tests pour le mode diff par rapport à une sortie précédente"""
+    
+    @staticmethod
+    def routes(*ingresses):
+        migrator = IngressMigrator("test-gateway")
+        return [route for ingress in ingresses for route in migrator.convert_ingress(ingress)[0]]
+    
+    @pytest.fixture
+    def previous(self, tmp_path):
+        previous = tmp_path / "previous"
+        previous.mkdir()
+        writer = YamlStreamWriter(str(previous / "httproutes.yaml"))
+        for route in self.routes(make_ingress('a'), make_ingress('b'), make_ingress('c')):
+            writer.append(route)
+        writer.close()
+        (previous / "notes.txt").write_text("ignored")
+        return previous
+    
+    def test_added_changed_deleted(self, previous, tmp_path):
+        """Test la classification des routes ajoutées, modifiées et supprimées"""
+        changed = make_ingress('b')
+        changed['spec']['rules'][0]['http']['paths'][0]['path'] = '/v2'
+        diff = RouteDiff(str(previous), str(tmp_path / "diff"))
+        for route in self.routes(make_ingress('a'), changed, make_ingress('d')):
+            diff.observe('HTTPRoute', route)
+        
+        summary = diff.close()
+        
+        assert summary == {'added': 1, 'changed': 1, 'deleted': 1, 'unchanged': 1}
+        
+        def names(filename):
+            with open(tmp_path / "diff" / filename) as f:
+                return [doc['metadata']['name'] for doc in yaml.safe_load_all(f)]
+        assert names("added.yaml") == ['d-example-com']
+        assert names("changed.yaml") == ['b-example-com']
+        assert names("deleted.yaml") == ['c-example-com']
+    
+    def test_incomplete_run_and_stale_manifests(self, previous, tmp_path):
+        """Test qu'un run incomplet ne supprime rien et que l'ancien diff est effacé"""
+        output = tmp_path / "diff"
+        output.mkdir()
+        (output / "deleted.yaml").write_text("stale")
+        diff = RouteDiff(str(previous), str(output))
+        writer = ObservedWriter(YamlStreamWriter(str(tmp_path / "httproutes.yaml")),
+                                'HTTPRoute', diff)
+        for route in self.routes(make_ingress('a')):
+            writer.append(route)
+        writer.close()
+        
+        assert diff.close(complete=False) == {'added': 0, 'changed': 0, 'deleted': 0,
+                                              'unchanged': 1}
+        assert not (output / "deleted.yaml").exists()
+
+
+class TestFormats:
+    """Tests pour les formats d'entrée et de sortie JSON et NDJSON"""
+    
+    @staticmethod
+    def ingress(name):
+        return dict(make_ingress(name), apiVersion='networking.k8s.io/v1', kind='Ingress')
+    
+    def test_json_and_ndjson_input(self, tmp_path):
+        """Test la lecture d'un List JSON, de documents concaténés et de NDJSON"""
+        json_file = tmp_path / "ingresses.json"
+        listed = {'kind': 'List', 'items': [self.ingress('a'), {'kind': 'Service'}]}
+        json_file.write_text(json.dumps(listed, indent=2) + json.dumps(self.ingress('b')))
+        ndjson_file = tmp_path / "ingresses.ndjson"
+        ndjson_file.write_text('\n'.join(json.dumps(doc) for doc in (
+            self.ingress('c'), {'kind': 'ConfigMap'},
+            {'kind': 'List', 'items': [self.ingress('d')]})) + '\n\n')
+        
+        names = {}
+        for fmt, filename in (('json', json_file), ('ndjson', ndjson_file)):
+            migrator = IngressMigrator("test-gateway", input_format=fmt)
+            names[fmt] = [i['metadata']['name'] for i in migrator.iter_ingresses(str(filename))]
+            # Segments handed to --jobs workers hold the same Ingresses
+            segments = list(migrator.iter_segments(str(filename)))
+            batch = migrator.render_segments(segments)
+            assert batch.loaded == len(names[fmt])
+            # Le JSON décodé d'un bloc est transmis tel quel, sans être réencodé
+            assert all(isinstance(text, dict if fmt == 'json' else str) for _, text in segments)
+        
+        assert names == {'json': ['a', 'b'], 'ndjson': ['c', 'd']}
+    
+    @pytest.mark.parametrize('fmt', ['json', 'ndjson'])
+    def test_json_outputs(self, tmp_path, fmt):
+        """Test les sorties JSON (List) et NDJSON, y compris les échecs"""
+        migrator = IngressMigrator("test-gateway", output_format=fmt)
+        outputs = [str(tmp_path / f"{name}.{fmt}") for name in ('http', 'tls', 'failed')]
+        migrator.open_outputs(*outputs)
+        empty = {'metadata': {'name': 'empty'}, 'spec': {}}
+        for ingress in (self.ingress('a'), self.ingress('b'), empty):
+            migrator.emit_rendered(migrator.render_ingress(ingress))
+        migrator.close_outputs()
+        
+        with open(outputs[0]) as f:
+            text = f.read()
+        if fmt == 'json':
+            routes = json.loads(text)['items']
+        else:
+            routes = [json.loads(line) for line in text.splitlines()]
+        assert [r['metadata']['name'] for r in routes] == ['a-example-com', 'b-example-com']
+        with open(outputs[2]) as f:
+            failures = json.load(f) if fmt == 'json' else [json.loads(line) for line in f]
+        assert failures == [{'reason': "Aucune règle définie dans l'Ingress",
+                             'ingress': {'metadata': {'name': 'empty'}, 'spec': {}}}]
+        assert not os.path.exists(outputs[1])
+    
+    def test_output_format_in_cache_salt(self):
+        """Test que le format de sortie change les clés du cache"""
+        salts = {IngressMigrator("test-gateway", output_format=fmt).cache_salt()
+                 for fmt in ('yaml', 'json', 'ndjson')}
+        assert len(salts) == 3
+        with pytest.raises(ValueError):
+            IngressMigrator("test-gateway", output_format='toml')
+    
+    def test_json_run_does_not_import_yaml(self, tmp_path):
+        """Test qu'une migration JSON de bout en bout n'importe pas PyYAML"""
+        input_file = tmp_path / "ingresses.json"
+        input_file.write_text(json.dumps({'kind': 'List', 'items': [self.ingress('a')]}))
+        output = tmp_path / "routes.json"
+        code = ("import sys, migrate; sys.argv = ['migrate', '-i', sys.argv[1], '-g', 'gw', "
+                "'--no-cache', '--input-format', 'json', '--output-format', 'json', "
+                "'-o', sys.argv[2]]; migrate.main(); sys.stderr.write(str('yaml' in sys.modules))")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, '-c', code, str(input_file), str(output)],
+                                cwd=tmp_path, env=dict(os.environ, PYTHONPATH=root),
+                                capture_output=True, text=True, check=True)
+        
+        assert result.stderr == 'False'
+        assert json.loads(output.read_text())['items'][0]['metadata']['name'] == 'a-example-com'
+
+
+class TestCheckpoint:
+    """Tests pour les exécutions reprises depuis un checkpoint (--checkpoint/--resume)"""
+    
+    @staticmethod
+    def write_input(path, broken=None, renamed=None):
+        docs = []
+        for i in range(12):
+            ingress = dict(make_ingress(f"app{i}", host=f"app{i}.example.com"), kind='Ingress')
+            if i == 5:
+                ingress['spec'] = {}
+            if i == renamed:
+                ingress['metadata']['name'] = 'renamed'
+            docs.append(yaml.safe_dump(ingress))
+        if broken is not None:
+            docs[broken] = "kind: Ingress\nmetadata: {name: [\n"
+        path.write_text('---\n'.join(docs))
+    
+    @staticmethod
+    def run(tmp_path, directory, fmt, **kwargs):
+        migrator = IngressMigrator("test-gateway", output_format=fmt)
+        outputs = [str(tmp_path / directory / f"{name}.{fmt}")
+                   for name in ('http', 'tls', 'failed')]
+        os.makedirs(tmp_path / directory, exist_ok=True)
+        migrator.open_outputs(*outputs)
+        try:
+            return migrator.migrate_checkpointed(str(tmp_path / "ingresses.yaml"), chunk_size=2,
+                                                 **kwargs)
+        finally:
+            migrator.close_outputs()
+    
+    @pytest.mark.parametrize('jobs,fmt', [(1, 'yaml'), (2, 'json')])
+    def test_resume_after_bad_document(self, tmp_path, jobs, fmt):
+        """Test qu'une exécution interrompue puis reprise produit la même sortie"""
+        ingress_file = tmp_path / "ingresses.yaml"
+        self.write_input(ingress_file)
+        unused = MigrationCheckpoint(str(tmp_path / "unused.json"))
+        assert self.run(tmp_path, "expected", fmt, checkpoint=unused, jobs=jobs) == 12
+        
+        checkpoint = MigrationCheckpoint(str(tmp_path / "checkpoint.json"), every=1)
+        self.write_input(ingress_file, broken=9)
+        with pytest.raises(yaml.YAMLError):
+            self.run(tmp_path, "out", fmt, checkpoint=checkpoint, jobs=jobs)
+        assert checkpoint.load()['documents'] == 8
+        
+        # Un document déjà migré a changé : la reprise est refusée
+        self.write_input(ingress_file, renamed=0)
+        with pytest.raises(ValueError, match="changed before"):
+            self.run(tmp_path, "out", fmt, checkpoint=checkpoint, jobs=jobs, resume=True)
+        
+        self.write_input(ingress_file)
+        assert self.run(tmp_path, "out", fmt, checkpoint=checkpoint, jobs=jobs, resume=True) == 12
+        for name in ('http', 'failed'):
+            assert (tmp_path / "out" / f"{name}.{fmt}").read_bytes() == \
+                (tmp_path / "expected" / f"{name}.{fmt}").read_bytes()
+        assert not (tmp_path / "out" / f"tls.{fmt}").exists()
+    
+    def test_resume_rejects_other_settings(self, tmp_path):
+        """Test que la reprise exige les mêmes paramètres de sortie"""
+        self.write_input(tmp_path / "ingresses.yaml")
+        checkpoint = MigrationCheckpoint(str(tmp_path / "checkpoint.json"), every=1)
+        self.run(tmp_path, "out", 'yaml', checkpoint=checkpoint)
+        
+        with pytest.raises(ValueError, match="different settings"):
+            self.run(tmp_path, "out", 'ndjson', checkpoint=checkpoint, resume=True)
+
+
+class TestWatchMode:
+    """Tests pour le mode watch (--watch/--events)"""
+    
+    @staticmethod
+    def ingress(name, uid, host='example.com'):
+        ingress = make_ingress(name, 'shop', host)
+        ingress['metadata']['uid'] = uid
+        return ingress
+    
+    @staticmethod
+    def files(directory):
+        return sorted(str(path.relative_to(directory))
+                      for path in directory.rglob('*') if path.is_file())
+    
+    def test_events_update_route_files(self, tmp_path):
+        """Test que chaque événement ne réécrit que les fichiers de l'Ingress concerné"""
+        (tmp_path / "shop").mkdir()
+        (tmp_path / "shop" / "httproute-stale.yaml").write_text("stale")
+        with pytest.raises(ValueError):
+            IngressWatcher(IngressMigrator("test-gateway"), str(tmp_path))
+        assert self.files(tmp_path) == ['shop/httproute-stale.yaml']
+        watcher = IngressWatcher(IngressMigrator("test-gateway"), str(tmp_path), clean=True)
+        
+        def hostnames():
+            return [r['spec']['hostnames'] for r in yaml.safe_load_all(route_file.read_text())]
+        
+        a, ab = self.ingress('a', 'u1', 'b.c'), self.ingress('a-b', 'u2', 'c')
+        assert watcher.apply({'type': 'SYNC', 'objects': [a, ab]}) == (2, 0)
+        # Deux Ingress génèrent la même route : le fichier contient les deux documents
+        route_file = tmp_path / "shop" / "httproute-a-b-c.yaml"
+        assert hostnames() == [['b.c'], ['c']]
+        assert watcher.index['u1'].routes == (('HTTPRoute', 'a-b-c'),)
+        
+        assert watcher.apply({'type': 'MODIFIED', 'object': ab}) == (0, 0)
+        assert watcher.apply({'type': 'DELETED', 'object': a}) == (1, 0)
+        assert hostnames() == [['c']]
+        
+        broken = {'metadata': {'name': 'broken', 'namespace': 'shop', 'uid': 'u3'}, 'spec': {}}
+        ab = self.ingress('a-b', 'u2', 'd')
+        assert watcher.apply({'type': 'ADDED', 'object': broken}) == (1, 0)
+        assert watcher.apply({'type': 'MODIFIED', 'object': ab}) == (1, 1)
+        assert self.files(tmp_path) == ['shop/failed-broken.yaml', 'shop/httproute-a-b-d.yaml']
+        
+        # Une nouvelle liste complète supprime les Ingress disparus
+        assert watcher.apply({'type': 'SYNC', 'objects': [ab]}) == (0, 1)
+        assert self.files(tmp_path) == ['shop/httproute-a-b-d.yaml']
+        assert list(watcher.index) == ['u2']
+    
+    def test_event_file_namespace_filter(self, tmp_path):
+        """Test la lecture d'un fichier d'événements NDJSON filtré par namespace"""
+        events_file = tmp_path / "events.ndjson"
+        events_file.write_text('\n'.join(json.dumps(event) for event in (
+            {'type': 'ADDED', 'object': self.ingress('a', 'u1')},
+            {'type': 'ADDED', 'object': make_ingress('other', 'elsewhere')},
+        )) + '\n\n')
+        watcher = IngressWatcher(IngressMigrator("test-gateway", output_format='ndjson'),
+                                 str(tmp_path / "routes"), ['shop'])
+        
+        for event in iter_event_file(str(events_file)):
+            watcher.apply(event)
+        
+        assert watcher.events == 2
+        assert self.files(tmp_path / "routes") == ['shop/httproute-a-example-com.ndjson']
+    
+    def test_unsafe_names_are_rejected(self, tmp_path):
+        """Test qu'un namespace ou un nom hors DNS-1123 n'écrit rien hors du répertoire"""
+        watcher = IngressWatcher(IngressMigrator("test-gateway", validate=False),
+                                 str(tmp_path / "routes"))
+        escaping_namespace = make_ingress('a', '../../outside')
+        failed_name = {'metadata': {'name': '../evil', 'namespace': 'shop'}, 'spec': {}}
+        slash_host = self.ingress('b', 'u2', 'x/../../y')
+        
+        for ingress in (escaping_namespace, failed_name, slash_host):
+            assert watcher.apply({'type': 'ADDED', 'object': ingress}) == (0, 0)
+        assert watcher.apply({'type': 'ADDED', 'object': self.ingress('a', 'u1')}) == (1, 0)
+        
+        assert len(watcher.rejected) == 3
+        assert watcher.rejected[0].startswith("../../outside/a: invalid namespace or name")
+        assert self.files(tmp_path) == ['routes/shop/httproute-a-example-com.yaml']
+        assert list(watcher.index) == ['u1']
+
+
+class FakeApplyAPI:
+    """Serveur d'API minimal acceptant le server-side apply (PATCH), avec keep-alive"""
+    
+    def __init__(self, responses=None, delay=0.01):
+        # Statuts à renvoyer successivement par nom d'objet avant de réussir
+        self.responses = {name: list(statuses) for name, statuses in (responses or {}).items()}
+        self.requests = []
+        self.clients = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def log_message(self, *args):
+                pass
+            
+            def do_PATCH(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                name = self.path.split('?')[0].rsplit('/', 1)[-1]
+                with stub.lock:
+                    stub.requests.append((self.path, self.headers['Content-Type'], body))
+                    stub.clients.add(self.client_address)
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    statuses = stub.responses.get(name)
+                    status = statuses.pop(0) if statuses else 200
+                time.sleep(delay)
+                with stub.lock:
+                    stub.in_flight -= 1
+                
+                payload = (body if status == 200
+                           else {'kind': 'Status', 'message': f'refused {name}'})
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                if status == 429:
+                    self.send_header('Retry-After', '0')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestApply:
+    """Tests pour l'application des routes par server-side apply (--apply)"""
+    
+    @staticmethod
+    def routes(count):
+        migrator = IngressMigrator("test-gateway")
+        for i in range(count):
+            migrator.migrate_ingress(make_ingress(f"app{i}", 'shop', f"app{i}.example.com"))
+        return migrator.http_routes
+    
+    def test_bounded_concurrency_and_retries(self):
+        """Test la concurrence bornée, la réutilisation des connexions et les reprises (409/429)"""
+        api = FakeApplyAPI({'app3-app3-example-com': [429, 409], 'app5-app5-example-com': [422]})
+        try:
+            applier = RouteApplier(KubernetesClient(api.url, token='secret'), concurrency=4,
+                                   backoff=0.01)
+            results = applier.apply(iter(self.routes(20)))
+        finally:
+            api.close()
+        
+        assert [r.name for r in results] == [f"app{i}-app{i}-example-com" for i in range(20)]
+        assert [(r.ok, r.attempts) for r in results if r.attempts > 1 or not r.ok] == [
+            (True, 3), (False, 1)]
+        assert results[5].status == 422 and results[5].error == 'refused app5-app5-example-com'
+        assert api.max_in_flight <= 4
+        assert applier.connections <= 4 and len(api.clients) <= 4
+        
+        path, content_type, body = api.requests[0]
+        assert path.startswith('/apis/gateway.networking.k8s.io/v1/namespaces/shop/httproutes/app')
+        assert 'fieldManager=ingress-to-gateway-migrator' in path and 'force=true' in path
+        assert content_type == 'application/apply-patch+yaml'
+        assert body['kind'] == 'HTTPRoute'
+    
+    def test_ndjson_apply_does_not_import_yaml(self, tmp_path):
+        """Test que --apply sur une sortie NDJSON n'importe pas PyYAML"""
+        input_file = tmp_path / "ingresses.json"
+        input_file.write_text(json.dumps({'kind': 'List', 'items': [
+            dict(make_ingress('app', 'shop'), kind='Ingress')]}))
+        api = FakeApplyAPI()
+        code = ("import sys, migrate; sys.argv = ['migrate', '-i', sys.argv[1], '-g', 'gw', "
+                "'--input-format', 'json', '--output-format', 'ndjson', '-o', 'http.ndjson', "
+                "'-t', 'tls.ndjson', '-f', 'failed.ndjson', '--apply', '--kube-server', "
+                "sys.argv[2]]; migrate.main(); sys.stderr.write(str('yaml' in sys.modules))")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        try:
+            result = subprocess.run([sys.executable, '-c', code, str(input_file), api.url],
+                                    cwd=tmp_path, env=dict(os.environ, PYTHONPATH=root),
+                                    capture_output=True, text=True, check=True)
+        finally:
+            api.close()
+        
+        assert result.stderr == 'False'
+        assert [body['metadata']['name'] for _, _, body in api.requests] == ['app-example-com']
+    
+    def test_unreachable_server(self):
+        """Test qu'un serveur injoignable est rapporté par objet, sans exception"""
+        api = FakeApplyAPI()
+        url = api.url
+        api.close()
+        
+        applier = RouteApplier(KubernetesClient(url), retries=1, backoff=0.01)
+        results = applier.apply(iter(self.routes(2)))
+        
+        assert [(r.status, r.attempts, r.ok) for r in results] == [(0, 2, False), (0, 2, False)]
+
+
+class TestValidation:
+    """Tests pour la validation des routes contre les schémas Gateway API"""
+    
+    def test_invalid_routes_are_failed(self):
+        """Test qu'un Ingress produisant une route invalide part dans les échecs"""
+        wildcard = make_ingress('wild', host='*.example.com')
+        rewrite = make_ingress('rewrite')
+        rewrite['metadata']['annotations'] = {'nginx.ingress.kubernetes.io/rewrite-target': '/'}
+        rewrite['spec']['rules'][0]['http']['paths'][0]['pathType'] = 'Exact'
+        
+        migrator = IngressMigrator("test-gateway")
+        for ingress in (make_ingress('app'), wildcard, rewrite):
+            migrator.migrate_ingress(ingress)
+        
+        assert [r['metadata']['name'] for r in migrator.http_routes] == ['app-example-com']
+        assert [f['ingress']['metadata']['name'] for f in migrator.failed_ingresses] == [
+            'wild', 'rewrite']
+        assert migrator.failed_ingresses[0]['reason'].startswith(
+            "Route invalide: HTTPRoute wild-*-example-com: metadata.name: Invalid value")
+        assert 'exactly one PathPrefix match' in migrator.failed_ingresses[1]['reason']
+        
+        unchecked = IngressMigrator("test-gateway", validate=False)
+        unchecked.migrate_ingress(wildcard)
+        assert len(unchecked.http_routes) == 1
+        assert unchecked.cache_salt() != migrator.cache_salt()
+    
+    def test_error_paths(self):
+        """Test les chemins d'erreur et la validation des références à la Gateway"""
+        route = IngressMigrator("test-gateway").convert_ingress(make_ingress('app'))[0][0]
+        validator = RouteValidator()
+        assert validator.validate([route]) is None
+        
+        def check(**spec):
+            return validator.check(dict(route, spec=dict(route['spec'], **spec)))
+        
+        backend = {'name': None, 'port': 80}
+        assert check(rules=[{'backendRefs': [{'name': 'a', 'port': 80}, backend]}]) == (
+            "HTTPRoute app-example-com: spec.rules[0].backendRefs[1].name: "
+            "Invalid value: None: must be of type str")
+        assert check(rules=[{'backendRefs': [{'name': 'a', 'port': True}]}]).endswith(
+            "spec.rules[0].backendRefs[0].port: Invalid value: True: "
+            "must be an integer between 1 and 65535")
+        assert check(rules=[{}] * 17).endswith(
+            "spec.rules: Invalid value: 17 items: must have 0 to 16 items")
+        assert check(parentRefs=[{'name': 'gw', 'port': 'bad'}]).endswith(
+            "spec.parentRefs[0].port: Invalid value: 'bad': must be an integer between 1 and 65535")
+        assert validator.check({'kind': 'Service'}) == "Service: Unsupported kind"
+        
+        with pytest.raises(ValueError, match='parentRefs'):
+            IngressMigrator("test-gateway", gateway_port=70000)
+
+
+class TestLibraryAPI:
+    """Tests pour l'API bibliothèque (migrate_many)"""
+    
+    def test_lazy_typed_results(self):
+        """Test que les résultats sont produits à la demande sans modifier le migrateur"""
+        passthrough = make_ingress('secure', host='secure.example.com')
+        passthrough['metadata']['annotations'] = {
+            'nginx.ingress.kubernetes.io/ssl-passthrough': 'true'}
+        passthrough['spec']['tls'] = [{'hosts': ['secure.example.com']}]
+        empty = {'metadata': {'name': 'empty'}, 'spec': {}}
+        consumed = []
+        
+        def ingresses():
+            for ingress in (make_ingress('app'), passthrough, empty):
+                consumed.append(ingress['metadata']['name'])
+                yield ingress
+        
+        migrator = IngressMigrator("test-gateway")
+        results = migrator.migrate_many(ingresses())
+        first = next(results)
+        assert consumed == ['app']
+        assert isinstance(first, MigrationResult) and first.ok and first.kind == 'HTTPRoute'
+        
+        rest = list(results)
+        assert [(r.kind, r.ingress['metadata']['name']) for r in rest] == [
+            ('HTTPRoute', 'secure'), ('TLSRoute', 'secure'), (None, 'empty')]
+        assert not rest[-1].ok and rest[-1].reason == "Aucune règle définie dans l'Ingress"
+        assert migrator.http_routes == [] and migrator.failed_ingresses == []
+        
+        with pytest.raises(ValueError):
+            IngressMigrator("test-gateway", collect_stats=True).migrate_many([])
+        with pytest.raises(OSError):
+            migrator.load_ingresses('/nonexistent/ingresses.yaml')
+    
+    def test_concurrent_threads(self):
+        """Test qu'un même migrateur sert plusieurs threads à la fois"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        migrator = IngressMigrator("test-gateway")
+        batches = [[make_ingress(f"app{t}-{i}", f"ns{t}", f"app{i}.example.com")
+                    for i in range(200)] for t in range(8)]
+        
+        def routes(migrator, batch):
+            return [r.route for r in migrator.migrate_many(batch)]
+        
+        expected = [routes(IngressMigrator("test-gateway"), batch) for batch in batches]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda batch: routes(migrator, batch), batches))
+        
+        assert results == expected
+    
+    def test_results_share_nothing(self):
+        """Test que modifier une route produite n'affecte ni les autres routes ni l'Ingress"""
+        ingress = make_ingress('secure', host='secure.example.com')
+        ingress['metadata']['labels'] = {'app': 'secure'}
+        ingress['metadata']['annotations'] = {'nginx.ingress.kubernetes.io/ssl-passthrough': 'true'}
+        ingress['spec']['tls'] = [{'hosts': ['secure.example.com']}]
+        migrator = IngressMigrator("test-gateway")
+        
+        for result in migrator.migrate_many([ingress]):
+            spec = result.route['spec']
+            spec['parentRefs'][0]['name'] = 'evil'
+            spec['hostnames'].append('evil.example.com')
+            result.route['metadata']['labels']['app'] = 'evil'
+            if result.kind == 'TLSRoute':
+                spec['rules'][0]['backendRefs'][0]['port'] = 1
+        
+        routes = [r.route for r in migrator.migrate_many([ingress])]
+        assert {r['spec']['parentRefs'][0]['name'] for r in routes} == {'test-gateway'}
+        assert {r['metadata']['labels']['app'] for r in routes} == {'secure'}
+        assert routes[1]['spec']['rules'][0]['backendRefs'][0]['port'] == 443
+        assert ingress['metadata']['labels'] == {'app': 'secure'}
+        assert ingress['spec']['tls'][0]['hosts'] == ['secure.example.com']
 
 
 class TestIntegration:
@@ -371,6 +1870,40 @@ spec:
         
         assert len(ingresses) == 2
 
+    def test_iter_ingresses_streams_list_items(self, tmp_path):
+        """Test que iter_ingresses renvoie un générateur incluant les items de List"""
+        ingress_file = tmp_path / "list-ingress.yaml"
+        ingress_file.write_text("""
+apiVersion: v1
+kind: List
+items:
+- apiVersion: networking.k8s.io/v1
+  kind: Ingress
+  metadata:
+    name: from-list
+- apiVersion: v1
+  kind: Service
+  metadata:
+    name: not-an-ingress
+---
+apiVersion: networking.k8s.io/v1
+kind: Ingress
+metadata:
+  name: standalone
+---
+apiVersion: v1
+kind: ConfigMap
+metadata:
+  name: ignored
+""")
+        
+        migrator = IngressMigrator("test-gateway")
+        stream = migrator.iter_ingresses(str(ingress_file))
+        
+        assert not isinstance(stream, list)
+        names = [ing['metadata']['name'] for ing in stream]
+        assert names == ['from-list', 'standalone']
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])